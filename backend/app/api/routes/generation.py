@@ -1,14 +1,61 @@
-from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional
+import asyncio
+import hashlib
 import json
 import secrets
 import random
+import time
+import urllib.parse
+from collections.abc import AsyncIterator
+from functools import partial
 from pathlib import Path
+
+import httpx
+
+from app.core import json_codec
 from app.core.config import settings
-from app.core.limiter import limiter
-from app.services.acestep_client import ACEStepClient, ACEStepError
+from app.core.limiter import get_session_id_or_ip, limiter
+from app.core.metrics import metrics
+from app.core.signing import (
+    signed_audio_url,
+    signing_enabled,
+    verify_audio_signature,
+)
+from app.services.acestep_client import (
+    ACEStepClient,
+    ACEStepError,
+    match_query_items,
+)
+from app.services.audio_cache import AudioCache, AudioCacheEntry, AudioCacheWriter
+from app.services.audio_fanout import AudioFanout
+from app.services.audio_prefetch import AudioPrefetcher
+from app.services.audio_preview import AudioPreviewer
+from app.services.chunking import ChunkSizer, is_identity, upstream_chunks
+from app.services.file_response import MappedFileResponse
+from app.services.download_limiter import (
+    DownloadLimiter,
+    DownloadRejected,
+    DownloadSlot,
+)
+from app.services import audio_preview, waveform
+from app.services.status_poller import StatusPoller
+from app.services.subscription_limiter import SubscriptionLimiter
+from app.services.task_cache import TaskResult, TaskResultCache
+from app.services.task_registry import TaskRegistry
+from app.services.waveform import UnsupportedAudioError, WaveformService
+from app.services.zip_stream import stream_zip
 
 router = APIRouter()
 SESSION_COOKIE_NAME = "session_id"
@@ -17,6 +64,16 @@ SESSION_COOKIE_NAME = "session_id"
 # backend/app/api/routes/generation.py -> backend/app/api/routes -> backend/app/api -> backend/app -> backend -> project_root
 EXAMPLES_ROOT = Path(__file__).parent.parent.parent.parent / "examples"
 
+# Interval between SSE keep-alive comments while a task is still running
+SSE_HEARTBEAT_SECONDS = 15
+
+# Upper bound on the waveform resolution a client may request
+PEAKS_MAX_BUCKETS = 10000
+
+# Generated audio for a (task_id, index) never changes, nor does anything
+# derived from it
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
 # Mapping of vocal_language codes to human-readable names, used to hint
 # the ACE-Step LM about the desired lyrics language in sample_mode.
 _VOCAL_LANGUAGE_NAMES: dict[str, str] = {
@@ -96,6 +153,10 @@ class RandomSampleRequest(BaseModel):
     sample_query: Optional[str] = ""
 
 
+class BulkStatusRequest(BaseModel):
+    task_ids: list[str] = Field(..., min_length=1)
+
+
 class ExampleResponse(BaseModel):
     is_advanced: bool
     prompt: str
@@ -116,6 +177,51 @@ def _get_client(request: Request) -> ACEStepClient:
     return request.app.state.acestep_client
 
 
+def _get_task_cache(request: Request) -> TaskResultCache:
+    """Retrieve the terminal task result cache from app state."""
+    return request.app.state.task_cache
+
+
+def _get_task_registry(request: Request) -> TaskRegistry:
+    """Retrieve the local task registry from app state."""
+    return request.app.state.task_registry
+
+
+def _get_audio_cache(request: Request) -> AudioCache:
+    """Retrieve the on-disk audio cache from app state."""
+    return request.app.state.audio_cache
+
+
+def _get_audio_fanout(request: Request) -> AudioFanout:
+    """Retrieve the shared-download registry from app state."""
+    return request.app.state.audio_fanout
+
+
+def _get_audio_prefetcher(request: Request) -> AudioPrefetcher:
+    """Retrieve the audio prefetch worker pool from app state."""
+    return request.app.state.audio_prefetcher
+
+
+def _get_waveform_service(request: Request) -> WaveformService:
+    """Retrieve the waveform peaks service from app state."""
+    return request.app.state.waveform_service
+
+
+def _get_audio_previewer(request: Request) -> AudioPreviewer:
+    """Retrieve the preview clip generator from app state."""
+    return request.app.state.audio_previewer
+
+
+def _get_download_limiter(request: Request) -> DownloadLimiter:
+    """Retrieve the audio download concurrency limiter from app state."""
+    return request.app.state.download_limiter
+
+
+def _get_status_poller(request: Request) -> StatusPoller:
+    """Retrieve the shared task status poller from app state."""
+    return request.app.state.status_poller
+
+
 def get_session_id(request: Request, response: Response) -> str:
     session_id = request.cookies.get(SESSION_COOKIE_NAME)
     if not session_id:
@@ -184,6 +290,14 @@ _STATUS_MAP = {
     2: "failed",
 }
 
+# Download file extension by upstream content type
+_AUDIO_EXTENSIONS = {
+    "audio/mpeg": "mp3",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/flac": "flac",
+}
+
 
 def _parse_acestep_result(task: dict) -> list[dict]:
     """Parse the stringified JSON 'result' field from the ACE-Step API."""
@@ -191,64 +305,478 @@ def _parse_acestep_result(task: dict) -> list[dict]:
     if not result_str or not isinstance(result_str, str):
         return []
     try:
-        return json.loads(result_str)
-    except json.JSONDecodeError:
+        return json_codec.loads(result_str)
+    except json_codec.JSONDecodeError:
         return []
 
 
-# ── Routes ────────────────────────────────────────────────────────
+def _task_result_from_upstream(task: dict) -> TaskResult:
+    """Convert one /query_result entry into a TaskResult."""
+    result_str = task.get("result")
+    error = task.get("error")
+    return TaskResult(
+        status=task.get("status", 0),
+        results=_parse_acestep_result(task),
+        error=error,
+        size=(len(result_str) if isinstance(result_str, str) else 0)
+        + (len(error) if isinstance(error, str) else 0),
+    )
 
 
-@router.post(
-    "/generate", response_model=GenerationResponse, status_code=status.HTTP_202_ACCEPTED
-)
-@limiter.limit("5/minute")
-async def submit_generation(
+async def fetch_task_results(
+    client: ACEStepClient,
+    cache: TaskResultCache,
+    registry: TaskRegistry,
+    task_ids: list[str],
+) -> dict[str, TaskResult]:
+    """
+    Resolve the status of several tasks with at most one upstream call.
+
+    Terminal results are served from (and stored in) the cache, and every
+    upstream answer is recorded in the task registry. Tasks that upstream
+    does not know about are absent from the returned mapping.
+    Raises ACEStepError on upstream failures.
+    """
+    found: dict[str, TaskResult] = {}
+    missing: list[str] = []
+    for task_id in task_ids:
+        cached = cache.get(task_id)
+        if cached is not None:
+            found[task_id] = cached
+        else:
+            missing.append(task_id)
+
+    if not missing:
+        return found
+
+    result = await client.query_result(missing)
+    matched = match_query_items(result, missing)
+    if matched is None:
+        # Unlabelled entries that cannot be lined up with the IDs: ask for
+        # each task on its own rather than risk mixing them up
+        singles = await asyncio.gather(
+            *(client.query_result([task_id]) for task_id in missing)
+        )
+        matched = {}
+        for task_id, single in zip(missing, singles, strict=True):
+            matched.update(match_query_items(single, [task_id]) or {})
+    for task_id, item in matched.items():
+        task = _task_result_from_upstream(item)
+        cache.put(task_id, task)
+        registry.observe(task_id, task.status, _audio_paths(task))
+        found[task_id] = task
+    return found
+
+
+async def _lookup_task(request: Request, task_id: str) -> TaskResult:
+    """
+    Resolve a task's status, consulting the terminal result cache first.
+
+    Raises HTTPException on upstream errors or when the task is unknown.
+    """
+    try:
+        found = await fetch_task_results(
+            _get_client(request),
+            _get_task_cache(request),
+            _get_task_registry(request),
+            [task_id],
+        )
+    except ACEStepError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    if task_id not in found:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return found[task_id]
+
+
+def _audio_files(task: TaskResult) -> list[str]:
+    """Collect the upstream file paths of a task's generated audio."""
+    audio_files = []
+    for item in task.results:
+        f = item.get("file")
+        if f:
+            # Depending on ACE-Step, it might be a clean string or a raw URL
+            audio_files.append(f)
+    return audio_files
+
+
+def _resolve_audio_path(file: str) -> str:
+    """Turn a result's ``file`` entry into the path argument for /v1/audio."""
+    # Sometimes the ACE-Step API returns the full endpoint string e.g. /v1/audio?path=...
+    # We need to extract the actual path argument
+    if "?path=" in file:
+        return urllib.parse.unquote(file.split("?path=")[1])
+    return file
+
+
+def _audio_paths(task: TaskResult) -> list[str]:
+    """Resolved upstream audio paths of a task, in result order."""
+    return [_resolve_audio_path(f) for f in _audio_files(task)]
+
+
+def _audio_download_headers(task_id: str, content_type: str) -> dict[str, str]:
+    """Content-Disposition (named after the format) and caching for a track."""
+    ext = _AUDIO_EXTENSIONS.get(content_type, "mp3")
+    filename = f"music_{task_id}.{ext}"
+    return {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+    }
+
+
+def _cached_audio_response(
+    request: Request, task_id: str, entry: AudioCacheEntry
+) -> Response:
+    """
+    Serve a cached track with its content-hash ETag.
+
+    ``If-None-Match`` gets 304; MappedFileResponse handles HEAD, Range and
+    If-Range (against the same ETag) itself and sends the file without
+    reading it into Python bytes.
+    """
+    headers = _audio_download_headers(task_id, entry.content_type)
+    headers["ETag"] = entry.etag
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        metrics.inc("audio_not_modified_total")
+        return Response(
+            status_code=304,
+            headers={"ETag": entry.etag, "Cache-Control": headers["Cache-Control"]},
+        )
+    return MappedFileResponse(
+        entry.path, media_type=entry.content_type, headers=headers
+    )
+
+
+async def _uncached_audio_head(
+    request: Request, task_id: str, index: int, path: str | None
+) -> Response:
+    """HEAD for a file that is not cached: upstream's headers, no body."""
+    slot = await _acquire_download_slot(request)
+    try:
+        resp = await _open_audio_upstream(request, task_id, index, path=path)
+        await resp.aclose()
+    finally:
+        slot.release()
+    content_type = resp.headers.get("content-type", "audio/mpeg")
+    headers = _audio_download_headers(task_id, content_type)
+    headers["Accept-Ranges"] = "bytes"
+    headers.update(_passthrough_headers(resp, decoded=True))
+    head = Response(status_code=200, media_type=content_type, headers=headers)
+    if "Content-Length" not in headers:
+        # Unknown until downloaded; do not claim an empty body
+        del head.headers["content-length"]
+    return head
+
+
+def _check_audio_signature(request: Request, task_id: str, index: int) -> str | None:
+    """
+    Check a signed audio URL: "valid", "expired", "invalid" or None if unsigned.
+
+    Signatures are ignored (the URL is treated as unsigned) while signing
+    is disabled for want of a real SESSION_SECRET.
+    """
+    params = request.query_params
+    signature = params.get("sig")
+    if signature is None or not signing_enabled():
+        return None
+    path = params.get("path")
+    try:
+        expires = int(params.get("expires", ""))
+    except ValueError:
+        return "invalid"
+    if path is None or not verify_audio_signature(
+        task_id, index, path, expires, signature
+    ):
+        return "invalid"
+    return "expired" if expires < time.time() else "valid"
+
+
+def _signed_audio_path(request: Request, task_id: str, index: int) -> str | None:
+    """
+    The upstream path carried by a signed audio URL.
+
+    Returns None for unsigned or expired URLs (the path is then looked up as
+    usual, as old URLs may come from a cached status response) and raises
+    403 for a signature that does not match, or for a signed path that is
+    not one of the task's files when the registry knows them.
+    """
+    result = _check_audio_signature(request, task_id, index)
+    if result is None:
+        return None
+    path = request.query_params["path"]
+    if result == "valid":
+        known = _get_task_registry(request).audio_paths(task_id)
+        if known is not None and (index >= len(known) or known[index] != path):
+            result = "mismatch"
+    metrics.inc(f'audio_url_signatures_total{{result="{result}"}}')
+    if result in ("invalid", "mismatch"):
+        raise HTTPException(status_code=403, detail="Invalid audio URL signature.")
+    return path if result == "valid" else None
+
+
+def _is_signed_audio_request(request: Request) -> bool:
+    """Whether an audio download carries a valid signature (no rate limit)."""
+    try:
+        index = int(request.query_params.get("index", "0"))
+    except ValueError:
+        return False
+    result = _check_audio_signature(request, request.path_params["task_id"], index)
+    return result == "valid"
+
+
+async def _open_audio_upstream(
     request: Request,
-    response: Response,
-    gen_request: GenerationRequest,
-):
-    """Submit a music generation task to the ACE-Step API."""
-    get_session_id(request, response)  # ensure session cookie is set
+    task_id: str,
+    index: int,
+    byte_range: str | None = None,
+    path: str | None = None,
+) -> httpx.Response:
+    """
+    Resolve a task's audio path and open its upstream download stream.
 
-    payload = _build_release_task_payload(gen_request)
-    client = _get_client(request)
+    ``path`` is a path already verified by a signed URL; without it the
+    path is taken from the registry or an upstream lookup.
+    """
+    if path is None:
+        # Prevent SSRF: only paths reported by upstream for this task are
+        # served. The local registry knows them for tasks already seen
+        # completed.
+        audio_paths = _get_task_registry(request).audio_paths(task_id)
+        if audio_paths is None:
+            audio_paths = _audio_paths(await _lookup_task(request, task_id))
+
+        if not audio_paths or index >= len(audio_paths):
+            raise HTTPException(status_code=404, detail="Audio file not found")
+        path = audio_paths[index]
 
     try:
-        result = await client.submit_task(payload)
+        return await _get_client(request).download_audio_stream(
+            path, byte_range=byte_range
+        )
     except ACEStepError as e:
         raise HTTPException(status_code=e.status_code, detail=e.message)
 
-    task_id = result.get("task_id", "")
-    queue_position = result.get("queue_position")
 
-    return GenerationResponse(
-        task_id=task_id,
-        status="queued",
-        queue_position=queue_position,
+async def _cached_audio(request: Request, task_id: str, index: int) -> AudioCacheEntry:
+    """
+    A task's audio file from the local cache, downloading it if needed.
+
+    The download holds one of the session's download slots until the file
+    is complete, like any other upstream stream. When the file cannot be
+    cached (caching is off, or upstream's length exceeds the cache) this
+    fails with 503 before downloading it rather than after.
+    """
+    audio_cache = _get_audio_cache(request)
+    entry = audio_cache.get(task_id, index)
+    if entry is not None:
+        return entry
+    if not audio_cache.enabled:
+        raise _not_cacheable()
+
+    slot = await _acquire_download_slot(request)
+    try:
+        download = await _get_audio_fanout(request).open(
+            task_id,
+            index,
+            lambda: _open_audio_upstream(request, task_id, index),
+        )
+        if not download.caching:
+            download.close_if_unread()
+            raise _not_cacheable()
+        if not await download.wait():
+            raise HTTPException(status_code=502, detail="Audio download failed.")
+    except ACEStepError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    finally:
+        slot.release()
+
+    entry = audio_cache.get(task_id, index)
+    if entry is None:
+        raise _not_cacheable()
+    return entry
+
+
+def _not_cacheable() -> HTTPException:
+    return HTTPException(
+        status_code=503, detail="Audio file could not be stored for processing."
     )
 
 
-@router.get("/jobs/{task_id}")
-@limiter.limit("60/minute")
-async def get_job_status(task_id: str, request: Request, response: Response):
-    """Query the status of a generation task."""
-    get_session_id(request, response)
-    client = _get_client(request)
+async def _audio_chunks(
+    request: Request, task_id: str, index: int
+) -> AsyncIterator[bytes]:
+    """A task's audio file as chunks, from the cache or a shared download."""
+    entry = _get_audio_cache(request).get(task_id, index)
+    if entry is not None:
+        sizer = ChunkSizer()
+        with await asyncio.to_thread(open, entry.path, "rb") as f:
+            while chunk := await asyncio.to_thread(f.read, sizer.size):
+                started = time.perf_counter()
+                yield chunk
+                sizer.record(len(chunk), time.perf_counter() - started)
+        return
 
     try:
-        result = await client.query_result([task_id])
+        download = await _get_audio_fanout(request).open(
+            task_id,
+            index,
+            lambda: _open_audio_upstream(request, task_id, index),
+        )
     except ACEStepError as e:
         raise HTTPException(status_code=e.status_code, detail=e.message)
+    async for chunk in download.reader():
+        yield chunk
 
-    # result is a list of task statuses; we requested one
-    tasks = result if isinstance(result, list) else [result]
-    if not tasks:
-        raise HTTPException(status_code=404, detail="Task not found")
 
-    task = tasks[0] if isinstance(tasks, list) else tasks
-    status_code = task.get("status", 0)
-    mapped_status = _STATUS_MAP.get(status_code, "processing")
+async def _acquire_download_slot(request: Request) -> DownloadSlot:
+    """
+    A download slot for the client, or 503 with Retry-After.
+
+    Slots are counted per rate-limit key (session cookie, else IP address):
+    audio responses do not set the session cookie, so a fresh session ID per
+    cookieless request would never reach the per-session limit.
+    """
+    try:
+        return await _get_download_limiter(request).acquire(
+            get_session_id_or_ip(request)
+        )
+    except DownloadRejected as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many downloads in progress. Please try again shortly.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+async def _release_after(
+    body: AsyncIterator[bytes], slot: DownloadSlot
+) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        slot.release()
+
+
+def _hold_slot(response: Response, slot: DownloadSlot) -> Response:
+    """Keep ``slot`` until a streamed body ends; release it now otherwise."""
+    if isinstance(response, StreamingResponse):
+        response.body_iterator = _release_after(response.body_iterator, slot)
+    else:
+        slot.release()
+    return response
+
+
+def _passthrough_headers(resp: httpx.Response, decoded: bool) -> dict[str, str]:
+    """
+    Upstream body headers that stay valid for what we forward.
+
+    ``decoded`` means the body is relayed after removing any content-encoding,
+    in which case upstream's encoded Content-Length no longer applies.
+    Upstream's ETag is not passed on: once cached, the same file is served
+    with its content hash as ETag, and one resource must not have two strong
+    validators. The hash is only known when the download completes.
+    """
+    headers = {}
+    identity = is_identity(resp)
+    if (identity or not decoded) and (length := resp.headers.get("content-length")):
+        headers["Content-Length"] = length
+    if not identity and not decoded:
+        headers["Content-Encoding"] = resp.headers["content-encoding"]
+    return headers
+
+
+async def _fill_audio_cache(
+    resp: httpx.Response, writer: AudioCacheWriter
+) -> AudioCacheEntry | None:
+    """Download a whole upstream body into the cache before responding."""
+    try:
+        async for chunk in upstream_chunks(resp):
+            await writer.write(chunk)
+    except httpx.HTTPError:
+        await writer.abort()
+        return None
+    finally:
+        await resp.aclose()
+    return await writer.commit()
+
+
+async def _download_uncached_audio(
+    request: Request,
+    task_id: str,
+    index: int,
+    byte_range: str | None,
+    path: str | None,
+) -> Response:
+    """download_audio for a file that is not in the local cache."""
+    audio_cache = _get_audio_cache(request)
+    if not byte_range:
+        # Concurrent downloads of the same file share one upstream stream
+        try:
+            download = await _get_audio_fanout(request).open(
+                task_id,
+                index,
+                lambda: _open_audio_upstream(request, task_id, index, path=path),
+            )
+        except ACEStepError as e:
+            # Joined a download started by the prefetcher that failed to open
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+        headers = _audio_download_headers(task_id, download.content_type)
+        headers["Accept-Ranges"] = "bytes"
+        if download.content_length:
+            headers["Content-Length"] = download.content_length
+        return StreamingResponse(
+            download.reader(),
+            media_type=download.content_type,
+            headers=headers,
+        )
+
+    resp = await _open_audio_upstream(request, task_id, index, byte_range, path)
+    content_type = resp.headers.get("content-type", "audio/mpeg")
+    content_length = resp.headers.get("content-length")
+    headers = _audio_download_headers(task_id, content_type)
+    headers["Accept-Ranges"] = "bytes"
+
+    if resp.status_code == 206:
+        # Upstream served the range itself; a partial body is never cached,
+        # so it is passed through byte for byte
+        headers["Content-Range"] = resp.headers.get("content-range", "")
+        headers.update(_passthrough_headers(resp, decoded=False))
+        download = _get_audio_fanout(request).spool(resp, raw=True)
+        return StreamingResponse(
+            download.reader(),
+            status_code=206,
+            media_type=content_type,
+            headers=headers,
+        )
+
+    writer = audio_cache.writer(
+        task_id,
+        index,
+        content_type,
+        expected_size=int(content_length) if content_length else None,
+    )
+
+    if byte_range and writer is not None and content_length:
+        # Upstream ignored the range: fetch the whole file into the cache,
+        # then answer the range from disk.
+        entry = await _fill_audio_cache(resp, writer)
+        if entry is None:
+            raise HTTPException(status_code=502, detail="Audio download failed.")
+        return _cached_audio_response(request, task_id, entry)
+
+    headers.update(_passthrough_headers(resp, decoded=True))
+    download = _get_audio_fanout(request).spool(resp, writer)
+    return StreamingResponse(
+        download.reader(),
+        media_type=content_type,
+        headers=headers,
+    )
+
+
+def _build_status_response(task_id: str, task: TaskResult) -> dict:
+    """Shape a TaskResult into the user-facing job status payload."""
+    mapped_status = _STATUS_MAP.get(task.status, "processing")
 
     response_data: dict = {
         "task_id": task_id,
@@ -256,8 +784,8 @@ async def get_job_status(task_id: str, request: Request, response: Response):
     }
 
     if mapped_status == "completed":
-        parsed_results = _parse_acestep_result(task)
-        audio_files = []
+        parsed_results = task.results
+        audio_files = _audio_files(task)
         metadata = {}
 
         if parsed_results:
@@ -275,94 +803,594 @@ async def get_job_status(task_id: str, request: Request, response: Response):
             # Filter out empty metadata fields
             metadata = {k: v for k, v in metadata.items() if v is not None}
 
-            # Collect all file paths
-            for item in parsed_results:
-                f = item.get("file")
-                if f:
-                    # Depending on ACE-Step, it might be a clean string or a raw URL
-                    audio_files.append(f)
-
         if audio_files:
-            response_data["audio_url"] = f"/api/audio/{task_id}?index=0"
+            audio_urls = [
+                signed_audio_url(task_id, i, _resolve_audio_path(f))
+                for i, f in enumerate(audio_files)
+            ]
+            response_data["audio_url"] = audio_urls[0]
             if len(audio_files) > 1:
-                response_data["audio_urls"] = [
-                    f"/api/audio/{task_id}?index={i}" for i in range(len(audio_files))
-                ]
+                response_data["audio_urls"] = audio_urls
+                response_data["bundle_url"] = f"/api/audio/{task_id}/bundle.zip"
 
         if metadata:
             response_data["metadata"] = metadata
 
     elif mapped_status == "failed":
-        response_data["error"] = task.get("error", "Generation failed")
+        response_data["error"] = task.error or "Generation failed"
 
     return response_data
 
 
-@router.get("/audio/{task_id}")
-@limiter.limit("20/minute")
-async def download_audio(
-    task_id: str,
+def _compute_etag(payload: dict) -> str:
+    """Stable strong ETag for a JSON payload."""
+    encoded = json_codec.dumps(payload, sort_keys=True)
+    return f'"{hashlib.blake2b(encoded, digest_size=12).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluate an If-None-Match header against ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in {
+        tag.removeprefix("W/") for tag in candidates
+    }
+
+
+async def _bulk_status(request: Request, task_ids: list[str]) -> dict:
+    """Resolve many task statuses with a single upstream query_result."""
+    task_ids = list(dict.fromkeys(tid.strip() for tid in task_ids if tid.strip()))
+    if not task_ids:
+        raise HTTPException(status_code=422, detail="At least one task ID is required")
+    if len(task_ids) > settings.BULK_STATUS_MAX_IDS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.BULK_STATUS_MAX_IDS} task IDs per request",
+        )
+
+    try:
+        found = await fetch_task_results(
+            _get_client(request),
+            _get_task_cache(request),
+            _get_task_registry(request),
+            task_ids,
+        )
+    except ACEStepError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    return {
+        "jobs": [
+            _build_status_response(tid, found[tid]) for tid in task_ids if tid in found
+        ],
+        "not_found": [tid for tid in task_ids if tid not in found],
+    }
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    """Return once the client has gone away."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _wait_for_change(
+    request: Request, task_id: str, task: TaskResult, timeout: float
+) -> TaskResult:
+    """
+    Block until the task's status moves away from ``task`` or ``timeout`` expires.
+
+    Waiters share the status poller's upstream loop. Returns early (with the
+    unchanged status) if the client disconnects.
+    """
+    poller = _get_status_poller(request)
+    queue: asyncio.Queue = asyncio.Queue()
+    poller.subscribe(task_id, queue, current=task)
+    update = asyncio.ensure_future(queue.get())
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        done, _ = await asyncio.wait(
+            {update, disconnect}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        if update in done:
+            return update.result()[1]
+        return task
+    finally:
+        update.cancel()
+        disconnect.cancel()
+        poller.unsubscribe(task_id, queue)
+
+
+def _format_sse(payload: dict, event: str = "status") -> str:
+    """Encode a payload as one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json_codec.dumps(payload).decode()}\n\n"
+
+
+def _status_message(task_id: str, task: TaskResult) -> dict:
+    """Wrap a status payload as a WebSocket message."""
+    return {"type": "status", **_build_status_response(task_id, task)}
+
+
+# ── Routes ────────────────────────────────────────────────────────
+
+
+@router.post(
+    "/generate", response_model=GenerationResponse, status_code=status.HTTP_202_ACCEPTED
+)
+@limiter.limit("5/minute")
+async def submit_generation(
     request: Request,
     response: Response,
-    index: int = Query(0, description="Index of the audio file to download", ge=0),
+    gen_request: GenerationRequest,
 ):
-    """Proxy-download generated audio from the ACE-Step API via a stream."""
-    get_session_id(request, response)
+    """Submit a music generation task to the ACE-Step API."""
+    session_id = get_session_id(request, response)  # ensure session cookie is set
+
+    payload = _build_release_task_payload(gen_request)
     client = _get_client(request)
 
     try:
-        # Prevent SSRF: Lookup actual path using the task ID
-        result = await client.query_result([task_id])
-        tasks = result if isinstance(result, list) else [result]
-        if not tasks:
-            raise HTTPException(status_code=404, detail="Task not found")
-        task = tasks[0] if isinstance(tasks, list) else tasks
-        parsed_results = _parse_acestep_result(task)
-        audio_files = []
-        for item in parsed_results:
-            f = item.get("file")
-            if f:
-                audio_files.append(f)
-
-        if not audio_files or index >= len(audio_files):
-            raise HTTPException(status_code=404, detail="Audio file not found")
+        result = await client.submit_task(payload)
+    except ACEStepError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
 
-        safe_path = audio_files[index]
-        # Sometimes the ACE-Step API returns the full endpoint string e.g. /v1/audio?path=...
-        # We need to extract the actual path argument
-        if "?path=" in safe_path:
-            safe_path = safe_path.split("?path=")[1]
-            import urllib.parse
+    task_id = result.get("task_id", "")
+    queue_position = result.get("queue_position")
+    if task_id:
+        _get_task_registry(request).register(
+            task_id, session_id, gen_request.model_dump(exclude_defaults=True)
+        )
 
-            safe_path = urllib.parse.unquote(safe_path)
+    return GenerationResponse(
+        task_id=task_id,
+        status="queued",
+        queue_position=queue_position,
+    )
 
-        resp = await client.download_audio_stream(safe_path)
-    except ACEStepError as e:
-        raise HTTPException(status_code=e.status_code, detail=e.message)
 
-    content_type = resp.headers.get("content-type", "audio/mpeg")
+@router.get("/jobs")
+@limiter.limit("60/minute")
+async def get_jobs_status(
+    request: Request,
+    response: Response,
+    ids: str = Query(..., description="Comma-separated task IDs"),
+):
+    """Query the status of several generation tasks at once."""
+    get_session_id(request, response)
+    return await _bulk_status(request, ids.split(","))
+
+
+@router.post("/jobs")
+@limiter.limit("60/minute")
+async def query_jobs_status(
+    request: Request, response: Response, body: BulkStatusRequest
+):
+    """Query the status of several generation tasks (for long ID lists)."""
+    get_session_id(request, response)
+    return await _bulk_status(request, body.task_ids)
+
 
-    # Determine file extension from content type
-    ext_map = {
-        "audio/mpeg": "mp3",
-        "audio/wav": "wav",
-        "audio/x-wav": "wav",
-        "audio/flac": "flac",
+def _status_max_age() -> int:
+    """
+    How long a client may reuse a terminal status response.
+
+    Only browser caches may keep it (``private``): the response can set
+    the session cookie. It must not outlive the signed audio URLs inside,
+    which stay valid for at least one TTL.
+    """
+    max_age = settings.STATUS_CACHE_MAX_AGE_SECONDS
+    if settings.AUDIO_URL_TTL_SECONDS > 0 and signing_enabled():
+        max_age = min(max_age, settings.AUDIO_URL_TTL_SECONDS)
+    return max_age
+
+
+@router.get("/jobs/{task_id}")
+@limiter.limit("60/minute")
+async def get_job_status(
+    task_id: str,
+    request: Request,
+    response: Response,
+    wait: float = Query(
+        0,
+        ge=0,
+        le=settings.LONG_POLL_MAX_WAIT_SECONDS,
+        description="Seconds to hold the request until the status changes",
+    ),
+):
+    """
+    Query the status of a generation task.
+
+    With ``wait`` set, a running task's request is held server-side until
+    its status changes or the timeout expires (long-polling).
+    """
+    get_session_id(request, response)
+    task = await _lookup_task(request, task_id)
+    if wait > 0 and not task.is_terminal:
+        task = await _wait_for_change(request, task_id, task, wait)
+
+    payload = _build_status_response(task_id, task)
+    headers = {
+        "ETag": _compute_etag(payload),
+        # Terminal statuses never change; running ones must be revalidated
+        "Cache-Control": (
+            f"private, max-age={_status_max_age()}" if task.is_terminal else "no-cache"
+        ),
     }
-    ext = ext_map.get(content_type, "mp3")
-    filename = f"music_{task_id}.{ext}"
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return payload
 
-    async def stream_generator():
+
+@router.get("/jobs/{task_id}/events")
+@limiter.limit("30/minute")
+async def stream_job_status(task_id: str, request: Request, response: Response):
+    """
+    Stream status transitions of a generation task as Server-Sent Events.
+
+    Sends the current status immediately, then one event per transition
+    until the task completes or fails. Updates come from the shared status
+    poller rather than a per-connection upstream poll.
+    """
+    get_session_id(request, response)
+    task = await _lookup_task(request, task_id)
+    poller = _get_status_poller(request)
+
+    async def event_stream():
+        yield _format_sse(_build_status_response(task_id, task))
+        if task.is_terminal:
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        poller.subscribe(task_id, queue, current=task)
         try:
-            async for chunk in resp.aiter_bytes(chunk_size=65536):
-                yield chunk
+            while True:
+                try:
+                    _, update = await asyncio.wait_for(
+                        queue.get(), SSE_HEARTBEAT_SECONDS
+                    )
+                except TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _format_sse(_build_status_response(task_id, update))
+                if update.is_terminal:
+                    return
         finally:
-            await resp.aclose()
+            poller.unsubscribe(task_id, queue)
 
     return StreamingResponse(
-        stream_generator(),
-        media_type=content_type,
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/jobs/ws")
+async def job_status_socket(websocket: WebSocket):
+    """
+    Multiplexed status updates for many tasks over one WebSocket.
+
+    Clients send ``{"action": "subscribe" | "unsubscribe", "task_ids": [...]}``.
+    The server replies with the current status of each newly subscribed task,
+    then one ``{"type": "status", ...}`` message per transition (same shape as
+    GET /api/jobs/{task_id}) until the task completes or fails. Subscribe
+    actions look tasks up upstream; they and the number of subscriptions
+    held are limited per session (or IP) across all its connections.
+    """
+    await websocket.accept()
+    state = websocket.app.state
+    poller: StatusPoller = state.status_poller
+    limits: SubscriptionLimiter = state.subscription_limiter
+    client_key = get_session_id_or_ip(websocket)
+
+    # Everything sent to the client goes through this queue: dict messages
+    # from the reader below, (task_id, TaskResult) tuples from the poller.
+    outbox: asyncio.Queue = asyncio.Queue()
+    subscribed: set[str] = set()
+
+    def drop(task_id: str) -> None:
+        subscribed.discard(task_id)
+        limits.release(client_key)
+
+    async def forward_messages():
+        while True:
+            item = await outbox.get()
+            if isinstance(item, tuple):
+                task_id, update = item
+                if task_id not in subscribed:
+                    continue
+                if update.is_terminal:
+                    drop(task_id)
+                item = _status_message(task_id, update)
+            try:
+                await websocket.send_text(json_codec.dumps(item).decode())
+            except (WebSocketDisconnect, RuntimeError):
+                # The client is gone; the reader sees the disconnect and
+                # cleans up
+                return
+
+    async def subscribe(task_ids: list[str]):
+        if not limits.allow_subscribe(client_key):
+            outbox.put_nowait(
+                {"type": "error", "detail": "Rate limit exceeded", "task_ids": task_ids}
+            )
+            return
+        new_ids = [tid for tid in dict.fromkeys(task_ids) if tid not in subscribed]
+        room = limits.room(client_key)
+        if len(new_ids) > room:
+            outbox.put_nowait(
+                {
+                    "type": "error",
+                    "detail": "Subscription limit reached",
+                    "task_ids": new_ids[room:],
+                }
+            )
+            new_ids = new_ids[:room]
+        if not new_ids:
+            return
+
+        try:
+            found = await fetch_task_results(
+                state.acestep_client, state.task_cache, state.task_registry, new_ids
+            )
+        except ACEStepError as e:
+            outbox.put_nowait(
+                {"type": "error", "detail": e.message, "task_ids": new_ids}
+            )
+            return
+
+        for task_id in new_ids:
+            task = found.get(task_id)
+            if task is None:
+                outbox.put_nowait(
+                    {"type": "error", "detail": "Task not found", "task_ids": [task_id]}
+                )
+                continue
+            outbox.put_nowait(_status_message(task_id, task))
+            # Another connection of the session may have taken the room
+            # while the lookup ran
+            if not task.is_terminal and task_id not in subscribed:
+                if not limits.room(client_key):
+                    outbox.put_nowait(
+                        {
+                            "type": "error",
+                            "detail": "Subscription limit reached",
+                            "task_ids": [task_id],
+                        }
+                    )
+                    continue
+                subscribed.add(task_id)
+                limits.hold(client_key)
+                poller.subscribe(task_id, outbox, current=task)
+
+    def unsubscribe(task_ids: list[str]):
+        for task_id in task_ids:
+            if task_id in subscribed:
+                drop(task_id)
+                poller.unsubscribe(task_id, outbox)
+
+    writer = asyncio.create_task(forward_messages())
+    try:
+        while True:
+            try:
+                message = json_codec.loads(await websocket.receive_text())
+                action = message.get("action")
+                task_ids = [str(tid) for tid in message.get("task_ids", [])]
+            except (ValueError, AttributeError, TypeError):
+                outbox.put_nowait({"type": "error", "detail": "Invalid message"})
+                continue
+
+            if action == "subscribe":
+                await subscribe(task_ids)
+            elif action == "unsubscribe":
+                unsubscribe(task_ids)
+            else:
+                outbox.put_nowait({"type": "error", "detail": "Unknown action"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        writer.cancel()
+        unsubscribe(list(subscribed))
+
+
+@router.api_route("/audio/{task_id}", methods=["GET", "HEAD"])
+@limiter.limit("20/minute", exempt_when=_is_signed_audio_request)
+async def download_audio(
+    task_id: str,
+    request: Request,
+    response: Response,
+    index: int = Query(0, description="Index of the audio file to download", ge=0),
+):
+    """
+    Proxy-download generated audio from the ACE-Step API via a stream.
+
+    Files already in the local audio cache are served from disk without any
+    upstream call; misses are streamed from upstream and cached on the way,
+    with concurrent requests for the same file sharing one upstream stream.
+    ``Range`` requests get ``206 Partial Content``: from the cache when the
+    file is local, otherwise from upstream's own range support, falling back
+    to filling the cache first when upstream ignores the range.
+
+    Signed URLs (as issued by the status endpoints) skip the rate limit and
+    the task lookup; a bad signature is rejected with 403.
+
+    Responses are ``immutable``. Cached files carry a content-hash ETag and
+    answer ``If-None-Match`` with 304; HEAD returns size and type only.
+    """
+    get_session_id(request, response)
+    byte_range = request.headers.get("range")
+    signed_path = _signed_audio_path(request, task_id, index)
+
+    cached = _get_audio_cache(request).get(task_id, index)
+    _get_audio_prefetcher(request).record_request(
+        task_id, index, cached=cached is not None
+    )
+    if cached is not None:
+        return _cached_audio_response(request, task_id, cached)
+    if request.method == "HEAD":
+        return await _uncached_audio_head(request, task_id, index, signed_path)
+
+    # Anything not served from disk streams from upstream and needs a slot
+    slot = await _acquire_download_slot(request)
+    try:
+        result = await _download_uncached_audio(
+            request, task_id, index, byte_range, signed_path
+        )
+    except BaseException:
+        slot.release()
+        raise
+    return _hold_slot(result, slot)
+
+
+@router.get("/audio/{task_id}/peaks")
+@limiter.limit("30/minute")
+async def get_audio_peaks(
+    task_id: str,
+    request: Request,
+    response: Response,
+    index: int = Query(0, description="Index of the audio file", ge=0),
+    buckets: int = Query(
+        1000, description="Number of min/max pairs", ge=1, le=PEAKS_MAX_BUCKETS
+    ),
+    format: str = Query("json", pattern="^(json|binary)$"),
+):
+    """
+    Waveform peaks of a generated track, for drawing without the full file.
+
+    Returns per-bucket minimum and maximum sample values quantized to signed
+    8-bit (-127..127). ``format=binary`` returns the pairs interleaved as raw
+    int8 bytes (min, max, min, max, ...) with the metadata in headers.
+    """
+    get_session_id(request, response)
+    entry = await _cached_audio(request, task_id, index)
+    if not waveform.supports(entry.content_type):
+        raise HTTPException(
+            status_code=415,
+            detail=f"Waveform peaks are not available for {entry.content_type}.",
+        )
+
+    try:
+        peaks = await _get_waveform_service(request).peaks(entry, buckets)
+    except UnsupportedAudioError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    if format == "binary":
+        body = bytes(
+            value & 0xFF
+            for pair in zip(peaks["min"], peaks["max"], strict=True)
+            for value in pair
+        )
+        return Response(
+            body,
+            media_type="application/octet-stream",
+            headers={
+                "Cache-Control": response.headers["Cache-Control"],
+                "X-Peaks-Buckets": str(peaks["buckets"]),
+                "X-Audio-Duration": str(peaks["duration"]),
+                "X-Audio-Sample-Rate": str(peaks["sample_rate"]),
+                "X-Audio-Channels": str(peaks["channels"]),
+            },
+        )
+    return peaks
+
+
+@router.get("/audio/{task_id}/preview")
+@limiter.limit("60/minute")
+async def get_audio_preview(
+    task_id: str,
+    request: Request,
+    response: Response,
+    index: int = Query(0, description="Index of the audio file", ge=0),
+    seconds: int = Query(
+        settings.AUDIO_PREVIEW_SECONDS,
+        description="Length of the clip from the start of the track",
+        ge=1,
+        le=settings.AUDIO_PREVIEW_MAX_SECONDS,
+    ),
+):
+    """
+    The first seconds of a generated track, for hover / list previews.
+
+    Cut without re-encoding (WAV at a frame boundary, MP3 at a frame header),
+    generated once per track and length and served from disk afterwards.
+    """
+    get_session_id(request, response)
+    entry = await _cached_audio(request, task_id, index)
+    if not audio_preview.supports(entry.content_type):
+        raise HTTPException(
+            status_code=415,
+            detail=f"Previews are not available for {entry.content_type}.",
+        )
+
+    try:
+        path = await _get_audio_previewer(request).preview(entry, seconds)
+    except UnsupportedAudioError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+    ext = _AUDIO_EXTENSIONS.get(entry.content_type, "mp3")
+    return MappedFileResponse(
+        path,
+        media_type=entry.content_type,
+        headers={
+            "Content-Disposition": (
+                f'inline; filename="music_{task_id}_preview.{ext}"'
+            ),
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        },
+    )
+
+
+@router.get("/audio/{task_id}/bundle.zip")
+@limiter.limit("10/minute")
+async def download_audio_bundle(task_id: str, request: Request, response: Response):
+    """
+    Download every audio file of a task as one streamed ZIP archive.
+
+    The task is looked up once; each file is streamed from the local cache
+    or from upstream (through the shared download, which caches it) straight
+    into the archive. A ``metadata.json`` member holds the parsed results.
+    """
+    get_session_id(request, response)
+    task = await _lookup_task(request, task_id)
+    if task.status != 1:
+        raise HTTPException(status_code=409, detail="Task has not completed yet.")
+    audio_paths = _audio_paths(task)
+    if not audio_paths:
+        raise HTTPException(status_code=404, detail="Audio file not found")
+
+    files = []
+    members = []
+    for index, path in enumerate(audio_paths):
+        ext = Path(path).suffix or ".mp3"
+        name = f"music_{task_id}_{index + 1}{ext}"
+        files.append({"index": index, "name": name})
+        members.append((name, partial(_audio_chunks, request, task_id, index)))
+
+    record = _get_task_registry(request).get(task_id)
+    metadata = {
+        "task_id": task_id,
+        "params": record.params if record is not None else None,
+        "files": files,
+        "results": task.results,
+    }
+    metadata_json = json.dumps(metadata, indent=2, ensure_ascii=False).encode()
+
+    async def metadata_member():
+        yield metadata_json
+
+    # The archive reads its files one at a time, so it holds a single slot
+    slot = await _acquire_download_slot(request)
+    return _hold_slot(
+        StreamingResponse(
+            stream_zip([("metadata.json", metadata_member), *members]),
+            media_type="application/zip",
+            headers={
+                "Content-Disposition": f'attachment; filename="music_{task_id}.zip"'
+            },
+        ),
+        slot,
     )
 
 
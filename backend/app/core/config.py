@@ -1,9 +1,17 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 class Settings:
     PROJECT_NAME: str = "AI Music Gen"
     API_V1_STR: str = "/api"
@@ -12,8 +20,113 @@ class Settings:
     ACESTEP_API_URL: str = os.getenv("ACESTEP_API_URL", "")
     ACESTEP_API_KEY: str = os.getenv("ACESTEP_API_KEY", "")
 
+    # Upstream connection pools: control calls (submit, status, health) and
+    # bulk audio downloads never share connections
+    ACESTEP_CONTROL_MAX_CONNECTIONS: int = int(
+        os.getenv("ACESTEP_CONTROL_MAX_CONNECTIONS", "20")
+    )
+    ACESTEP_CONTROL_MAX_KEEPALIVE: int = int(
+        os.getenv("ACESTEP_CONTROL_MAX_KEEPALIVE", "10")
+    )
+    ACESTEP_CONTROL_KEEPALIVE_EXPIRY: float = float(
+        os.getenv("ACESTEP_CONTROL_KEEPALIVE_EXPIRY", "30")
+    )
+    ACESTEP_CONTROL_HTTP2: bool = _env_flag("ACESTEP_CONTROL_HTTP2", True)
+    ACESTEP_BULK_MAX_CONNECTIONS: int = int(
+        os.getenv("ACESTEP_BULK_MAX_CONNECTIONS", "32")
+    )
+    ACESTEP_BULK_MAX_KEEPALIVE: int = int(os.getenv("ACESTEP_BULK_MAX_KEEPALIVE", "8"))
+    ACESTEP_BULK_KEEPALIVE_EXPIRY: float = float(
+        os.getenv("ACESTEP_BULK_KEEPALIVE_EXPIRY", "5")
+    )
+    ACESTEP_BULK_HTTP2: bool = _env_flag("ACESTEP_BULK_HTTP2", False)
+
+    # Micro-batching of concurrent /query_result lookups
+    QUERY_BATCH_WINDOW_MS: float = float(os.getenv("QUERY_BATCH_WINDOW_MS", "10"))
+    QUERY_BATCH_MAX_SIZE: int = int(os.getenv("QUERY_BATCH_MAX_SIZE", "50"))
+
+    # Maximum task IDs accepted by the bulk status endpoints
+    BULK_STATUS_MAX_IDS: int = int(os.getenv("BULK_STATUS_MAX_IDS", "100"))
+
+    # Cache of completed / failed task results
+    TASK_CACHE_MAX_ENTRIES: int = int(os.getenv("TASK_CACHE_MAX_ENTRIES", "5000"))
+    TASK_CACHE_MAX_BYTES: int = int(os.getenv("TASK_CACHE_MAX_BYTES", "67108864"))
+    TASK_CACHE_TTL_SECONDS: float = float(os.getenv("TASK_CACHE_TTL_SECONDS", "3600"))
+
+    # Cache-Control max-age for completed / failed job status responses
+    STATUS_CACHE_MAX_AGE_SECONDS: int = int(
+        os.getenv("STATUS_CACHE_MAX_AGE_SECONDS", "86400")
+    )
+
+    # Local registry of submitted / observed tasks
+    TASK_REGISTRY_TTL_SECONDS: float = float(
+        os.getenv("TASK_REGISTRY_TTL_SECONDS", "86400")
+    )
+    TASK_REGISTRY_MAX_ENTRIES: int = int(
+        os.getenv("TASK_REGISTRY_MAX_ENTRIES", "100000")
+    )
+
+    # On-disk cache of proxied audio files (max bytes 0 disables it)
+    AUDIO_CACHE_DIR: str = os.getenv(
+        "AUDIO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "ai-music-gen", "audio")
+    )
+    AUDIO_CACHE_MAX_BYTES: int = int(os.getenv("AUDIO_CACHE_MAX_BYTES", "2147483648"))
+
+    # In-memory tail kept per shared audio download; slower readers fall
+    # back to the spool file
+    AUDIO_FANOUT_BUFFER_BYTES: int = int(
+        os.getenv("AUDIO_FANOUT_BUFFER_BYTES", "1048576")
+    )
+
+    # Temp files that upstream audio is drained into when it is not going
+    # into the cache; past SPOOL_MAX_BYTES per file upstream is read at the
+    # client's pace (0 disables spooling ahead)
+    SPOOL_DIR: str = os.getenv(
+        "SPOOL_DIR", os.path.join(tempfile.gettempdir(), "ai-music-gen", "spool")
+    )
+    SPOOL_MAX_BYTES: int = int(os.getenv("SPOOL_MAX_BYTES", "268435456"))
+
+    # Background download of audio for newly completed tasks (0 workers
+    # disables it)
+    AUDIO_PREFETCH_CONCURRENCY: int = int(os.getenv("AUDIO_PREFETCH_CONCURRENCY", "4"))
+    AUDIO_PREFETCH_QUEUE_SIZE: int = int(os.getenv("AUDIO_PREFETCH_QUEUE_SIZE", "256"))
+
+    # Concurrent audio downloads streamed from upstream, with a short wait
+    # queue; requests that cannot start in time get 503 + Retry-After
+    DOWNLOAD_MAX_STREAMS: int = int(os.getenv("DOWNLOAD_MAX_STREAMS", "64"))
+    DOWNLOAD_MAX_STREAMS_PER_SESSION: int = int(
+        os.getenv("DOWNLOAD_MAX_STREAMS_PER_SESSION", "4")
+    )
+    DOWNLOAD_QUEUE_SIZE: int = int(os.getenv("DOWNLOAD_QUEUE_SIZE", "32"))
+    DOWNLOAD_QUEUE_TIMEOUT_SECONDS: float = float(
+        os.getenv("DOWNLOAD_QUEUE_TIMEOUT_SECONDS", "2")
+    )
+    DOWNLOAD_RETRY_AFTER_SECONDS: int = int(
+        os.getenv("DOWNLOAD_RETRY_AFTER_SECONDS", "5")
+    )
+
+    # Preview clips cut from the start of a track
+    AUDIO_PREVIEW_SECONDS: int = int(os.getenv("AUDIO_PREVIEW_SECONDS", "10"))
+    AUDIO_PREVIEW_MAX_SECONDS: int = int(os.getenv("AUDIO_PREVIEW_MAX_SECONDS", "30"))
+
+    # Worker processes computing waveform peaks
+    WAVEFORM_WORKERS: int = int(os.getenv("WAVEFORM_WORKERS", "2"))
+
+    # Shared status poller behind the push endpoints (SSE, long-poll, WebSocket)
+    STATUS_POLL_INTERVAL_SECONDS: float = float(
+        os.getenv("STATUS_POLL_INTERVAL_SECONDS", "2")
+    )
+    WS_MAX_SUBSCRIPTIONS: int = int(os.getenv("WS_MAX_SUBSCRIPTIONS", "64"))
+    WS_SUBSCRIBES_PER_MINUTE: int = int(os.getenv("WS_SUBSCRIBES_PER_MINUTE", "30"))
+    LONG_POLL_MAX_WAIT_SECONDS: float = float(
+        os.getenv("LONG_POLL_MAX_WAIT_SECONDS", "30")
+    )
+
     # Security
     SESSION_SECRET: str = os.getenv("SESSION_SECRET", "super-secret-key")
+    # Lifetime of the signed audio URLs in status responses (0 disables
+    # signing); URLs stay valid for one to two TTLs
+    AUDIO_URL_TTL_SECONDS: int = int(os.getenv("AUDIO_URL_TTL_SECONDS", "3600"))
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:3000")
 
 
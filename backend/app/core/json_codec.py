@@ -0,0 +1,45 @@
+"""
+JSON encoding / decoding with an optional fast path.
+
+Uses orjson, a regular dependency, and falls back to the standard library
+where it is not installed (e.g. a platform without orjson wheels). Both
+backends raise ``json.JSONDecodeError`` (orjson's error type subclasses it)
+and produce UTF-8 bytes from ``dumps``.
+"""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse as _StarletteJSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: str | bytes | bytearray) -> Any:
+    """Decode a JSON document."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """Encode ``obj`` as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(
+        obj, sort_keys=sort_keys, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+class JSONResponse(_StarletteJSONResponse):
+    """Default API response class, rendered with the fast codec."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
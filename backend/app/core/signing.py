@@ -0,0 +1,78 @@
+"""
+HMAC-signed audio URLs.
+
+Status responses link each audio file as
+``/api/audio/{task_id}?index=..&path=..&expires=..&sig=..`` where ``sig`` is
+an HMAC-SHA256 over the task, index, resolved upstream path and expiry,
+keyed from ``SESSION_SECRET``. The audio route trusts a valid signature in
+place of looking the task up again, and the URL carries only the upstream
+file path, never the upstream host.
+
+Expiry times are rounded up to a multiple of the TTL, so every status
+response for a task within one TTL window carries the same URLs (and the
+same status ETag). A URL stays valid for between one and two TTLs.
+
+A signature lets the holder choose which upstream file is fetched, so URLs
+are only signed, and signatures only accepted, when ``SESSION_SECRET`` has
+been set to something other than the shipped default or placeholder.
+"""
+
+import hashlib
+import hmac
+import time
+import urllib.parse
+
+from app.core.config import settings
+
+# Values of SESSION_SECRET that are public and must not key anything
+_INSECURE_SECRETS = frozenset({"", "super-secret-key", "your_session_secret_here"})
+
+
+def signing_enabled() -> bool:
+    """Whether SESSION_SECRET is good enough to sign audio URLs with."""
+    return settings.SESSION_SECRET.strip() not in _INSECURE_SECRETS
+
+
+def _key() -> bytes:
+    # Derived so the session secret is never used directly for another purpose
+    return hmac.new(
+        settings.SESSION_SECRET.encode(), b"audio-url", hashlib.sha256
+    ).digest()
+
+
+def audio_signature(task_id: str, index: int, path: str, expires: int) -> str:
+    message = f"{task_id}\n{index}\n{path}\n{expires}".encode()
+    return hmac.new(_key(), message, hashlib.sha256).hexdigest()
+
+
+def signed_audio_url(
+    task_id: str,
+    index: int,
+    path: str,
+    ttl: int = settings.AUDIO_URL_TTL_SECONDS,
+    now: float | None = None,
+) -> str:
+    """Audio URL for one file; unsigned when ``ttl`` is 0 or signing is off."""
+    if ttl <= 0 or not signing_enabled():
+        return f"/api/audio/{task_id}?index={index}"
+    now = time.time() if now is None else now
+    expires = (int(now) // ttl + 2) * ttl
+    query = urllib.parse.urlencode(
+        {
+            "index": index,
+            "path": path,
+            "expires": expires,
+            "sig": audio_signature(task_id, index, path, expires),
+        }
+    )
+    return f"/api/audio/{task_id}?{query}"
+
+
+def verify_audio_signature(
+    task_id: str, index: int, path: str, expires: int, signature: str
+) -> bool:
+    """Whether ``signature`` matches (compared in constant time)."""
+    if not signing_enabled():
+        return False
+    expected = audio_signature(task_id, index, path, expires)
+    return hmac.compare_digest(expected, signature)
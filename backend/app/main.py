@@ -1,16 +1,30 @@
 import logging
 from contextlib import asynccontextmanager
+from functools import partial
 
-import httpx
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings
+from app.core.json_codec import JSONResponse
 from app.core.limiter import limiter
+from app.core.metrics import metrics
+from app.core.signing import signing_enabled
 from app.api.routes import generation
 from app.services.acestep_client import ACEStepClient
+from app.services.audio_cache import AudioCache
+from app.services.audio_fanout import AudioFanout
+from app.services.audio_prefetch import AudioPrefetcher
+from app.services.audio_preview import AudioPreviewer
+from app.services.download_limiter import DownloadLimiter
+from app.services.http_pools import create_pool
+from app.services.status_poller import StatusPoller
+from app.services.subscription_limiter import SubscriptionLimiter
+from app.services.task_cache import TaskResultCache
+from app.services.task_registry import TaskRegistry
+from app.services.waveform import WaveformService
 
 # Ensure app-level loggers are visible (uvicorn only configures its own loggers)
 logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s:%(message)s")
@@ -19,16 +33,57 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Manage the lifecycle of the shared httpx client and ACE-Step client."""
-    async with httpx.AsyncClient(http2=True) as http_client:
-        app.state.acestep_client = ACEStepClient(http_client)
+    """Manage the lifecycle of the upstream connection pools and ACE-Step client."""
+    if not signing_enabled():
+        logger.warning(
+            "SESSION_SECRET is unset or a placeholder: audio URLs are not signed"
+        )
+    control_pool = create_pool(
+        "control",
+        max_connections=settings.ACESTEP_CONTROL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.ACESTEP_CONTROL_MAX_KEEPALIVE,
+        keepalive_expiry=settings.ACESTEP_CONTROL_KEEPALIVE_EXPIRY,
+        http2=settings.ACESTEP_CONTROL_HTTP2,
+    )
+    bulk_pool = create_pool(
+        "bulk",
+        max_connections=settings.ACESTEP_BULK_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.ACESTEP_BULK_MAX_KEEPALIVE,
+        keepalive_expiry=settings.ACESTEP_BULK_KEEPALIVE_EXPIRY,
+        http2=settings.ACESTEP_BULK_HTTP2,
+    )
+    async with control_pool as http_client, bulk_pool as bulk_client:
+        client = ACEStepClient(http_client, bulk_client)
+        audio_cache = AudioCache()
+        audio_fanout = AudioFanout(audio_cache)
+        audio_prefetcher = AudioPrefetcher(client, audio_cache, audio_fanout)
+        task_cache = TaskResultCache()
+        task_registry = TaskRegistry(on_complete=audio_prefetcher.schedule)
+        app.state.acestep_client = client
+        app.state.task_cache = task_cache
+        app.state.task_registry = task_registry
+        app.state.audio_cache = audio_cache
+        app.state.audio_fanout = audio_fanout
+        app.state.audio_prefetcher = audio_prefetcher
+        app.state.audio_previewer = AudioPreviewer(audio_cache)
+        app.state.download_limiter = DownloadLimiter()
+        app.state.waveform_service = WaveformService(audio_cache)
+        app.state.status_poller = StatusPoller(
+            partial(generation.fetch_task_results, client, task_cache, task_registry)
+        )
+        app.state.subscription_limiter = SubscriptionLimiter()
         yield
+        await app.state.status_poller.close()
+        await audio_prefetcher.close()
+        await audio_fanout.close()
+        app.state.waveform_service.close()
 
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     lifespan=lifespan,
+    default_response_class=JSONResponse,
 )
 
 # CORS
@@ -66,3 +121,9 @@ async def health_check():
     except Exception:
         result["upstream"] = "unreachable"
     return result
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """In-process counters, gauges and summaries for batching and caching."""
+    return metrics.snapshot()
@@ -5,12 +5,17 @@ Async HTTP client that replaces modal_client.py, job_queue.py, and storage.py.
 All music generation is delegated to the deployed ACE-Step REST API.
 """
 
+import asyncio
+import json
 import logging
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 import httpx
 
+from app.core import json_codec
 from app.core.config import settings
+from app.core.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -28,13 +33,52 @@ class ACEStepError(Exception):
         super().__init__(message)
 
 
+def match_query_items(result: Any, task_ids: list[str]) -> dict[str, Any] | None:
+    """
+    Map /query_result entries to the task IDs they describe.
+
+    Entries without a ``task_id`` are matched by position, which is only
+    safe when upstream answered for every requested ID (it may leave out
+    unknown tasks); returns None when such entries cannot be matched.
+    """
+    items = result if isinstance(result, list) else [result]
+    matched: dict[str, Any] = {}
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        task_id = item.get("task_id")
+        if task_id is None:
+            if len(items) != len(task_ids):
+                return None
+            task_id = task_ids[position]
+        matched[task_id] = item
+    return matched
+
+
 class ACEStepClient:
     """Async HTTP client for the ACE-Step Modal REST API."""
 
-    def __init__(self, http_client: httpx.AsyncClient):
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        bulk_client: httpx.AsyncClient | None = None,
+    ):
         self.base_url = settings.ACESTEP_API_URL.rstrip("/")
         self.api_key = settings.ACESTEP_API_KEY
         self.client = http_client
+        # Audio downloads get their own pool when one is given
+        self.bulk_client = bulk_client or http_client
+
+        # Pending /query_result callers: (task_ids, future, enqueue time)
+        self.batch_window = max(settings.QUERY_BATCH_WINDOW_MS, 0) / 1000
+        self.batch_max_size = max(settings.QUERY_BATCH_MAX_SIZE, 1)
+        self._pending_queries: list[tuple[list[str], asyncio.Future, float]] = []
+        self._pending_query_ids = 0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+        # In-flight idempotent requests keyed by (endpoint, canonical params)
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}
 
     def _headers(self) -> dict[str, str]:
         """Build request headers with optional auth."""
@@ -62,7 +106,7 @@ class ACEStepClient:
             raise ACEStepError("Invalid generation parameters.", 400)
 
         try:
-            body = response.json()
+            body = json_codec.loads(response.content)
         except Exception:
             logger.error(
                 "Non-JSON response from upstream (status=%s, body=%s)",
@@ -80,6 +124,34 @@ class ACEStepClient:
             )
         return body.get("data", body)
 
+    async def _single_flight(
+        self, endpoint: str, params: Any, call: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Share one in-flight upstream call between concurrent identical requests.
+
+        Callers with the same endpoint and parameters await the same result
+        (or exception). Only use for idempotent, deterministic endpoints.
+        """
+        key = (endpoint, json.dumps(params, sort_keys=True, separators=(",", ":")))
+        metrics.inc(f'acestep_singleflight_calls_total{{endpoint="{endpoint}"}}')
+        future = self._inflight.get(key)
+        if future is not None:
+            metrics.inc(f'acestep_singleflight_saved_total{{endpoint="{endpoint}"}}')
+        else:
+            future = asyncio.ensure_future(call())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._release_flight(key, f))
+        # Shield so one caller cancelling does not cancel the shared call
+        return await asyncio.shield(future)
+
+    def _release_flight(self, key: tuple[str, str], future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every caller went away
+        if not future.cancelled():
+            future.exception()
+
     # ── Core workflow ──────────────────────────────────────────────
 
     async def submit_task(self, params: dict[str, Any]) -> dict[str, Any]:
@@ -106,7 +178,107 @@ class ACEStepClient:
         Query the status / result for one or more tasks.
 
         POST /query_result with {"task_id_list": [...]}
+
+        Identical concurrent lookups share one in-flight request. Other
+        callers arriving within ``batch_window`` seconds are coalesced into
+        one batch and each caller receives only the entries it asked for.
+        Reaching ``batch_max_size`` IDs flushes the batch early, and any
+        lookup with more IDs than that is sent as several requests of at
+        most ``batch_max_size`` IDs each.
         """
+        return await self._single_flight(
+            "/query_result", task_ids, lambda: self._query_result_batched(task_ids)
+        )
+
+    async def _query_result_batched(self, task_ids: list[str]) -> Any:
+        """Queue a lookup for the next /query_result batch."""
+        if self.batch_window <= 0:
+            return await self._post_query_chunks(task_ids)
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending_queries.append((list(task_ids), future, loop.time()))
+        self._pending_query_ids += len(task_ids)
+
+        if self._pending_query_ids >= self.batch_max_size:
+            self._flush_queries()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush_queries)
+
+        return await future
+
+    def _flush_queries(self) -> None:
+        """Hand the pending batch to a background task that issues the request."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending_queries = self._pending_queries, []
+        self._pending_query_ids = 0
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run_query_batch(batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _run_query_batch(
+        self, batch: list[tuple[list[str], asyncio.Future, float]]
+    ) -> None:
+        """Issue one /query_result for a batch and fan results back out."""
+        now = asyncio.get_running_loop().time()
+        task_ids = list(dict.fromkeys(tid for ids, _, _ in batch for tid in ids))
+        metrics.inc("acestep_query_batches_total")
+        metrics.observe("acestep_query_batch_size", len(task_ids))
+        metrics.observe("acestep_query_batch_callers", len(batch))
+        for _, _, enqueued in batch:
+            metrics.observe("acestep_query_batch_wait_seconds", now - enqueued)
+
+        try:
+            result = await self._post_query_chunks(task_ids)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # A lone caller gets the upstream payload untouched
+        if len(batch) == 1:
+            if not batch[0][1].done():
+                batch[0][1].set_result(result)
+            return
+
+        by_id = match_query_items(result, task_ids)
+        if by_id is None:
+            # Entries cannot be lined up with the IDs, so one caller could be
+            # handed another's task: ask for each caller's IDs separately
+            metrics.inc("acestep_query_batch_unmatched_total")
+            await asyncio.gather(*(self._run_query_batch([entry]) for entry in batch))
+            return
+
+        for ids, future, _ in batch:
+            if not future.done():
+                future.set_result([by_id[tid] for tid in ids if tid in by_id])
+
+    async def _post_query_chunks(self, task_ids: list[str]) -> Any:
+        """
+        POST /query_result in requests of at most ``batch_max_size`` IDs.
+
+        Several requests are sent concurrently and their entries joined in
+        request order, so entries without a ``task_id`` still line up with
+        ``task_ids`` when upstream answered for every ID.
+        """
+        size = self.batch_max_size
+        if len(task_ids) <= size:
+            return await self._post_query_result(task_ids)
+        chunks = [task_ids[i : i + size] for i in range(0, len(task_ids), size)]
+        metrics.inc("acestep_query_chunked_total")
+        results = await asyncio.gather(*map(self._post_query_result, chunks))
+        items: list[Any] = []
+        for result in results:
+            items.extend(result if isinstance(result, list) else [result])
+        return items
+
+    async def _post_query_result(self, task_ids: list[str]) -> Any:
+        """POST /query_result for the given task IDs, without batching."""
         try:
             resp = await self.client.post(
                 f"{self.base_url}/query_result",
@@ -120,23 +292,36 @@ class ACEStepClient:
         except httpx.ConnectError:
             raise ACEStepError("Cannot reach music generation service.", 503)
 
-    async def download_audio_stream(self, path: str) -> httpx.Response:
+    async def download_audio_stream(
+        self, path: str, byte_range: str | None = None
+    ) -> httpx.Response:
         """
         Stream-download an audio file from the ACE-Step API.
 
         GET /v1/audio?path=<path>  →  returns a streaming response.
+        ``byte_range`` is forwarded as the ``Range`` header; upstream may
+        answer 206 with the requested bytes or ignore it and send 200.
         The caller MUST ensure they iterate it and close it.
         """
+        headers = self._headers()
+        # Audio does not compress; an identity body can be passed through raw
+        headers["Accept-Encoding"] = "identity"
+        if byte_range:
+            headers["Range"] = byte_range
         try:
-            req = self.client.build_request(
+            req = self.bulk_client.build_request(
                 "GET",
                 f"{self.base_url}/v1/audio",
                 params={"path": path},
-                headers=self._headers(),
+                headers=headers,
                 timeout=AUDIO_DOWNLOAD_TIMEOUT,
             )
-            resp = await self.client.send(req, stream=True)
-            if resp.status_code != 200:
+            resp = await self.bulk_client.send(req, stream=True)
+            if resp.status_code == 416:
+                await resp.aread()
+                resp.close()
+                raise ACEStepError("Requested range not satisfiable.", 416)
+            if resp.status_code not in (200, 206):
                 await resp.aread()
                 resp.close()
                 raise ACEStepError("Failed to download audio.", resp.status_code)
@@ -150,6 +335,9 @@ class ACEStepClient:
 
     async def health_check(self) -> dict[str, Any]:
         """GET /health"""
+        return await self._single_flight("/health", None, self._get_health)
+
+    async def _get_health(self) -> dict[str, Any]:
         try:
             resp = await self.client.get(
                 f"{self.base_url}/health",
@@ -162,6 +350,9 @@ class ACEStepClient:
 
     async def list_models(self) -> Any:
         """GET /v1/models"""
+        return await self._single_flight("/v1/models", None, self._get_models)
+
+    async def _get_models(self) -> Any:
         try:
             resp = await self.client.get(
                 f"{self.base_url}/v1/models",
@@ -0,0 +1,326 @@
+"""
+On-disk cache of generated audio files.
+
+Generated audio for a (task_id, index) never changes, so the audio route
+keeps a local copy of every file it proxies and serves replays straight
+from disk. Files are written to a temporary path and atomically renamed
+into place once complete; the cache is bounded by a byte budget with LRU
+eviction.
+
+Storage is content-addressed: the bytes live once in ``blobs/<sha256>.audio``
+(hashed while the file is written, also used as its ETag), and a small JSON
+record per (task_id, index) names the blob along with the content type.
+Retries and re-submissions that produce byte-identical audio share a blob.
+Blobs are reference counted: the budget counts each blob once, eviction
+drops least-recently-used records and deletes a blob (with derived sidecars
+such as waveform peaks) when its last record goes. ``compact`` removes
+whatever no record references; it runs when the index is rebuilt at
+startup. At run time records and blobs are only ever removed together, so
+leftovers come from a crash between writing a blob and its record, and the
+restart that follows cleans them up.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_DATA_SUFFIX = ".audio"
+_META_SUFFIX = ".json"
+_KEY_PATTERN = re.compile(r"[0-9a-f]{40}")
+_BLOB_DIR = "blobs"
+
+
+@dataclass(slots=True)
+class AudioCacheEntry:
+    """A complete audio file in the cache; ``path`` is its shared blob."""
+
+    key: str
+    path: Path
+    size: int
+    content_type: str
+    sha256: str
+
+    @property
+    def etag(self) -> str:
+        """Strong ETag derived from the file's content."""
+        return f'"{self.sha256}"'
+
+
+class AudioCacheWriter:
+    """Streams one file into the cache; nothing is visible until ``commit``."""
+
+    def __init__(self, cache: "AudioCache", key: str, content_type: str):
+        self._cache = cache
+        self.key = key
+        self.content_type = content_type
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self.tmp_path = cache.tmp_dir / f"{key}.{uuid.uuid4().hex}.part"
+        self._file = open(self.tmp_path, "wb")  # noqa: SIM115 - closed in commit/abort
+        self._closed = False
+
+    async def write(self, chunk: bytes) -> None:
+        await asyncio.to_thread(self._write, chunk)
+        self.size += len(chunk)
+
+    async def commit(self) -> AudioCacheEntry | None:
+        """Publish the file; returns None if it does not fit the budget."""
+        await asyncio.to_thread(self._close)
+        if self.size > self._cache.max_bytes:
+            self._discard()
+            return None
+        return self._cache._publish(self)
+
+    async def abort(self) -> None:
+        await asyncio.to_thread(self._close)
+        self._discard()
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    def _write(self, chunk: bytes) -> None:
+        # Flushed so concurrent readers of the partial file see every byte
+        self._file.write(chunk)
+        self._file.flush()
+        self._hash.update(chunk)
+
+    def _close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._file.close()
+
+    def _discard(self) -> None:
+        self.tmp_path.unlink(missing_ok=True)
+
+
+class AudioCache:
+    """Byte-budgeted LRU cache of audio files keyed by (task_id, index)."""
+
+    def __init__(
+        self,
+        directory: str | os.PathLike = settings.AUDIO_CACHE_DIR,
+        max_bytes: int = settings.AUDIO_CACHE_MAX_BYTES,
+    ):
+        self.directory = Path(directory)
+        self.tmp_dir = self.directory / "tmp"
+        self.blob_dir = self.directory / _BLOB_DIR
+        self.max_bytes = max_bytes
+        # Bytes on disk: every blob counts once however many records share it
+        self.total_bytes = 0
+        self._entries: OrderedDict[str, AudioCacheEntry] = OrderedDict()
+        self._refs: dict[str, int] = {}
+        if self.enabled:
+            self.tmp_dir.mkdir(parents=True, exist_ok=True)
+            self.blob_dir.mkdir(exist_ok=True)
+            self._load()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def blob_count(self) -> int:
+        return len(self._refs)
+
+    @staticmethod
+    def key(task_id: str, index: int) -> str:
+        """Filesystem-safe cache key for one audio file of a task."""
+        return hashlib.sha256(f"{task_id}:{index}".encode()).hexdigest()[:40]
+
+    def get(self, task_id: str, index: int) -> AudioCacheEntry | None:
+        entry = self._entries.get(self.key(task_id, index))
+        if entry is not None and not entry.path.exists():
+            self._drop(entry.key)
+            entry = None
+
+        if entry is None:
+            metrics.inc("audio_cache_misses_total")
+            return None
+        self._entries.move_to_end(entry.key)
+        metrics.inc("audio_cache_hits_total")
+        return entry
+
+    def contains(self, task_id: str, index: int) -> bool:
+        """Whether a file is cached, without touching LRU order or metrics."""
+        return self.key(task_id, index) in self._entries
+
+    def sidecar_path(self, entry: AudioCacheEntry, name: str) -> Path:
+        """
+        Path for a file derived from a cached track (e.g. waveform peaks).
+
+        Sidecars belong to the content, so tracks sharing a blob share them
+        too. They are deleted together with the blob and do not count
+        against the byte budget.
+        """
+        return self.blob_dir / f"{entry.sha256}.{name}"
+
+    def writer(
+        self,
+        task_id: str,
+        index: int,
+        content_type: str,
+        expected_size: int | None = None,
+    ) -> AudioCacheWriter | None:
+        """Start caching a file, or None if caching is off or it cannot fit."""
+        if not self.enabled or (expected_size or 0) > self.max_bytes:
+            return None
+        return AudioCacheWriter(self, self.key(task_id, index), content_type)
+
+    def _publish(self, writer: AudioCacheWriter) -> AudioCacheEntry:
+        key = writer.key
+        sha256 = writer.sha256
+        blob_path = self._blob_path(sha256)
+        if sha256 in self._refs and blob_path.exists():
+            # Byte-identical to a cached file: keep the one copy
+            writer._discard()
+            metrics.inc("audio_cache_dedup_total")
+            metrics.inc("audio_cache_dedup_bytes_total", writer.size)
+        else:
+            os.replace(writer.tmp_path, blob_path)
+        # The record goes last, so a crash in between leaves an orphan blob
+        # for compact() rather than a record without data
+        self._write_meta(self._meta_path(key), writer.content_type, writer.size, sha256)
+
+        entry = AudioCacheEntry(
+            key, blob_path, writer.size, writer.content_type, sha256
+        )
+        previous = self._entries.pop(key, None)
+        self._entries[key] = entry
+        self._ref(entry)
+        if previous is not None:
+            self._unref(previous)
+        metrics.inc("audio_cache_writes_total")
+        self._evict()
+        return entry
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.blob_dir / f"{sha256}{_DATA_SUFFIX}"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.directory / f"{key}{_META_SUFFIX}"
+
+    def _ref(self, entry: AudioCacheEntry) -> None:
+        count = self._refs.get(entry.sha256, 0)
+        if not count:
+            self.total_bytes += entry.size
+        self._refs[entry.sha256] = count + 1
+
+    def _unref(self, entry: AudioCacheEntry) -> None:
+        count = self._refs[entry.sha256] - 1
+        if count:
+            self._refs[entry.sha256] = count
+            return
+        del self._refs[entry.sha256]
+        self.total_bytes -= entry.size
+        # The blob and anything derived from it
+        for path in self.blob_dir.glob(f"{entry.sha256}.*"):
+            path.unlink(missing_ok=True)
+
+    def _write_meta(
+        self, meta_path: Path, content_type: str, size: int, sha256: str
+    ) -> None:
+        meta_tmp = self.tmp_dir / f"{meta_path.name}.{uuid.uuid4().hex}.meta"
+        meta_tmp.write_text(
+            json.dumps({"content_type": content_type, "size": size, "sha256": sha256})
+        )
+        os.replace(meta_tmp, meta_path)
+
+    def _evict(self) -> None:
+        # Dropping a record whose blob is shared frees nothing; keep going
+        while self._entries and self.total_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            metrics.inc("audio_cache_evictions_total")
+        self._update_gauges()
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._meta_path(key).unlink(missing_ok=True)
+        self._unref(entry)
+        self._update_gauges()
+
+    def compact(self) -> int:
+        """
+        Delete blobs, sidecars and records that nothing refers to.
+
+        Records whose blob has disappeared are dropped as well. Returns the
+        number of bytes freed.
+        """
+        for key, entry in list(self._entries.items()):
+            if not entry.path.exists():
+                self._drop(key)
+
+        freed = 0
+        for path in self.blob_dir.iterdir():
+            if path.name.split(".", 1)[0] not in self._refs:
+                try:
+                    freed += path.stat().st_size
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+        metrics.inc("audio_cache_compacted_bytes_total", freed)
+        self._update_gauges()
+        return freed
+
+    def _load(self) -> None:
+        """Rebuild the index from disk, oldest write first."""
+        for stale in self.tmp_dir.iterdir():
+            stale.unlink(missing_ok=True)
+
+        found = []
+        for meta_path in self.directory.glob(f"*{_META_SUFFIX}"):
+            key = meta_path.stem
+            if not _KEY_PATTERN.fullmatch(key):
+                continue
+            try:
+                meta = json.loads(meta_path.read_text())
+                written = meta_path.stat().st_mtime
+                sha256 = meta["sha256"]
+                blob_path = self._blob_path(sha256)
+                entry = AudioCacheEntry(
+                    key,
+                    blob_path,
+                    blob_path.stat().st_size,
+                    meta["content_type"],
+                    sha256,
+                )
+            except (OSError, ValueError, KeyError):
+                meta_path.unlink(missing_ok=True)
+                continue
+            found.append((written, entry))
+
+        for _, entry in sorted(found, key=lambda item: item[0]):
+            self._entries[entry.key] = entry
+            self._ref(entry)
+        freed = self.compact()
+        if found or freed:
+            logger.info(
+                "Audio cache: loaded %d files (%d blobs) from %s, compaction freed "
+                "%d bytes",
+                len(found),
+                len(self._refs),
+                self.directory,
+                freed,
+            )
+        self._evict()
+
+    def _update_gauges(self) -> None:
+        metrics.set_gauge("audio_cache_entries", len(self._entries))
+        metrics.set_gauge("audio_cache_blobs", len(self._refs))
+        metrics.set_gauge("audio_cache_bytes", self.total_bytes)
@@ -0,0 +1,387 @@
+"""
+One upstream fetch per audio file, shared by every concurrent reader.
+
+When several clients download the same (task_id, index) at once, the first
+request opens the upstream stream and later ones join it. A single producer
+task drains upstream into a spool file (the audio cache's partial file when
+the cache accepts it, otherwise an anonymous temp file) and keeps the most
+recent bytes in a bounded in-memory ring. Each reader tracks its own offset:
+it replays what is already spooled, serves the live tail from the ring and
+waits for more. The producer drains upstream as fast as it allows, so the
+upstream connection is released when the transfer ends rather than when
+the slowest client finishes, and a stalled client cannot hold up the
+others.
+
+Anonymous spools live in ``SPOOL_DIR``. Once one holds ``SPOOL_MAX_BYTES``
+the producer reads upstream only as fast as its slowest reader (``0`` means
+always at the reader's pace); cache files are always drained at full
+speed. Nobody else can use an anonymous spool, so its download is stopped
+and upstream closed when the last reader leaves, when a caller that only
+wanted the file cached gives up on it (``close_if_unread``), or when no
+reader turns up within a grace period once the limit is reached.
+``AudioFanout.spool`` applies the same machinery to a single, unshared
+response (e.g. a ranged 206).
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import weakref
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Coroutine
+from pathlib import Path
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.audio_cache import AudioCache, AudioCacheWriter
+from app.services.chunking import ChunkSizer, is_identity, upstream_chunks
+
+logger = logging.getLogger(__name__)
+
+# How long a full anonymous spool waits for a first reader before giving up
+ORPHAN_GRACE_SECONDS = 10.0
+
+
+class SharedDownload:
+    """An upstream audio body being spooled to disk and teed to readers."""
+
+    def __init__(
+        self,
+        response: httpx.Response,
+        writer: AudioCacheWriter | None,
+        buffer_bytes: int,
+        spool_dir: str | os.PathLike | None = None,
+        spool_limit: int | None = None,
+        raw: bool = False,
+    ):
+        self.content_type = response.headers.get("content-type", "audio/mpeg")
+        # Upstream's length describes the encoded body; readers get it decoded
+        self.content_length = (
+            response.headers.get("content-length") if is_identity(response) else None
+        )
+        # Whether the finished download becomes a cache entry
+        self.caching = writer is not None
+        self.size = 0
+        self.done = False
+        self.error: BaseException | None = None
+        self.readers = 0
+
+        self._response = response
+        self._writer = writer
+        self._buffer_bytes = buffer_bytes
+        # Only anonymous spools are bounded; a cache file is wanted whole
+        self._spool_limit = spool_limit if writer is None else None
+        self._raw = raw
+        self._ring: deque[tuple[int, bytes]] = deque()
+        self._ring_bytes = 0
+        self._progress = asyncio.Event()
+        self._consumed = asyncio.Event()
+        self._finished = asyncio.Event()
+        # Offset of each active reader, for pacing past the spool limit
+        self._offsets: dict[object, int] = {}
+        self._task: asyncio.Task | None = None
+
+        # Private descriptor for positional reads; it outlives the writer's
+        # rename or eviction and is closed once nothing references us.
+        if writer is not None:
+            self._spool = None
+            self._read_fd = os.open(writer.tmp_path, os.O_RDONLY)
+        else:
+            self._spool = tempfile.TemporaryFile(dir=spool_dir)  # noqa: SIM115 - closed in _finish
+            self._read_fd = os.dup(self._spool.fileno())
+        weakref.finalize(self, os.close, self._read_fd)
+
+    async def run(self) -> None:
+        """Drain upstream into the spool, then publish it to the cache."""
+        self._task = asyncio.current_task()
+        chunks = (
+            self._response.aiter_raw() if self._raw else upstream_chunks(self._response)
+        )
+        try:
+            async for chunk in chunks:
+                full = self._spool_limit is not None and self.size >= self._spool_limit
+                if full and not await self._wait_for_readers():
+                    self._abandon()
+                    break
+                await self._append(chunk)
+        except (httpx.HTTPError, OSError) as exc:
+            logger.warning("Shared audio download failed: %s", exc)
+            self.error = exc
+        except asyncio.CancelledError:
+            if self.error is None:
+                self.error = RuntimeError("Audio download was cancelled.")
+            raise
+        finally:
+            self.done = True
+            self._notify()
+            await self._response.aclose()
+            await self._finish()
+            self._finished.set()
+
+    async def wait(self) -> bool:
+        """Wait until the download is over and published; True on success."""
+        await self._finished.wait()
+        return self.error is None
+
+    async def reader(self) -> AsyncIterator[bytes]:
+        """
+        Yield the whole body from the start, following the live download.
+
+        Live chunks are forwarded exactly as upstream delivered them; spool
+        reads are sized to the reader's own throughput.
+        """
+        self.readers += 1
+        metrics.add_gauge("audio_fanout_readers", 1)
+        sizer = ChunkSizer()
+        token = object()
+        offset = self._offsets[token] = 0
+        # A producer waiting for a first reader can carry on
+        self._signal_consumed()
+        try:
+            while True:
+                if offset < self.size:
+                    chunk = self._from_ring(offset, sizer.size)
+                    if chunk is None:
+                        # Fell behind the ring: catch up from the spool file
+                        chunk = await asyncio.to_thread(
+                            os.pread,
+                            self._read_fd,
+                            min(self.size - offset, sizer.size),
+                            offset,
+                        )
+                        metrics.inc("audio_fanout_spool_reads_total")
+                    offset += len(chunk)
+                    started = time.perf_counter()
+                    yield chunk
+                    sizer.record(len(chunk), time.perf_counter() - started)
+                    self._offsets[token] = offset
+                    self._signal_consumed()
+                elif self.error is not None:
+                    raise self.error
+                elif self.done:
+                    return
+                else:
+                    await self._progress.wait()
+        finally:
+            self.readers -= 1
+            metrics.add_gauge("audio_fanout_readers", -1)
+            del self._offsets[token]
+            self._signal_consumed()
+            self.close_if_unread()
+
+    def close_if_unread(self) -> None:
+        """Stop an anonymous spool's download when nobody is reading it."""
+        if self._writer is None and not self._offsets and not self.done:
+            # Nobody else can use an anonymous spool: stop downloading
+            self._abandon()
+            if self._task is not None:
+                self._task.cancel()
+
+    def _lagging(self) -> bool:
+        """Whether some reader has fallen behind the in-memory ring."""
+        return bool(self._offsets) and (
+            min(self._offsets.values()) < self.size - self._buffer_bytes
+        )
+
+    async def _wait_for_readers(self) -> bool:
+        """
+        Hold the producer until every reader is within the ring's reach.
+
+        Returns False if no reader turned up within ORPHAN_GRACE_SECONDS.
+        """
+        if self._lagging():
+            metrics.inc("audio_spool_paced_total")
+        while not self._offsets or self._lagging():
+            try:
+                await asyncio.wait_for(
+                    self._consumed.wait(),
+                    None if self._offsets else ORPHAN_GRACE_SECONDS,
+                )
+            except TimeoutError:
+                return False
+        return True
+
+    def _abandon(self) -> None:
+        if self.error is None:
+            self.error = RuntimeError("Spooled audio download has no readers.")
+            metrics.inc("audio_spool_abandoned_total")
+
+    async def _append(self, chunk: bytes) -> None:
+        if self._writer is not None:
+            await self._writer.write(chunk)
+        else:
+            await asyncio.to_thread(self._spool_write, chunk)
+            metrics.add_gauge("audio_spool_bytes", len(chunk))
+
+        self._ring.append((self.size, chunk))
+        self._ring_bytes += len(chunk)
+        while len(self._ring) > 1 and self._ring_bytes > self._buffer_bytes:
+            self._ring_bytes -= len(self._ring.popleft()[1])
+        self.size += len(chunk)
+        self._notify()
+
+    def _spool_write(self, chunk: bytes) -> None:
+        self._spool.write(chunk)
+        self._spool.flush()
+
+    def _from_ring(self, offset: int, limit: int) -> bytes | None:
+        if not self._ring or offset < self._ring[0][0]:
+            return None
+        for start, chunk in self._ring:
+            if start <= offset < start + len(chunk):
+                if offset == start and len(chunk) <= limit:
+                    return chunk
+                return chunk[offset - start : offset - start + limit]
+        return None
+
+    def _signal_consumed(self) -> None:
+        consumed, self._consumed = self._consumed, asyncio.Event()
+        consumed.set()
+
+    def _notify(self) -> None:
+        # Wake every waiting reader; later waits use a fresh event
+        progress, self._progress = self._progress, asyncio.Event()
+        progress.set()
+
+    async def _finish(self) -> None:
+        self._ring.clear()
+        self._ring_bytes = 0
+        if self._spool is not None:
+            self._spool.close()
+            metrics.add_gauge("audio_spool_bytes", -self.size)
+        if self._writer is not None:
+            # Only a fully received file may be published to the cache
+            if self.error is None:
+                await self._writer.commit()
+            else:
+                await self._writer.abort()
+
+
+class AudioFanout:
+    """Registry of shared downloads keyed like the audio cache."""
+
+    def __init__(
+        self,
+        cache: AudioCache,
+        buffer_bytes: int = settings.AUDIO_FANOUT_BUFFER_BYTES,
+        spool_dir: str | os.PathLike = settings.SPOOL_DIR,
+        spool_limit: int = settings.SPOOL_MAX_BYTES,
+    ):
+        self._cache = cache
+        self.buffer_bytes = buffer_bytes
+        self.spool_dir = Path(spool_dir)
+        self.spool_limit = spool_limit
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self._downloads: dict[str, asyncio.Future] = {}
+        self._producers: set[asyncio.Task] = set()
+
+    @property
+    def active_downloads(self) -> int:
+        return len(self._downloads)
+
+    async def open(
+        self,
+        task_id: str,
+        index: int,
+        open_upstream: Callable[[], Awaitable[httpx.Response]],
+    ) -> SharedDownload:
+        """
+        Join the in-flight download of a file, or start one.
+
+        ``open_upstream`` is only called when no download is in flight; if it
+        raises, every caller waiting on the same file gets that exception.
+        """
+        key = self._cache.key(task_id, index)
+        future = self._downloads.get(key)
+        if future is not None:
+            metrics.inc("audio_fanout_joins_total")
+        else:
+            future = asyncio.ensure_future(
+                self._start(key, task_id, index, open_upstream)
+            )
+            self._downloads[key] = future
+            future.add_done_callback(lambda f: self._release_failed(key, f))
+        # Shield so one caller cancelling does not cancel the shared start
+        return await asyncio.shield(future)
+
+    def spool(
+        self,
+        response: httpx.Response,
+        writer: AudioCacheWriter | None = None,
+        raw: bool = False,
+    ) -> SharedDownload:
+        """
+        Drain one unshared upstream response through a spool.
+
+        ``raw`` keeps the body exactly as received (content-encoding and
+        all), for partial responses that are passed through.
+        """
+        download = self._download(response, writer, raw=raw)
+        self._run(download.run())
+        metrics.inc("audio_spool_downloads_total")
+        return download
+
+    async def close(self) -> None:
+        """Cancel running downloads (used on application shutdown)."""
+        for task in list(self._producers):
+            task.cancel()
+        await asyncio.gather(*self._producers, return_exceptions=True)
+
+    async def _start(
+        self,
+        key: str,
+        task_id: str,
+        index: int,
+        open_upstream: Callable[[], Awaitable[httpx.Response]],
+    ) -> SharedDownload:
+        response = await open_upstream()
+        content_length = response.headers.get("content-length")
+        writer = self._cache.writer(
+            task_id,
+            index,
+            response.headers.get("content-type", "audio/mpeg"),
+            expected_size=int(content_length) if content_length else None,
+        )
+        download = self._download(response, writer)
+        self._run(self._produce(key, download))
+        metrics.inc("audio_fanout_downloads_total")
+        metrics.set_gauge("audio_fanout_active_downloads", len(self._downloads))
+        return download
+
+    def _download(
+        self,
+        response: httpx.Response,
+        writer: AudioCacheWriter | None,
+        raw: bool = False,
+    ) -> SharedDownload:
+        return SharedDownload(
+            response,
+            writer,
+            self.buffer_bytes,
+            spool_dir=self.spool_dir,
+            spool_limit=self.spool_limit,
+            raw=raw,
+        )
+
+    def _run(self, coro: Coroutine[None, None, None]) -> None:
+        producer = asyncio.get_running_loop().create_task(coro)
+        self._producers.add(producer)
+        producer.add_done_callback(self._producers.discard)
+
+    async def _produce(self, key: str, download: SharedDownload) -> None:
+        try:
+            await download.run()
+        finally:
+            # New requests go to the cache (or a fresh download) from here on
+            self._downloads.pop(key, None)
+            metrics.set_gauge("audio_fanout_active_downloads", len(self._downloads))
+
+    def _release_failed(self, key: str, future: asyncio.Future) -> None:
+        # Successful starts are released by their producer when it finishes
+        failed = future.cancelled() or future.exception() is not None
+        if failed and self._downloads.get(key) is future:
+            del self._downloads[key]
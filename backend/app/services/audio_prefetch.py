@@ -0,0 +1,144 @@
+"""
+Background prefetch of audio for newly completed tasks.
+
+The task registry reports the first time a status lookup sees a task
+complete; its audio files are then queued and downloaded into the audio
+cache by a small pool of workers, so the browser's request that follows
+the "completed" status is served from disk instead of a cold upstream
+fetch. Downloads go through the audio fan-out, so a user request that
+arrives mid-prefetch joins the same upstream stream.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.acestep_client import ACEStepClient, ACEStepError
+from app.services.audio_cache import AudioCache
+from app.services.audio_fanout import AudioFanout
+
+logger = logging.getLogger(__name__)
+
+# How many prefetched files are remembered for hit-rate accounting
+_TRACKED_KEYS = 10000
+
+
+class AudioPrefetcher:
+    """Bounded worker pool that warms the audio cache."""
+
+    def __init__(
+        self,
+        client: ACEStepClient,
+        cache: AudioCache,
+        fanout: AudioFanout,
+        concurrency: int = settings.AUDIO_PREFETCH_CONCURRENCY,
+        queue_size: int = settings.AUDIO_PREFETCH_QUEUE_SIZE,
+    ):
+        self._client = client
+        self._cache = cache
+        self._fanout = fanout
+        self.concurrency = concurrency
+        self._queue: asyncio.Queue[tuple[str, int, str]] = asyncio.Queue(queue_size)
+        self._workers: list[asyncio.Task] = []
+        # Files queued for prefetch that no user has requested yet
+        self._tracked: OrderedDict[str, None] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.concurrency > 0 and self._cache.enabled
+
+    def schedule(self, task_id: str, audio_paths: list[str]) -> None:
+        """Queue every audio file of a completed task that is not cached yet."""
+        if not self.enabled:
+            return
+        for index, path in enumerate(audio_paths):
+            if self._cache.contains(task_id, index):
+                metrics.inc("audio_prefetch_skipped_total")
+                continue
+            try:
+                self._queue.put_nowait((task_id, index, path))
+            except asyncio.QueueFull:
+                metrics.inc("audio_prefetch_dropped_total")
+                continue
+            metrics.inc("audio_prefetch_scheduled_total")
+            self._track(self._cache.key(task_id, index))
+        metrics.set_gauge("audio_prefetch_queue_depth", self._queue.qsize())
+        self._start_workers()
+
+    def record_request(self, task_id: str, index: int, cached: bool) -> None:
+        """
+        Account a user download of a prefetched file.
+
+        A hit means the prefetch finished before the user asked for the file.
+        Only the first request for each prefetched file is counted.
+        """
+        key = self._cache.key(task_id, index)
+        if key not in self._tracked:
+            return
+        del self._tracked[key]
+        metrics.inc(
+            "audio_prefetch_hits_total" if cached else "audio_prefetch_misses_total"
+        )
+        hits = metrics.counter("audio_prefetch_hits_total")
+        misses = metrics.counter("audio_prefetch_misses_total")
+        metrics.set_gauge("audio_prefetch_hit_ratio", hits / (hits + misses))
+
+    async def close(self) -> None:
+        """Stop the workers (used on application shutdown)."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    def _start_workers(self) -> None:
+        if self._workers:
+            return
+        loop = asyncio.get_running_loop()
+        self._workers = [
+            loop.create_task(self._work()) for _ in range(self.concurrency)
+        ]
+
+    def _track(self, key: str) -> None:
+        self._tracked[key] = None
+        self._tracked.move_to_end(key)
+        while len(self._tracked) > _TRACKED_KEYS:
+            self._tracked.popitem(last=False)
+
+    async def _work(self) -> None:
+        while True:
+            task_id, index, path = await self._queue.get()
+            metrics.set_gauge("audio_prefetch_queue_depth", self._queue.qsize())
+            try:
+                await self._prefetch(task_id, index, path)
+            except Exception:
+                # One failed file (a reset connection, a full disk) must not
+                # take the worker down with it
+                logger.exception("Audio prefetch for %s failed", task_id)
+                metrics.inc("audio_prefetch_failed_total")
+            finally:
+                self._queue.task_done()
+
+    async def _prefetch(self, task_id: str, index: int, path: str) -> None:
+        if self._cache.contains(task_id, index):
+            metrics.inc("audio_prefetch_skipped_total")
+            return
+        try:
+            download = await self._fanout.open(
+                task_id, index, lambda: self._client.download_audio_stream(path)
+            )
+            if not download.caching:
+                # Too big for the cache: the spool would be thrown away
+                download.close_if_unread()
+                metrics.inc("audio_prefetch_skipped_total")
+                return
+            completed = await download.wait()
+        except ACEStepError as e:
+            logger.warning("Audio prefetch for %s failed: %s", task_id, e.message)
+            completed = False
+        metrics.inc(
+            "audio_prefetch_completed_total"
+            if completed
+            else "audio_prefetch_failed_total"
+        )
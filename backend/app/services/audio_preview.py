@@ -0,0 +1,199 @@
+"""
+Short preview clips (the first N seconds) of cached audio.
+
+Clips are cut without re-encoding: WAV at a frame boundary with the header
+rewritten for the new length, MP3 on a frame header boundary. FLAC has no
+cheap cut point, so it is decoded and re-encoded (losslessly) with the
+optional ``soundfile`` package when available. Each (track, length) clip is
+generated once and stored as a sidecar next to the cached track.
+"""
+
+import asyncio
+import wave
+from pathlib import Path
+
+from app.core.metrics import metrics
+from app.services.audio_cache import AudioCache, AudioCacheEntry
+from app.services.waveform import UnsupportedAudioError
+
+try:
+    import soundfile
+except ImportError:  # pragma: no cover - exercised when soundfile is absent
+    soundfile = None
+
+_WAV_TYPES = frozenset({"audio/wav", "audio/x-wav", "audio/wave"})
+_MP3_TYPES = frozenset({"audio/mpeg", "audio/mp3"})
+_FLAC_TYPES = frozenset({"audio/flac", "audio/x-flac"})
+
+# MP3 bitrates in kbps, by (MPEG-1?, layer) and header bitrate index
+_MP3_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by header version bits (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5)
+_MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+
+def supports(content_type: str) -> bool:
+    """Whether a preview can be cut from audio of ``content_type``."""
+    return (
+        content_type in _WAV_TYPES
+        or content_type in _MP3_TYPES
+        or (content_type in _FLAC_TYPES and soundfile is not None)
+    )
+
+
+def cut_wav(src: str, dst: str, seconds: float) -> None:
+    """Copy the first ``seconds`` of a PCM WAV file."""
+    try:
+        with wave.open(src, "rb") as reader:
+            params = reader.getparams()
+            frames = reader.readframes(int(params.framerate * seconds))
+    except (wave.Error, EOFError) as e:
+        raise UnsupportedAudioError(f"Unsupported WAV file: {e}") from e
+    with wave.open(dst, "wb") as writer:
+        # The header's frame count is patched for the shorter data on close
+        writer.setparams(params)
+        writer.writeframes(frames)
+
+
+def _mp3_frame(header: bytes) -> tuple[int, int, int] | None:
+    """(frame length, samples per frame, sample rate) of an MP3 frame header."""
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03
+    layer = 4 - ((header[1] >> 1) & 0x03)
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    if layer == 3 and not mpeg1:
+        return 72 * bitrate // sample_rate + padding, 576, sample_rate
+    return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+
+
+def cut_mp3(src: str, dst: str, seconds: float) -> None:
+    """Copy the ID3v2 tag and whole MP3 frames covering the first ``seconds``."""
+    with open(src, "rb") as reader, open(dst, "wb") as writer:
+        head = reader.read(10)
+        if head[:3] == b"ID3" and len(head) == 10:
+            size = 0
+            for byte in head[6:10]:
+                size = (size << 7) | (byte & 0x7F)
+            if head[5] & 0x10:  # footer present
+                size += 10
+            writer.write(head + reader.read(size))
+        else:
+            reader.seek(0)
+
+        duration = 0.0
+        frames = 0
+        while duration < seconds:
+            header = reader.read(4)
+            frame = _mp3_frame(header)
+            if frame is None:
+                break
+            length, samples, sample_rate = frame
+            data = header + reader.read(length - 4)
+            if len(data) < length:
+                break
+            # A leading Xing/Info frame describes the full track; drop it so
+            # players compute the clip's own duration
+            if frames == 0 and (b"Xing" in data[:64] or b"Info" in data[:64]):
+                frames += 1
+                continue
+            writer.write(data)
+            frames += 1
+            duration += samples / sample_rate
+
+    if duration == 0.0:
+        Path(dst).unlink(missing_ok=True)
+        raise UnsupportedAudioError("No MP3 frames found")
+
+
+def cut_flac(src: str, dst: str, seconds: float) -> None:
+    """Re-encode the first ``seconds`` of a FLAC file (needs soundfile)."""
+    if soundfile is None:
+        raise UnsupportedAudioError("Cannot cut FLAC audio")
+    try:
+        info = soundfile.info(src)
+        samples, rate = soundfile.read(
+            src, frames=int(info.samplerate * seconds), always_2d=True
+        )
+        soundfile.write(dst, samples, rate, format="FLAC", subtype=info.subtype)
+    except RuntimeError as e:
+        raise UnsupportedAudioError(f"Cannot cut FLAC audio: {e}") from e
+
+
+def cut_preview(src: str, dst: str, content_type: str, seconds: float) -> None:
+    if content_type in _WAV_TYPES:
+        cut_wav(src, dst, seconds)
+    elif content_type in _MP3_TYPES:
+        cut_mp3(src, dst, seconds)
+    elif content_type in _FLAC_TYPES:
+        cut_flac(src, dst, seconds)
+    else:
+        raise UnsupportedAudioError(f"Cannot cut {content_type} audio")
+
+
+class AudioPreviewer:
+    """Generates preview clips once and keeps them beside the cached track."""
+
+    def __init__(self, cache: AudioCache):
+        self._cache = cache
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def preview(self, entry: AudioCacheEntry, seconds: int) -> Path:
+        """
+        Path of the first ``seconds`` of a cached track.
+
+        Raises UnsupportedAudioError if the track cannot be cut.
+        """
+        sidecar = self._cache.sidecar_path(entry, f"preview-{seconds}")
+        if sidecar.exists():
+            metrics.inc("audio_preview_cache_hits_total")
+            return sidecar
+
+        # Concurrent requests for the same clip share one cut
+        future = self._inflight.get(sidecar.name)
+        if future is None:
+            future = asyncio.ensure_future(self._generate(entry, seconds, sidecar))
+            self._inflight[sidecar.name] = future
+            future.add_done_callback(lambda f: self._release(sidecar.name, f))
+        return await asyncio.shield(future)
+
+    async def _generate(
+        self, entry: AudioCacheEntry, seconds: int, sidecar: Path
+    ) -> Path:
+        tmp = sidecar.with_name(f"{sidecar.name}.part")
+        try:
+            await asyncio.to_thread(
+                cut_preview, str(entry.path), str(tmp), entry.content_type, seconds
+            )
+            await asyncio.to_thread(tmp.replace, sidecar)
+        finally:
+            tmp.unlink(missing_ok=True)
+        metrics.inc("audio_preview_generated_total")
+        return sidecar
+
+    def _release(self, name: str, future: asyncio.Future) -> None:
+        if self._inflight.get(name) is future:
+            del self._inflight[name]
+        # Mark the exception as retrieved in case every caller went away
+        if not future.cancelled():
+            future.exception()
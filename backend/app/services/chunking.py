@@ -0,0 +1,70 @@
+"""
+Upstream pass-through and throughput-adaptive chunk sizing for audio bodies.
+
+``upstream_chunks`` forwards what the network delivered without httpx's
+re-chunking (and without a decoder when the body is not content-encoded).
+``ChunkSizer`` picks read sizes for bodies served from local files: fast
+clients get large reads (fewer syscalls and Python objects per byte), slow
+clients small ones (less memory parked in send buffers per connection).
+"""
+
+from collections.abc import AsyncIterator
+
+import httpx
+
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+INITIAL_CHUNK_SIZE = 64 * 1024
+
+# Aim for chunks that take the client about this long to accept
+_TARGET_SECONDS = 0.05
+# Weight of the newest throughput sample in the moving average
+_SMOOTHING = 0.3
+
+
+def is_identity(response: httpx.Response) -> bool:
+    """Whether the body is sent without a content-encoding (gzip etc.)."""
+    encoding = response.headers.get("content-encoding", "identity")
+    return encoding.strip().lower() in ("", "identity")
+
+
+def upstream_chunks(response: httpx.Response) -> AsyncIterator[bytes]:
+    """
+    The decoded body of an upstream response, chunked as it arrived.
+
+    Identity bodies are read raw, skipping the decoder and re-chunking;
+    encoded ones are decoded without re-chunking.
+    """
+    if is_identity(response):
+        return response.aiter_raw()
+    return response.aiter_bytes()
+
+
+class ChunkSizer:
+    """Moving estimate of a client's throughput, turned into a read size."""
+
+    def __init__(
+        self,
+        minimum: int = MIN_CHUNK_SIZE,
+        maximum: int = MAX_CHUNK_SIZE,
+        initial: int = INITIAL_CHUNK_SIZE,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.size = initial
+        self._rate: float | None = None
+
+    def record(self, nbytes: int, seconds: float) -> None:
+        """Account ``nbytes`` that took the client ``seconds`` to accept."""
+        if nbytes <= 0:
+            return
+        rate = nbytes / max(seconds, 1e-6)
+        self._rate = (
+            rate
+            if self._rate is None
+            else _SMOOTHING * rate + (1 - _SMOOTHING) * self._rate
+        )
+        wanted = int(self._rate * _TARGET_SECONDS)
+        # Move at most a factor of two per chunk so one outlier cannot swing it
+        wanted = max(self.size // 2, min(self.size * 2, wanted))
+        self.size = max(self.minimum, min(self.maximum, wanted))
@@ -0,0 +1,142 @@
+"""
+Concurrency limits for audio downloads streamed from upstream.
+
+Each download that is not served from the local cache holds a slot for as
+long as its response streams. There is a global limit and a per-session
+limit; a request that cannot start right away waits in a short FIFO queue
+and is turned away (``DownloadRejected``) when the queue is full or it has
+waited ``wait_timeout`` seconds, so a burst cannot open an unbounded number
+of upstream streams.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+class DownloadRejected(Exception):
+    """No download slot became free in time."""
+
+    def __init__(self, reason: str, retry_after: int):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(reason)
+
+
+class DownloadSlot:
+    """A held download slot; ``release`` may be called more than once."""
+
+    def __init__(self, limiter: "DownloadLimiter", session_id: str):
+        self._limiter = limiter
+        self.session_id = session_id
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._limiter._release(self.session_id)
+
+
+class DownloadLimiter:
+    """Global and per-session download slots with a bounded wait queue."""
+
+    def __init__(
+        self,
+        max_streams: int = settings.DOWNLOAD_MAX_STREAMS,
+        per_session: int = settings.DOWNLOAD_MAX_STREAMS_PER_SESSION,
+        queue_size: int = settings.DOWNLOAD_QUEUE_SIZE,
+        wait_timeout: float = settings.DOWNLOAD_QUEUE_TIMEOUT_SECONDS,
+        retry_after: int = settings.DOWNLOAD_RETRY_AFTER_SECONDS,
+    ):
+        self.max_streams = max_streams
+        self.per_session = per_session
+        self.queue_size = queue_size
+        self.wait_timeout = wait_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self._sessions: dict[str, int] = {}
+        self._waiters: deque[tuple[str, asyncio.Future]] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, session_id: str) -> DownloadSlot:
+        """
+        Take a slot for ``session_id``, waiting briefly if none is free.
+
+        Raises DownloadRejected when the queue is full or the wait times out.
+        """
+        # Queued requests are woken on every release, so any still waiting
+        # are blocked by their own session's limit and need not go first
+        if self._can_start(session_id):
+            self._take(session_id)
+            metrics.observe("audio_download_queue_wait_seconds", 0.0)
+            return DownloadSlot(self, session_id)
+        if len(self._waiters) >= self.queue_size:
+            self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (session_id, waiter)
+        self._waiters.append(entry)
+        metrics.set_gauge("audio_download_queue_depth", len(self._waiters))
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.wait_timeout)
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as this caller gave up
+                self._release(session_id)
+            if isinstance(exc, TimeoutError):
+                self._reject("timeout")
+            raise
+        finally:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+            metrics.set_gauge("audio_download_queue_depth", len(self._waiters))
+            metrics.observe(
+                "audio_download_queue_wait_seconds", time.perf_counter() - started
+            )
+        # _wake took the slot on this waiter's behalf
+        return DownloadSlot(self, session_id)
+
+    def _can_start(self, session_id: str) -> bool:
+        return (
+            self.active < self.max_streams
+            and self._sessions.get(session_id, 0) < self.per_session
+        )
+
+    def _take(self, session_id: str) -> None:
+        self.active += 1
+        self._sessions[session_id] = self._sessions.get(session_id, 0) + 1
+        metrics.set_gauge("audio_download_active_streams", self.active)
+
+    def _release(self, session_id: str) -> None:
+        self.active -= 1
+        remaining = self._sessions[session_id] - 1
+        if remaining:
+            self._sessions[session_id] = remaining
+        else:
+            del self._sessions[session_id]
+        metrics.set_gauge("audio_download_active_streams", self.active)
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand free slots to waiters in arrival order."""
+        for entry in list(self._waiters):
+            if self.active >= self.max_streams:
+                return
+            session_id, waiter = entry
+            # A session at its own limit does not hold up other sessions
+            if waiter.done() or not self._can_start(session_id):
+                continue
+            self._waiters.remove(entry)
+            self._take(session_id)
+            waiter.set_result(None)
+
+    def _reject(self, reason: str) -> None:
+        metrics.inc(f'audio_download_rejected_total{{reason="{reason}"}}')
+        raise DownloadRejected(reason, self.retry_after)
@@ -0,0 +1,241 @@
+"""
+Cached audio files sent without copying them through the Python heap.
+
+Starlette's ``FileResponse`` reads every 64 KiB of a file into a new
+``bytes`` object, so a large WAV served to many clients costs a read and an
+allocation per chunk per client. ``MappedFileResponse`` sends the body of a
+full or single-range GET itself:
+
+  - a server that offers the ASGI ``http.response.zerocopysend`` extension
+    is handed the open file and writes it with ``sendfile(2)`` itself (the
+    app never owns the socket, so it cannot call ``os.sendfile`` directly);
+  - otherwise the file is memory-mapped and sent as ``memoryview`` slices
+    of the mapping: concurrent downloads of a track share its pages in the
+    OS page cache and the socket write reads straight from them;
+  - where a file cannot be mapped (an empty file, or a platform or
+    filesystem without mmap) it is read in chunks as before.
+
+Everything else (HEAD, ``http.response.pathsend``, multiple or invalid
+ranges) is left to FileResponse through its public ``__call__``, so no
+private Starlette method is relied on. Servers before ASGI 2.4 (uvicorn
+among them) do not fail a send to a client that went away, so there the
+body is sent while ``receive()`` is watched for ``http.disconnect``, as
+StreamingResponse does.
+
+Slices and reads are sized to each client's throughput like other file
+reads; slices stay small enough for the socket to take without buffering.
+"""
+
+import asyncio
+import contextlib
+import mmap
+import os
+import stat
+import time
+from collections.abc import Coroutine
+from typing import BinaryIO
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+from app.core.metrics import metrics
+from app.services.chunking import ChunkSizer
+
+_ZEROCOPY = "http.response.zerocopysend"
+# Whatever the socket does not take at once is copied into the server's
+# write buffer, so larger slices only move the copy onto the heap
+_MAX_SLICE = 128 * 1024
+
+
+class MappedFileResponse(FileResponse):
+    """FileResponse whose body is sent via sendfile or mmap where possible."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not _sends_body_itself(scope) or self.status_code != 200:
+            await super().__call__(scope, receive, send)
+            return
+
+        if self.stat_result is None:
+            try:
+                self.stat_result = await asyncio.to_thread(os.stat, self.path)
+            except FileNotFoundError:
+                raise RuntimeError(f"File at path {self.path} does not exist.")
+            if not stat.S_ISREG(self.stat_result.st_mode):
+                raise RuntimeError(f"File at path {self.path} is not a file.")
+            self.set_stat_headers(self.stat_result)
+        file_size = self.stat_result.st_size
+
+        request_headers = Headers(scope=scope)
+        start, end, status = 0, file_size, self.status_code
+        http_range = request_headers.get("range")
+        if http_range is not None and self._range_applies(
+            request_headers.get("if-range")
+        ):
+            byte_range = _single_range(http_range, file_size)
+            if byte_range is None:
+                # Multiple, malformed or unsatisfiable ranges
+                await super().__call__(scope, receive, send)
+                return
+            start, end = byte_range
+            status = 206
+
+        headers = MutableHeaders(raw=list(self.raw_headers))
+        if status == 206:
+            headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+            headers["content-length"] = str(end - start)
+        await send(
+            {"type": "http.response.start", "status": status, "headers": headers.raw}
+        )
+        zerocopy = _ZEROCOPY in scope.get("extensions", {})
+        body = self._send_body(send, start, end, zerocopy)
+        if _spec_version(scope) >= (2, 4):
+            await body
+        else:
+            await _until_disconnected(body, receive)
+        if self.background is not None:
+            await self.background()
+
+    def _range_applies(self, if_range: str | None) -> bool:
+        """Whether If-Range (if any) still matches this file."""
+        if if_range is None:
+            return True
+        if if_range.startswith("W/"):
+            return False
+        return if_range in (self.headers.get("last-modified"), self.headers.get("etag"))
+
+    async def _send_body(
+        self, send: Send, start: int, end: int, zerocopy: bool
+    ) -> None:
+        """Send bytes ``start`` to ``end`` of the file."""
+        with await asyncio.to_thread(open, self.path, "rb") as file:
+            if zerocopy and end > start:
+                metrics.inc('audio_file_responses_total{method="sendfile"}')
+                await send(
+                    {
+                        "type": _ZEROCOPY,
+                        "file": file,
+                        "offset": start,
+                        "count": end - start,
+                    }
+                )
+                return
+            mapped = _map(file) if end > start else None
+            if mapped is None:
+                metrics.inc('audio_file_responses_total{method="read"}')
+                await _send_read(send, file, start, end)
+                return
+        metrics.inc('audio_file_responses_total{method="mmap"}')
+        await _send_mapped(send, mapped, start, end)
+
+
+def _sends_body_itself(scope: Scope) -> bool:
+    """Whether a request is a GET whose body this module sends."""
+    if scope["type"] != "http" or scope["method"].upper() == "HEAD":
+        return False
+    return "http.response.pathsend" not in scope.get("extensions", {})
+
+
+def _spec_version(scope: Scope) -> tuple[int, ...]:
+    return tuple(map(int, scope.get("asgi", {}).get("spec_version", "2.0").split(".")))
+
+
+async def _until_disconnected(
+    body: Coroutine[None, None, None], receive: Receive
+) -> None:
+    """Run ``body``, cancelling it if the client disconnects first."""
+    sending = asyncio.ensure_future(body)
+
+    async def disconnected() -> None:
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    watcher = asyncio.ensure_future(disconnected())
+    try:
+        await asyncio.wait({sending, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (sending, watcher):
+            task.cancel()
+        await asyncio.gather(sending, watcher, return_exceptions=True)
+    if not sending.cancelled():
+        # Errors while sending propagate as they would without the watcher
+        sending.result()
+
+
+def _single_range(http_range: str, file_size: int) -> tuple[int, int] | None:
+    """
+    ``(start, end)`` of a Range header asking for one satisfiable range.
+
+    None for anything else, which FileResponse answers itself.
+    """
+    units, _, spec = http_range.partition("=")
+    if units.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = (part.strip() for part in spec.partition("-"))
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last) + 1, file_size) if last else file_size
+        else:
+            start, end = max(file_size - int(last), 0), file_size
+    except ValueError:
+        return None
+    if not 0 <= start < end or start >= file_size:
+        return None
+    return start, end
+
+
+def _map(file: BinaryIO) -> mmap.mmap | None:
+    try:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        # Read ahead aggressively and drop pages behind the reader
+        mapped.madvise(mmap.MADV_SEQUENTIAL)
+    return mapped
+
+
+async def _send_mapped(send: Send, mapped: mmap.mmap, start: int, end: int) -> None:
+    sizer = ChunkSizer(maximum=_MAX_SLICE)
+    view = memoryview(mapped)
+    try:
+        while start < end:
+            chunk = view[start : min(end, start + sizer.size)]
+            started = time.perf_counter()
+            start += len(chunk)
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": start < end,
+                }
+            )
+            sizer.record(len(chunk), time.perf_counter() - started)
+    finally:
+        view.release()
+        # A server still holding a slice keeps the mapping alive until it
+        # lets go; the mapping is then unmapped when collected
+        with contextlib.suppress(BufferError):
+            mapped.close()
+
+
+async def _send_read(send: Send, file: BinaryIO, start: int, end: int) -> None:
+    sizer = ChunkSizer()
+    more_body = start < end
+    if not more_body:
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    file.seek(start)
+    while more_body:
+        chunk = await asyncio.to_thread(file.read, min(sizer.size, end - start))
+        if not chunk:
+            raise RuntimeError(f"File {file.name} is shorter than expected.")
+        started = time.perf_counter()
+        start += len(chunk)
+        more_body = start < end
+        await send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
+        sizer.record(len(chunk), time.perf_counter() - started)
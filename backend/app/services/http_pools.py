@@ -0,0 +1,117 @@
+"""
+Upstream HTTP connection pools.
+
+Control calls (submit, status, health) and bulk audio downloads use separate
+``httpx.AsyncClient`` pools so a long audio stream never holds a connection,
+or on HTTP/2 the flow-control window of a shared connection, that a status
+lookup is waiting for. Each pool is wrapped in a transport that reports how
+busy it is on ``/metrics``:
+
+  http_pool_active_requests{pool=...}    requests holding a connection
+  http_pool_utilization{pool=...}        active / max_connections (HTTP/1.1)
+  http_pool_saturated_total{pool=...}    requests that found the pool full
+  http_pool_headers_seconds{pool=...}    time to response headers, including
+                                         any wait for a free connection
+"""
+
+import time
+from collections.abc import AsyncIterator, Callable
+
+import httpx
+
+from app.core.metrics import metrics
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that reports when its connection is given back."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """Transport that tracks in-flight requests of one named pool."""
+
+    def __init__(
+        self,
+        name: str,
+        limits: httpx.Limits,
+        http2: bool = False,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.name = name
+        self.http2 = http2
+        # HTTP/2 multiplexes requests, so only HTTP/1.1 has one request per
+        # connection to measure saturation against
+        self.capacity = None if http2 else limits.max_connections
+        self.active = 0
+        self._transport = transport or httpx.AsyncHTTPTransport(
+            limits=limits, http2=http2
+        )
+
+    def _metric(self, name: str) -> str:
+        return f'{name}{{pool="{self.name}"}}'
+
+    def _update(self, delta: int) -> None:
+        self.active += delta
+        metrics.set_gauge(self._metric("http_pool_active_requests"), self.active)
+        if self.capacity:
+            metrics.set_gauge(
+                self._metric("http_pool_utilization"), self.active / self.capacity
+            )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.capacity is not None and self.active >= self.capacity:
+            metrics.inc(self._metric("http_pool_saturated_total"))
+        self._update(1)
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self._update(-1)
+            raise
+        metrics.observe(
+            self._metric("http_pool_headers_seconds"), time.perf_counter() - started
+        )
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, lambda: self._update(-1)),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def create_pool(
+    name: str,
+    *,
+    max_connections: int,
+    max_keepalive_connections: int,
+    keepalive_expiry: float,
+    http2: bool,
+) -> httpx.AsyncClient:
+    """An ``AsyncClient`` with its own connection pool and metrics."""
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    return httpx.AsyncClient(
+        transport=MeteredTransport(name, limits, http2=http2), limits=limits
+    )
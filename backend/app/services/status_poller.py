@@ -0,0 +1,122 @@
+"""
+Shared background poller for task status.
+
+Push-style endpoints (SSE, long-poll, WebSocket) subscribe to task IDs here
+instead of polling upstream themselves. A single loop queries every watched
+task in one /query_result call per interval, so upstream traffic scales
+with the number of active tasks rather than the number of watchers.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.task_cache import TaskResult
+
+logger = logging.getLogger(__name__)
+
+# Fetches the current status of several tasks, keyed by task_id
+TaskFetcher = Callable[[list[str]], Awaitable[dict[str, TaskResult]]]
+
+
+class StatusPoller:
+    """Poll watched tasks on one shared loop and fan status changes out."""
+
+    def __init__(
+        self,
+        fetch: TaskFetcher,
+        interval: float = settings.STATUS_POLL_INTERVAL_SECONDS,
+    ):
+        self._fetch = fetch
+        self.interval = interval
+        self._watchers: dict[str, set[asyncio.Queue]] = {}
+        self._last: dict[str, TaskResult] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def watched_tasks(self) -> int:
+        return len(self._watchers)
+
+    def subscribe(
+        self,
+        task_id: str,
+        queue: asyncio.Queue,
+        current: TaskResult | None = None,
+    ) -> None:
+        """
+        Deliver ``(task_id, TaskResult)`` to ``queue`` whenever the status changes.
+
+        ``current`` is the status the subscriber already knows about; only
+        transitions away from it are delivered. Terminal updates are
+        delivered once, after which the task stops being polled. A new task
+        is first polled with all the others at the next interval, so the
+        rate of new subscriptions does not add upstream calls.
+        """
+        self._watchers.setdefault(task_id, set()).add(queue)
+        if current is not None:
+            self._last.setdefault(task_id, current)
+        metrics.set_gauge("status_poller_watched_tasks", len(self._watchers))
+
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue) -> None:
+        watchers = self._watchers.get(task_id)
+        if watchers is None:
+            return
+        watchers.discard(queue)
+        if not watchers:
+            del self._watchers[task_id]
+            self._last.pop(task_id, None)
+        metrics.set_gauge("status_poller_watched_tasks", len(self._watchers))
+
+    async def close(self) -> None:
+        """Stop the polling loop (used on application shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        try:
+            while self._watchers:
+                await asyncio.sleep(self.interval)
+                if not self._watchers:
+                    break
+                task_ids = list(self._watchers)
+                try:
+                    results = await self._fetch(task_ids)
+                except Exception:
+                    logger.warning("Status poll for %d tasks failed", len(task_ids))
+                    results = {}
+                metrics.inc("status_poller_polls_total")
+                metrics.observe("status_poller_tasks_per_poll", len(task_ids))
+
+                for task_id, result in results.items():
+                    self._publish(task_id, result)
+        finally:
+            self._task = None
+
+    def _publish(self, task_id: str, result: TaskResult) -> None:
+        watchers = self._watchers.get(task_id)
+        if not watchers:
+            return
+        previous = self._last.get(task_id)
+        if previous is not None and previous.status == result.status:
+            return
+
+        self._last[task_id] = result
+        for queue in watchers:
+            queue.put_nowait((task_id, result))
+        metrics.inc("status_poller_updates_total", len(watchers))
+
+        # Terminal results never change again; subscribers close on receipt
+        if result.is_terminal:
+            del self._watchers[task_id]
+            self._last.pop(task_id, None)
+            metrics.set_gauge("status_poller_watched_tasks", len(self._watchers))
@@ -0,0 +1,59 @@
+"""
+Per-session limits for WebSocket status subscriptions.
+
+Every subscribe action looks its tasks up upstream and every subscription
+keeps a task in the shared poll, so both are limited per client key (the
+session cookie, or the IP address without one) across all of that
+client's connections: opening another socket does not start afresh.
+
+Subscribe actions are counted in fixed one-minute windows, like the HTTP
+rate limits; held subscriptions are counted until they are dropped.
+"""
+
+import time
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+class SubscriptionLimiter:
+    """Subscribe-rate and held-subscription budgets shared by connections."""
+
+    def __init__(
+        self,
+        max_subscriptions: int = settings.WS_MAX_SUBSCRIPTIONS,
+        subscribes_per_minute: int = settings.WS_SUBSCRIBES_PER_MINUTE,
+    ):
+        self.max_subscriptions = max_subscriptions
+        self.subscribes_per_minute = subscribes_per_minute
+        self._held: dict[str, int] = {}
+        self._window = 0
+        self._subscribes: dict[str, int] = {}
+
+    def allow_subscribe(self, key: str) -> bool:
+        """Count one subscribe action for ``key``; False once over the rate."""
+        window = int(time.monotonic() // 60)
+        if window != self._window:
+            # Counts from earlier windows no longer matter
+            self._window = window
+            self._subscribes.clear()
+        count = self._subscribes.get(key, 0)
+        if count >= self.subscribes_per_minute:
+            metrics.inc("ws_subscribe_rate_limited_total")
+            return False
+        self._subscribes[key] = count + 1
+        return True
+
+    def room(self, key: str) -> int:
+        """How many more subscriptions ``key`` may hold."""
+        return max(self.max_subscriptions - self._held.get(key, 0), 0)
+
+    def hold(self, key: str) -> None:
+        self._held[key] = self._held.get(key, 0) + 1
+
+    def release(self, key: str) -> None:
+        remaining = self._held[key] - 1
+        if remaining:
+            self._held[key] = remaining
+        else:
+            del self._held[key]
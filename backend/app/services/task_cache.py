@@ -0,0 +1,111 @@
+"""
+Terminal-state task result cache.
+
+Once ACE-Step reports a task as completed (1) or failed (2) its result never
+changes, so routes keep the parsed result here and skip the upstream
+/query_result round trip on every later status poll or audio download.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+# ACE-Step status codes whose result is final
+TERMINAL_STATUSES = frozenset({1, 2})
+
+# Rough per-entry bookkeeping overhead, added to the payload size estimate
+_ENTRY_OVERHEAD_BYTES = 256
+
+
+@dataclass(slots=True)
+class TaskResult:
+    """A task status as returned by /query_result, with its result parsed."""
+
+    status: int
+    results: list[dict[str, Any]] = field(default_factory=list)
+    error: str | None = None
+    size: int = 0
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+
+class TaskResultCache:
+    """Bounded LRU + TTL cache of terminal task results keyed by task_id."""
+
+    def __init__(
+        self,
+        max_entries: int = settings.TASK_CACHE_MAX_ENTRIES,
+        max_bytes: int = settings.TASK_CACHE_MAX_BYTES,
+        ttl: float = settings.TASK_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[TaskResult, float]] = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, task_id: str) -> TaskResult | None:
+        """Return the cached result for ``task_id`` or None on miss / expiry."""
+        item = self._entries.get(task_id)
+        if item is not None and item[1] <= self._clock():
+            self._remove(task_id)
+            self._update_gauges()
+            item = None
+
+        if item is None:
+            self.misses += 1
+            metrics.inc("task_cache_misses_total")
+            return None
+
+        self._entries.move_to_end(task_id)
+        self.hits += 1
+        metrics.inc("task_cache_hits_total")
+        return item[0]
+
+    def put(self, task_id: str, result: TaskResult) -> None:
+        """Cache a terminal result; non-terminal or oversized results are ignored."""
+        if not result.is_terminal:
+            return
+        size = result.size + len(task_id) + _ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+
+        if task_id in self._entries:
+            self._remove(task_id)
+        self._entries[task_id] = (result, self._clock() + self.ttl)
+        self.total_bytes += size
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            metrics.inc("task_cache_evictions_total")
+        self._update_gauges()
+
+    def discard(self, task_id: str) -> None:
+        if task_id in self._entries:
+            self._remove(task_id)
+            self._update_gauges()
+
+    def _remove(self, task_id: str) -> None:
+        result, _ = self._entries.pop(task_id)
+        self.total_bytes -= result.size + len(task_id) + _ENTRY_OVERHEAD_BYTES
+
+    def _update_gauges(self) -> None:
+        metrics.set_gauge("task_cache_entries", len(self._entries))
+        metrics.set_gauge("task_cache_bytes", self.total_bytes)
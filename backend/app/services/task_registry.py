@@ -0,0 +1,127 @@
+"""
+In-process registry of generation tasks.
+
+Records every task submitted through this backend (owning session, submit
+time, request parameters) and what status lookups have learned about it,
+notably the resolved upstream audio paths. Routes use it to turn a task_id
+into a file path without an upstream /query_result round trip. Entries
+expire after a TTL and are swept lazily.
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+# How often expired records are swept, at most
+_GC_INTERVAL_SECONDS = 60.0
+
+
+@dataclass(slots=True)
+class TaskRecord:
+    """What the backend knows about one task."""
+
+    task_id: str
+    session_id: str | None = None
+    submitted_at: float | None = None
+    params: dict[str, Any] | None = None
+    status: int = 0
+    audio_paths: list[str] = field(default_factory=list)
+    expires_at: float = 0.0
+
+
+class TaskRegistry:
+    """TTL-bounded mapping of task_id to TaskRecord."""
+
+    def __init__(
+        self,
+        ttl: float = settings.TASK_REGISTRY_TTL_SECONDS,
+        max_entries: int = settings.TASK_REGISTRY_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+        on_complete: Callable[[str, list[str]], None] | None = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        # Called with (task_id, audio_paths) the first time a task is seen completed
+        self._on_complete = on_complete
+        self._records: dict[str, TaskRecord] = {}
+        self._next_gc = clock() + _GC_INTERVAL_SECONDS
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def register(
+        self,
+        task_id: str,
+        session_id: str | None,
+        params: dict[str, Any] | None = None,
+    ) -> TaskRecord:
+        """Record a newly submitted task."""
+        record = TaskRecord(
+            task_id=task_id,
+            session_id=session_id,
+            submitted_at=time.time(),
+            params=params,
+        )
+        self._store(record)
+        return record
+
+    def observe(self, task_id: str, status: int, audio_paths: list[str]) -> None:
+        """Update (or create) a record from a status lookup."""
+        record = self.get(task_id)
+        if record is None:
+            record = TaskRecord(task_id=task_id)
+        newly_completed = status == 1 and record.status != 1
+        record.status = status
+        if audio_paths:
+            record.audio_paths = audio_paths
+        self._store(record)
+
+        if newly_completed and record.audio_paths and self._on_complete is not None:
+            self._on_complete(task_id, record.audio_paths)
+
+    def get(self, task_id: str) -> TaskRecord | None:
+        record = self._records.get(task_id)
+        if record is not None and record.expires_at <= self._clock():
+            del self._records[task_id]
+            return None
+        return record
+
+    def audio_paths(self, task_id: str) -> list[str] | None:
+        """Resolved audio paths of a completed task, or None if not known locally."""
+        record = self.get(task_id)
+        if record is None or record.status != 1 or not record.audio_paths:
+            metrics.inc("task_registry_path_misses_total")
+            return None
+        metrics.inc("task_registry_path_hits_total")
+        return record.audio_paths
+
+    def discard(self, task_id: str) -> None:
+        self._records.pop(task_id, None)
+
+    def collect_garbage(self) -> int:
+        """Drop expired records; returns how many were removed."""
+        now = self._clock()
+        expired = [tid for tid, rec in self._records.items() if rec.expires_at <= now]
+        for task_id in expired:
+            del self._records[task_id]
+        self._next_gc = now + _GC_INTERVAL_SECONDS
+        metrics.set_gauge("task_registry_entries", len(self._records))
+        return len(expired)
+
+    def _store(self, record: TaskRecord) -> None:
+        now = self._clock()
+        record.expires_at = now + self.ttl
+        # Re-insert so iteration order tracks last update (oldest first)
+        self._records.pop(record.task_id, None)
+        self._records[record.task_id] = record
+
+        if now >= self._next_gc:
+            self.collect_garbage()
+        while len(self._records) > self.max_entries:
+            del self._records[next(iter(self._records))]
+        metrics.set_gauge("task_registry_entries", len(self._records))
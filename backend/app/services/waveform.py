@@ -0,0 +1,187 @@
+"""
+Waveform peaks for cached audio.
+
+Decoding and reduction are CPU bound, so they run in a process pool: the
+track is decoded to a (frames, channels) float array and reduced to per-bucket
+min / max values with vectorized NumPy operations. WAV is decoded with the
+standard library; MP3 and FLAC need the optional ``soundfile`` package
+(libsndfile). Results are quantized to signed 8-bit and stored as a sidecar
+next to the cached track, so each (track, bucket count) is computed once.
+"""
+
+import asyncio
+import time
+import wave
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.core import json_codec
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.audio_cache import AudioCache, AudioCacheEntry
+
+try:
+    import soundfile
+except ImportError:  # pragma: no cover - exercised when soundfile is absent
+    soundfile = None
+
+# Content types decodable without soundfile
+_WAV_TYPES = frozenset({"audio/wav", "audio/x-wav", "audio/wave"})
+
+
+class UnsupportedAudioError(Exception):
+    """The track's format cannot be decoded here."""
+
+
+def supports(content_type: str) -> bool:
+    """Whether peaks can be computed for audio of ``content_type``."""
+    return content_type in _WAV_TYPES or soundfile is not None
+
+
+def _decode_wav(path: str) -> tuple[np.ndarray, int]:
+    """Decode PCM WAV into float32 samples in [-1, 1], shaped (frames, channels)."""
+    try:
+        with wave.open(path, "rb") as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            rate = wav.getframerate()
+            raw = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise UnsupportedAudioError(f"Unsupported WAV file: {e}") from e
+
+    if width == 1:
+        samples = np.frombuffer(raw, dtype=np.uint8).astype(np.int32) - 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2")
+    elif width == 3:
+        triplets = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = triplets[:, 0] | (triplets[:, 1] << 8) | (triplets[:, 2] << 16)
+        samples = np.where(samples & 0x800000, samples - 0x1000000, samples)
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4")
+    else:
+        raise UnsupportedAudioError(f"Unsupported WAV sample width: {width}")
+
+    scale = float(1 << (8 * width - 1))
+    return (samples.astype(np.float32) / scale).reshape(-1, channels), rate
+
+
+def _decode(path: str, content_type: str) -> tuple[np.ndarray, int]:
+    if content_type in _WAV_TYPES:
+        return _decode_wav(path)
+    if soundfile is None:
+        raise UnsupportedAudioError(f"Cannot decode {content_type} audio")
+    try:
+        samples, rate = soundfile.read(path, dtype="float32", always_2d=True)
+    except RuntimeError as e:
+        raise UnsupportedAudioError(f"Cannot decode audio: {e}") from e
+    return samples, rate
+
+
+def reduce_peaks(samples: np.ndarray, buckets: int) -> tuple[np.ndarray, np.ndarray]:
+    """Per-bucket minimum and maximum over all channels of ``samples``."""
+    if samples.size == 0:
+        empty = np.zeros(0, dtype=np.float32)
+        return empty, empty
+    low = samples.min(axis=1)
+    high = samples.max(axis=1)
+    buckets = min(buckets, len(low))
+    starts = np.linspace(0, len(low), buckets, endpoint=False).astype(np.intp)
+    return np.minimum.reduceat(low, starts), np.maximum.reduceat(high, starts)
+
+
+def compute_peaks(path: str, content_type: str, buckets: int) -> dict[str, Any]:
+    """Decode a track and reduce it to int8 min / max peaks (runs in a worker)."""
+    samples, rate = _decode(path, content_type)
+    low, high = reduce_peaks(samples, buckets)
+
+    def quantize(values: np.ndarray) -> list[int]:
+        return np.clip(np.rint(values * 127), -127, 127).astype(np.int8).tolist()
+
+    return {
+        "sample_rate": int(rate),
+        "channels": int(samples.shape[1]),
+        "duration": round(len(samples) / rate, 3) if rate else 0.0,
+        "buckets": len(low),
+        "min": quantize(low),
+        "max": quantize(high),
+    }
+
+
+class WaveformService:
+    """Computes peaks off the event loop and caches them beside the audio."""
+
+    def __init__(
+        self,
+        cache: AudioCache,
+        workers: int = settings.WAVEFORM_WORKERS,
+        executor_factory: Callable[[], Executor] | None = None,
+    ):
+        self._cache = cache
+        self.workers = workers
+        self._executor_factory = executor_factory or (
+            lambda: ProcessPoolExecutor(max_workers=self.workers)
+        )
+        self._executor: Executor | None = None
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def peaks(self, entry: AudioCacheEntry, buckets: int) -> dict[str, Any]:
+        """
+        Peaks of a cached track, computed at most once per bucket count.
+
+        Raises UnsupportedAudioError if the track cannot be decoded.
+        """
+        sidecar = self._cache.sidecar_path(entry, f"peaks-{buckets}.json")
+        try:
+            peaks = json_codec.loads(await asyncio.to_thread(sidecar.read_bytes))
+        except (OSError, json_codec.JSONDecodeError):
+            peaks = None
+        if peaks is not None:
+            metrics.inc("waveform_peaks_cache_hits_total")
+            return peaks
+
+        # Concurrent requests for the same peaks share one computation
+        future = self._inflight.get(sidecar.name)
+        if future is None:
+            future = asyncio.ensure_future(self._compute(entry, buckets, sidecar))
+            self._inflight[sidecar.name] = future
+            future.add_done_callback(lambda f: self._release(sidecar.name, f))
+        return await asyncio.shield(future)
+
+    def close(self) -> None:
+        """Shut the worker pool down (used on application shutdown)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _compute(
+        self, entry: AudioCacheEntry, buckets: int, sidecar: Path
+    ) -> dict[str, Any]:
+        if self._executor is None:
+            self._executor = self._executor_factory()
+        started = time.perf_counter()
+        peaks = await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            compute_peaks,
+            str(entry.path),
+            entry.content_type,
+            buckets,
+        )
+        metrics.observe("waveform_peaks_compute_seconds", time.perf_counter() - started)
+        metrics.inc("waveform_peaks_computed_total")
+
+        tmp = sidecar.with_name(f"{sidecar.name}.part")
+        await asyncio.to_thread(tmp.write_bytes, json_codec.dumps(peaks))
+        await asyncio.to_thread(tmp.replace, sidecar)
+        return peaks
+
+    def _release(self, name: str, future: asyncio.Future) -> None:
+        if self._inflight.get(name) is future:
+            del self._inflight[name]
+        # Mark the exception as retrieved in case every caller went away
+        if not future.cancelled():
+            future.exception()
@@ -0,0 +1,53 @@
+"""
+Streaming ZIP archives.
+
+Builds a ZIP from async byte sources and yields it as it is written, so an
+archive of several audio files is never held in memory or on disk. Members
+are stored uncompressed (audio is already compressed), and because the
+output is unseekable ``zipfile`` writes sizes and CRCs in data descriptors
+after each member.
+"""
+
+import time
+import zipfile
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable
+
+# A member's name and a factory for its content
+ZipMember = tuple[str, Callable[[], AsyncIterable[bytes]]]
+
+
+class _Sink:
+    """Write-only, unseekable file object that buffers until drained."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_zip(members: Iterable[ZipMember]) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive of ``members``, reading each source only once."""
+    sink = _Sink()
+    date_time = time.localtime()[:6]
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for name, open_member in members:
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            with archive.open(info, mode="w") as member:
+                async for chunk in open_member():
+                    member.write(chunk)
+                    if data := sink.drain():
+                        yield data
+            if data := sink.drain():
+                yield data
+    # Central directory
+    yield sink.drain()
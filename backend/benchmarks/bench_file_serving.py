@@ -0,0 +1,157 @@
+"""
+Throughput and server memory when serving a cached audio file.
+
+Starts uvicorn in a child process with one route per way of sending a file
+from disk, then downloads a large WAV-sized file from it with N concurrent
+clients and reports throughput together with the server's peak anonymous
+RSS (Python heap and buffers) and file-backed RSS (mapped page cache,
+shared with the OS and every other mapping of the file), sampled from
+/proc while the downloads run:
+
+  stream  - StreamingResponse over a generator reading 64 KiB bytes chunks
+  file    - Starlette's FileResponse (64 KiB reads into bytes)
+  mapped  - MappedFileResponse (sendfile extension, else mmap slices)
+
+Each mode gets a fresh server so peaks do not carry over. RSS columns are
+only available on Linux.
+
+Usage (from backend/):
+    python benchmarks/bench_file_serving.py --megabytes 256 --clients 32
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import FileResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.services.file_response import MappedFileResponse
+
+MODES = ("stream", "file", "mapped")
+
+
+def _app(path: str) -> Starlette:
+    async def chunks():
+        with await asyncio.to_thread(open, path, "rb") as f:
+            while chunk := await asyncio.to_thread(f.read, 65536):
+                yield chunk
+
+    async def stream(request):
+        return StreamingResponse(chunks(), media_type="audio/wav")
+
+    async def file(request):
+        return FileResponse(path, media_type="audio/wav")
+
+    async def mapped(request):
+        return MappedFileResponse(path, media_type="audio/wav")
+
+    return Starlette(
+        routes=[Route(f"/{name}", f) for name, f in zip(MODES, (stream, file, mapped))]
+    )
+
+
+def _serve(sock: socket.socket, path: str) -> None:
+    config = uvicorn.Config(_app(path), log_level="warning")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _memory_mb(pid: int) -> tuple[float, float] | None:
+    """(anonymous, file-backed) RSS of a process in MiB, Linux only."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            fields = dict(line.split(":", 1) for line in f)
+    except OSError:
+        return None
+    kib = [int(fields[name].split()[0]) for name in ("RssAnon", "RssFile")]
+    return kib[0] / 1024, kib[1] / 1024
+
+
+async def _download(client: httpx.AsyncClient, url: str) -> int:
+    received = 0
+    async with client.stream("GET", url) as resp:
+        async for chunk in resp.aiter_raw():
+            received += len(chunk)
+    return received
+
+
+async def measure(url: str, pid: int, clients: int, rounds: int):
+    peak = (0.0, 0.0)
+    done = asyncio.Event()
+
+    async def sample():
+        nonlocal peak
+        while not done.is_set():
+            if memory := _memory_mb(pid):
+                peak = (max(peak[0], memory[0]), max(peak[1], memory[1]))
+            await asyncio.sleep(0.01)
+
+    sampler = asyncio.create_task(sample())
+    limits = httpx.Limits(max_connections=clients)
+    async with httpx.AsyncClient(timeout=None, limits=limits) as client:
+        started = time.perf_counter()
+        received = 0
+        for _ in range(rounds):
+            sizes = await asyncio.gather(
+                *(_download(client, url) for _ in range(clients))
+            )
+            received += sum(sizes)
+        elapsed = time.perf_counter() - started
+    done.set()
+    await sampler
+    return received / elapsed / 1024**2, peak if _memory_mb(pid) else None
+
+
+def run_mode(mode: str, path: str, clients: int, rounds: int) -> None:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(clients)
+    host, port = sock.getsockname()
+    server = multiprocessing.Process(target=_serve, args=(sock, path), daemon=True)
+    server.start()
+    try:
+        url = f"http://{host}:{port}/{mode}"
+        # Wait for the server to accept connections
+        while True:
+            try:
+                httpx.head(url)
+                break
+            except httpx.TransportError:
+                time.sleep(0.05)
+        rate, memory = asyncio.run(measure(url, server.pid, clients, rounds))
+        rss = f"{memory[0]:8.1f} {memory[1]:8.1f}" if memory else "     n/a      n/a"
+        print(f"{mode:8} {rate:9.1f} {rss}")
+    finally:
+        server.terminate()
+        server.join()
+
+
+def main(megabytes: int, clients: int, rounds: int) -> None:
+    with tempfile.NamedTemporaryFile(suffix=".wav") as f:
+        block = os.urandom(1024 * 1024)
+        for _ in range(megabytes):
+            f.write(block)
+        f.flush()
+        print(f"file: {megabytes} MiB, {clients} clients x {rounds} rounds")
+        print(f"{'mode':8} {'MiB/s':>9} {'anon MiB':>8} {'file MiB':>8}")
+        for mode in MODES:
+            run_mode(mode, f.name, clients, rounds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--megabytes", type=int, default=256)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=1)
+    args = parser.parse_args()
+    main(args.megabytes, args.clients, args.rounds)
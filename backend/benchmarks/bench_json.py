@@ -0,0 +1,127 @@
+"""
+JSON codec microbenchmark on realistic /query_result payloads.
+
+Builds an ACE-Step response envelope for completed batch_size=4 tasks with
+long lyrics (the ``result`` field is itself a JSON string) and times the
+three hot-path steps for the stdlib and orjson backends:
+
+  decode   - envelope decode in ACEStepClient._unwrap
+  parse    - nested ``result`` parse in _parse_acestep_result
+  encode   - job status response rendering
+
+Usage (from backend/):
+    python benchmarks/bench_json.py --tasks 20 --lyrics-chars 4000
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import json_codec
+
+_orjson = json_codec.orjson
+
+
+def _lyrics(chars: int) -> str:
+    rng = random.Random(42)
+    lines = []
+    while sum(len(line) + 1 for line in lines) < chars:
+        if len(lines) % 9 == 0:
+            lines.append(rng.choice(["[Verse]", "[Chorus]", "[Bridge]"]))
+        words = (
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9)))
+            for _ in range(rng.randint(4, 9))
+        )
+        lines.append(" ".join(words))
+    return "\n".join(lines)
+
+
+def build_envelope(tasks: int, lyrics_chars: int) -> bytes:
+    lyrics = _lyrics(lyrics_chars)
+    data = []
+    for i in range(tasks):
+        items = [
+            {
+                "file": f"/v1/audio?path=%2Foutputs%2Ftask-{i}-{j}.mp3",
+                "prompt": "Epic orchestral soundtrack with soaring strings",
+                "lyrics": lyrics,
+                "metas": {
+                    "prompt": "Epic orchestral soundtrack with soaring strings",
+                    "lyrics": lyrics,
+                    "bpm": 120,
+                    "duration": 180,
+                    "keyscale": "D Minor",
+                    "timesignature": "4",
+                },
+                "seed_value": str(random.Random(j).randint(0, 2**31)),
+            }
+            for j in range(4)
+        ]
+        data.append({"task_id": f"task-{i}", "status": 1, "result": json.dumps(items)})
+    envelope = {"data": data, "code": 200, "error": None, "timestamp": 0}
+    return json.dumps(envelope).encode()
+
+
+def run(label: str, body: bytes, number: int) -> dict[str, float]:
+    envelope = json_codec.loads(body)
+    results = [json_codec.loads(task["result"]) for task in envelope["data"]]
+    responses = [
+        {
+            "task_id": task["task_id"],
+            "status": "completed",
+            "audio_urls": [f"/api/audio/{task['task_id']}?index={i}" for i in range(4)],
+            "metadata": items[0]["metas"],
+        }
+        for task, items in zip(envelope["data"], results)
+    ]
+
+    timings = {
+        "decode": timeit.timeit(lambda: json_codec.loads(body), number=number),
+        "parse": timeit.timeit(
+            lambda: [json_codec.loads(task["result"]) for task in envelope["data"]],
+            number=number,
+        ),
+        "encode": timeit.timeit(
+            lambda: [json_codec.dumps(r) for r in responses], number=number
+        ),
+    }
+    per_call = {k: v / number * 1e6 for k, v in timings.items()}
+    print(
+        f"{label:8s} "
+        + "  ".join(f"{k} {v:9.1f} us" for k, v in per_call.items())
+        + f"  total {sum(per_call.values()):9.1f} us"
+    )
+    return per_call
+
+
+def main(tasks: int, lyrics_chars: int, number: int) -> None:
+    body = build_envelope(tasks, lyrics_chars)
+    print(f"payload: {tasks} tasks x 4 results, {len(body) / 1024:.0f} KiB envelope")
+
+    json_codec.orjson = None
+    stdlib = run("json", body, number)
+    if _orjson is None:
+        print("orjson not installed; only the stdlib backend was measured")
+        return
+    json_codec.orjson = _orjson
+    fast = run("orjson", body, number)
+    print(
+        "speedup  "
+        + "  ".join(f"{k} {stdlib[k] / fast[k]:8.1f}x   " for k in stdlib)
+        + f"  total {sum(stdlib.values()) / sum(fast.values()):8.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--lyrics-chars", type=int, default=4000)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+    main(args.tasks, args.lyrics_chars, args.number)
@@ -0,0 +1,108 @@
+"""
+CPU cost per GB of relaying an upstream audio body.
+
+Starts a stand-in ACE-Step audio server in a child process (so its CPU is
+not counted) that answers every request with a large identity-encoded body,
+then streams it through httpx the way download_audio does and reports the
+relaying process's CPU seconds per GB for:
+
+  rechunk  - resp.aiter_bytes(chunk_size=65536), the previous relay loop
+  raw      - upstream_chunks(resp), the pass-through relay loop
+
+Usage (from backend/):
+    python benchmarks/bench_proxy_cpu.py --megabytes 1024 --rounds 3
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from app.services.chunking import upstream_chunks
+
+
+def _serve(sock: socket.socket, body_bytes: int) -> None:
+    """Answer each connection with ``body_bytes`` of audio, keep-alive."""
+    block = os.urandom(1024 * 1024)
+
+    async def handle(reader, writer):
+        while True:
+            try:
+                await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                writer.close()
+                return
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: audio/mpeg\r\n"
+                + f"Content-Length: {body_bytes}\r\n\r\n".encode()
+            )
+            remaining = body_bytes
+            while remaining:
+                piece = block[: min(remaining, len(block))]
+                writer.write(piece)
+                remaining -= len(piece)
+                await writer.drain()
+
+    async def main():
+        server = await asyncio.start_server(handle, sock=sock)
+        await server.serve_forever()
+
+    asyncio.run(main())
+
+
+async def _relay(client: httpx.AsyncClient, url: str, raw: bool) -> int:
+    received = 0
+    async with client.stream("GET", url) as resp:
+        chunks = upstream_chunks(resp) if raw else resp.aiter_bytes(chunk_size=65536)
+        async for chunk in chunks:
+            received += len(chunk)
+    return received
+
+
+async def measure(url: str, raw: bool, rounds: int) -> float:
+    """Best CPU seconds per GB over ``rounds`` downloads."""
+    best = float("inf")
+    async with httpx.AsyncClient(timeout=None) as client:
+        for _ in range(rounds):
+            started = time.process_time()
+            received = await _relay(client, url, raw)
+            cpu = time.process_time() - started
+            best = min(best, cpu / (received / 1e9))
+    return best
+
+
+def main(megabytes: int, rounds: int) -> None:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen()
+    host, port = sock.getsockname()
+    server = multiprocessing.Process(
+        target=_serve, args=(sock, megabytes * 1024 * 1024), daemon=True
+    )
+    server.start()
+    url = f"http://{host}:{port}/v1/audio"
+    try:
+        print(f"body: {megabytes} MiB, best of {rounds}")
+        before = asyncio.run(measure(url, raw=False, rounds=rounds))
+        print(f"rechunk  {before:6.3f} CPU s/GB")
+        after = asyncio.run(measure(url, raw=True, rounds=rounds))
+        print(f"raw      {after:6.3f} CPU s/GB")
+        print(f"saving   {1 - after / before:6.1%}")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--megabytes", type=int, default=1024)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    main(args.megabytes, args.rounds)
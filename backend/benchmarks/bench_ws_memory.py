@@ -0,0 +1,131 @@
+"""
+Memory per idle connection on the /api/jobs/ws WebSocket.
+
+Opens N in-process ASGI WebSocket connections against the real app (no
+network stack, so only server-side state is measured), subscribes each one
+to a few running tasks, waits until every initial status has been sent and
+then reports Python heap growth (tracemalloc) and peak RSS per connection.
+
+Usage (from backend/):
+    python benchmarks/bench_ws_memory.py --connections 10000 --tasks 4
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import resource
+import sys
+import tracemalloc
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.routes.generation import fetch_task_results
+from app.main import app
+from app.services.status_poller import StatusPoller
+from app.services.task_cache import TaskResultCache
+from app.services.task_registry import TaskRegistry
+
+
+class StubACEStepClient:
+    """Reports every task as still processing."""
+
+    async def query_result(self, task_ids):
+        return [{"task_id": tid, "status": 0} for tid in task_ids]
+
+
+def _scope() -> dict:
+    return {
+        "type": "websocket",
+        "asgi": {"version": "3.0"},
+        "scheme": "ws",
+        "path": "/api/jobs/ws",
+        "raw_path": b"/api/jobs/ws",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+        "subprotocols": [],
+    }
+
+
+async def open_connection(task_ids: list[str], sent: asyncio.Queue):
+    inbox: asyncio.Queue = asyncio.Queue()
+    inbox.put_nowait({"type": "websocket.connect"})
+    inbox.put_nowait(
+        {
+            "type": "websocket.receive",
+            "text": json.dumps({"action": "subscribe", "task_ids": task_ids}),
+        }
+    )
+
+    async def send(message):
+        if message["type"] == "websocket.send":
+            sent.put_nowait(None)
+
+    task = asyncio.create_task(app(_scope(), inbox.get, send))
+    return task, inbox
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024**2 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+async def main(connections: int, tasks_per_connection: int) -> None:
+    app.state.acestep_client = StubACEStepClient()
+    app.state.task_cache = TaskResultCache()
+    app.state.task_registry = TaskRegistry()
+    app.state.status_poller = StatusPoller(
+        partial(
+            fetch_task_results,
+            app.state.acestep_client,
+            app.state.task_cache,
+            app.state.task_registry,
+        ),
+        interval=3600,
+    )
+
+    sent: asyncio.Queue = asyncio.Queue()
+    gc.collect()
+    tracemalloc.start()
+    heap_before, _ = tracemalloc.get_traced_memory()
+    rss_before = _rss_mb()
+
+    conns = []
+    for i in range(connections):
+        task_ids = [f"task-{i}-{j}" for j in range(tasks_per_connection)]
+        conns.append(await open_connection(task_ids, sent))
+    for _ in range(connections * tasks_per_connection):
+        await sent.get()
+
+    gc.collect()
+    heap_after, heap_peak = tracemalloc.get_traced_memory()
+    rss_after = _rss_mb()
+    tracemalloc.stop()
+
+    per_conn = (heap_after - heap_before) / connections
+    print(f"connections:            {connections}")
+    print(f"tasks per connection:   {tasks_per_connection}")
+    print(f"watched tasks:          {app.state.status_poller.watched_tasks}")
+    print(f"heap growth:            {(heap_after - heap_before) / 1024**2:.1f} MiB")
+    print(f"heap per connection:    {per_conn / 1024:.2f} KiB")
+    print(f"heap peak:              {heap_peak / 1024**2:.1f} MiB")
+    print(f"peak RSS growth:        {rss_after - rss_before:.1f} MiB")
+
+    for _, inbox in conns:
+        inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+    await asyncio.gather(*(task for task, _ in conns))
+    await app.state.status_poller.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--tasks", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.connections, args.tasks))
@@ -1,5 +1,7 @@
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from unittest.mock import AsyncMock, MagicMock
 from httpx import AsyncClient, ASGITransport
 
@@ -8,12 +10,26 @@ sys.path.insert(
     0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 )
 
+# Audio URLs are only signed with a real secret
+os.environ.setdefault("SESSION_SECRET", "test-session-secret")
+
+import pytest
 import pytest_asyncio
 from app.services.acestep_client import ACEStepClient
+from app.services.audio_cache import AudioCache
+from app.services.audio_fanout import AudioFanout
+from app.services.audio_prefetch import AudioPrefetcher
+from app.services.audio_preview import AudioPreviewer
+from app.services.download_limiter import DownloadLimiter
+from app.services.status_poller import StatusPoller
+from app.services.subscription_limiter import SubscriptionLimiter
+from app.services.task_cache import TaskResultCache
+from app.services.task_registry import TaskRegistry
+from app.services.waveform import WaveformService
 
 
-@pytest_asyncio.fixture
-async def mock_acestep_client():
+@pytest.fixture
+def mock_acestep_client():
     """Create a fully-mocked ACEStepClient."""
     client = MagicMock(spec=ACEStepClient)
     client.submit_task = AsyncMock()
@@ -26,15 +42,88 @@ async def mock_acestep_client():
     return client
 
 
+def _install_app_state(app, client, cache_dir):
+    """Point the app at the mocked client and start from empty caches."""
+    from app.api.routes.generation import fetch_task_results
+
+    app.state.acestep_client = client
+    app.state.task_cache = TaskResultCache()
+    app.state.task_registry = TaskRegistry()
+    app.state.audio_cache = AudioCache(cache_dir, max_bytes=64 * 1024**2)
+    app.state.audio_fanout = AudioFanout(app.state.audio_cache)
+    # Not wired to the registry: tests opt in to prefetching explicitly
+    app.state.audio_prefetcher = AudioPrefetcher(
+        client, app.state.audio_cache, app.state.audio_fanout
+    )
+    app.state.audio_previewer = AudioPreviewer(app.state.audio_cache)
+    app.state.download_limiter = DownloadLimiter()
+    # Threads instead of worker processes keep the tests fast
+    app.state.waveform_service = WaveformService(
+        app.state.audio_cache, executor_factory=lambda: ThreadPoolExecutor(1)
+    )
+    app.state.status_poller = StatusPoller(
+        partial(
+            fetch_task_results, client, app.state.task_cache, app.state.task_registry
+        ),
+        interval=0.01,
+    )
+    app.state.subscription_limiter = SubscriptionLimiter()
+
+
 @pytest_asyncio.fixture
-async def async_client(mock_acestep_client):
+async def async_client(mock_acestep_client, tmp_path):
     """Create a test client with the mocked ACE-Step client injected."""
     from app.main import app
 
     # Override the lifespan-managed client
-    app.state.acestep_client = mock_acestep_client
+    _install_app_state(app, mock_acestep_client, tmp_path / "audio")
 
     async with AsyncClient(
         transport=ASGITransport(app=app), base_url="http://test"
     ) as ac:
         yield ac
+
+    await app.state.status_poller.close()
+    await app.state.audio_prefetcher.close()
+    await app.state.audio_fanout.close()
+    app.state.waveform_service.close()
+
+
+@pytest.fixture
+def ws_client(mock_acestep_client, tmp_path):
+    """Synchronous test client for WebSocket routes."""
+    from starlette.testclient import TestClient
+
+    from app.main import app
+
+    _install_app_state(app, mock_acestep_client, tmp_path / "audio")
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_wav():
+    """Factory encoding int samples shaped (frames, channels) as PCM WAV bytes."""
+    import io
+    import wave
+
+    import numpy as np
+
+    def encode(samples, rate=8000, width=2):
+        samples = np.asarray(samples)
+        if samples.ndim == 1:
+            samples = samples[:, None]
+        if width == 1:
+            raw = (samples + 128).astype(np.uint8).tobytes()
+        elif width == 3:
+            raw = samples.astype("<i4").view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+        else:
+            raw = samples.astype(f"<i{width}").tobytes()
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(samples.shape[1])
+            wav.setsampwidth(width)
+            wav.setframerate(rate)
+            wav.writeframes(raw)
+        return buffer.getvalue()
+
+    return encode
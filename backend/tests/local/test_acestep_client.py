@@ -1,6 +1,6 @@
 import pytest
 from httpx import Response, TimeoutException
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 from app.services.acestep_client import ACEStepClient, ACEStepError
 
 
@@ -185,6 +185,243 @@ async def test_query_result_connect_error(acestep_client, mock_httpx_client):
     assert exc.value.status_code == 503
 
 
+@pytest.mark.asyncio
+async def test_query_result_batches_concurrent_callers(
+    acestep_client, mock_httpx_client
+):
+    import asyncio
+
+    mock_httpx_client.post.return_value = Response(
+        200,
+        json={
+            "data": [
+                {"task_id": "a", "status": 1},
+                {"task_id": "b", "status": 0},
+            ],
+            "error": None,
+        },
+    )
+    acestep_client.batch_window = 0.01
+
+    result_a, result_b, result_both = await asyncio.gather(
+        acestep_client.query_result(["a"]),
+        acestep_client.query_result(["b"]),
+        acestep_client.query_result(["a", "b"]),
+    )
+
+    mock_httpx_client.post.assert_called_once()
+    assert mock_httpx_client.post.call_args.kwargs["json"] == {
+        "task_id_list": ["a", "b"]
+    }
+    assert result_a == [{"task_id": "a", "status": 1}]
+    assert result_b == [{"task_id": "b", "status": 0}]
+    assert [t["task_id"] for t in result_both] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_query_result_batch_maps_positionally_without_task_ids(
+    acestep_client, mock_httpx_client
+):
+    import asyncio
+
+    mock_httpx_client.post.return_value = Response(
+        200, json={"data": [{"status": 1}, {"status": 2}], "error": None}
+    )
+
+    result_a, result_b = await asyncio.gather(
+        acestep_client.query_result(["a"]),
+        acestep_client.query_result(["b"]),
+    )
+    assert result_a == [{"status": 1}]
+    assert result_b == [{"status": 2}]
+
+
+@pytest.mark.asyncio
+async def test_query_result_batch_asks_separately_when_entries_are_missing(
+    acestep_client, mock_httpx_client
+):
+    import asyncio
+
+    def answer(url, json, **kwargs):
+        # Unknown tasks are left out, and entries carry no task_id
+        known = [{"status": 1} for tid in json["task_id_list"] if tid == "real"]
+        return Response(200, json={"data": known, "error": None})
+
+    mock_httpx_client.post.side_effect = answer
+
+    unknown, real = await asyncio.gather(
+        acestep_client.query_result(["unknown"]),
+        acestep_client.query_result(["real"]),
+    )
+    assert unknown == []
+    assert real == [{"status": 1}]
+    assert mock_httpx_client.post.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_query_result_batch_flushes_at_max_size(
+    acestep_client, mock_httpx_client
+):
+    import asyncio
+
+    mock_httpx_client.post.return_value = Response(
+        200, json={"data": [], "error": None}
+    )
+    acestep_client.batch_window = 60
+    acestep_client.batch_max_size = 2
+
+    # Would hang for the full window if the size cap did not trigger a flush
+    await asyncio.wait_for(
+        asyncio.gather(
+            acestep_client.query_result(["a"]),
+            acestep_client.query_result(["b"]),
+        ),
+        timeout=1,
+    )
+    mock_httpx_client.post.assert_called_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("window", [0, 0.01])
+async def test_query_result_never_sends_more_than_max_size(
+    acestep_client, mock_httpx_client, window
+):
+    import asyncio
+
+    def answer(url, json, **kwargs):
+        # Positional entries: each request answers for its own IDs only
+        return Response(
+            200,
+            json={"data": [{"status": 0} for _ in json["task_id_list"]], "error": None},
+        )
+
+    mock_httpx_client.post.side_effect = answer
+    acestep_client.batch_window = window
+    acestep_client.batch_max_size = 50
+    many = [f"t{i}" for i in range(79)]
+
+    results, single = await asyncio.gather(
+        acestep_client.query_result(many), acestep_client.query_result(["x"])
+    )
+
+    sizes = [
+        len(call.kwargs["json"]["task_id_list"])
+        for call in mock_httpx_client.post.call_args_list
+    ]
+    assert max(sizes) <= 50
+    assert sum(sizes) == 80
+    assert len(results) == 79
+    assert single == [{"status": 0}]
+
+
+@pytest.mark.asyncio
+async def test_query_result_batch_propagates_errors(acestep_client, mock_httpx_client):
+    import asyncio
+
+    mock_httpx_client.post.side_effect = TimeoutException("timeout")
+    results = await asyncio.gather(
+        acestep_client.query_result(["a"]),
+        acestep_client.query_result(["b"]),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, ACEStepError) and r.status_code == 504 for r in results)
+    mock_httpx_client.post.assert_called_once()
+
+
+# ── single-flight ─────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_concurrent_list_models_share_one_request(
+    acestep_client, mock_httpx_client
+):
+    import asyncio
+
+    from app.core.metrics import metrics
+
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return Response(200, json={"data": [{"id": "m1"}], "error": None})
+
+    mock_httpx_client.get.side_effect = slow_get
+    saved_key = 'acestep_singleflight_saved_total{endpoint="/v1/models"}'
+    saved_before = metrics.counter(saved_key)
+
+    results = await asyncio.gather(*(acestep_client.list_models() for _ in range(5)))
+
+    assert results == [[{"id": "m1"}]] * 5
+    mock_httpx_client.get.assert_called_once()
+    assert metrics.counter(saved_key) - saved_before == 4
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_exceptions(acestep_client, mock_httpx_client):
+    import asyncio
+
+    async def failing_get(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        raise TimeoutException("timeout")
+
+    mock_httpx_client.get.side_effect = failing_get
+    results = await asyncio.gather(
+        acestep_client.health_check(),
+        acestep_client.health_check(),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, ACEStepError) for r in results)
+    mock_httpx_client.get.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_releases_after_completion(
+    acestep_client, mock_httpx_client
+):
+    mock_httpx_client.get.return_value = Response(
+        200, json={"data": {"status": "ok"}, "error": None}
+    )
+    await acestep_client.health_check()
+    await acestep_client.health_check()
+    assert mock_httpx_client.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_identical_query_result_calls_share_one_request(
+    acestep_client, mock_httpx_client
+):
+    import asyncio
+
+    mock_httpx_client.post.return_value = Response(
+        200, json={"data": [{"status": 0}], "error": None}
+    )
+    acestep_client.batch_window = 0
+
+    results = await asyncio.gather(
+        acestep_client.query_result(["a"]), acestep_client.query_result(["a"])
+    )
+    assert results == [[{"status": 0}], [{"status": 0}]]
+    mock_httpx_client.post.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_caller_cancellation(
+    acestep_client, mock_httpx_client
+):
+    import asyncio
+
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(0.02)
+        return Response(200, json={"data": [], "error": None})
+
+    mock_httpx_client.get.side_effect = slow_get
+    cancelled = asyncio.ensure_future(acestep_client.list_models())
+    survivor = asyncio.ensure_future(acestep_client.list_models())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await survivor == []
+    mock_httpx_client.get.assert_called_once()
+
+
 # ── download_audio_stream ─────────────────────────────────────────
 
 
@@ -203,6 +440,28 @@ async def test_download_audio_stream_non_200(acestep_client, mock_httpx_client):
     assert exc.value.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_download_audio_stream_forwards_range(acestep_client, mock_httpx_client):
+    mock_httpx_client.build_request = MagicMock()
+    mock_httpx_client.send.return_value = Response(206, content=b"6789")
+
+    resp = await acestep_client.download_audio_stream("file.wav", byte_range="bytes=6-")
+    assert resp.status_code == 206
+    headers = mock_httpx_client.build_request.call_args.kwargs["headers"]
+    assert headers["Range"] == "bytes=6-"
+
+
+@pytest.mark.asyncio
+async def test_download_audio_stream_range_not_satisfiable(
+    acestep_client, mock_httpx_client
+):
+    mock_httpx_client.send.return_value = Response(416)
+
+    with pytest.raises(ACEStepError) as exc:
+        await acestep_client.download_audio_stream("file.wav", byte_range="bytes=99-")
+    assert exc.value.status_code == 416
+
+
 @pytest.mark.asyncio
 async def test_download_audio_stream_timeout(acestep_client, mock_httpx_client):
     mock_httpx_client.send.side_effect = TimeoutException("timeout")
@@ -221,6 +480,24 @@ async def test_download_audio_stream_connect_error(acestep_client, mock_httpx_cl
     assert exc.value.status_code == 503
 
 
+@pytest.mark.asyncio
+async def test_download_audio_stream_uses_bulk_pool(mock_httpx_client):
+    bulk = AsyncMock()
+    bulk.build_request = MagicMock()
+    bulk.send.return_value = Response(200, content=b"audio")
+    client = ACEStepClient(mock_httpx_client, bulk)
+
+    resp = await client.download_audio_stream("file.mp3")
+    assert resp.status_code == 200
+    bulk.send.assert_called_once()
+    mock_httpx_client.send.assert_not_called()
+
+    mock_httpx_client.post.return_value = Response(200, json={"data": []})
+    await client.query_result(["task-1"])
+    mock_httpx_client.post.assert_called_once()
+    bulk.post.assert_not_called()
+
+
 # ── health_check ──────────────────────────────────────────────────
 
 
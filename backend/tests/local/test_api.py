@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from unittest.mock import MagicMock
 import httpx
@@ -266,13 +267,14 @@ async def test_download_audio(async_client, mock_acestep_client):
         {"status": 1, "result": result_str}
     ]
     mock_response = MagicMock(spec=httpx.Response)
+    mock_response.status_code = 200
     mock_response.headers = {"content-type": "audio/mpeg"}
 
     # We mock the async generator for the chunks
     async def mock_aiter_bytes(*args, **kwargs):
         yield b"fake-audio-data"
 
-    mock_response.aiter_bytes = mock_aiter_bytes
+    mock_response.aiter_raw = mock_aiter_bytes
     mock_acestep_client.download_audio_stream.return_value = mock_response
 
     response = await async_client.get("/api/audio/test-task?path=output/test.mp3")
@@ -395,6 +397,7 @@ async def test_get_job_status_completed_multiple_audio(
     assert data["status"] == "completed"
     assert "audio_urls" in data
     assert len(data["audio_urls"]) == 2
+    assert data["bundle_url"] == "/api/audio/task-123/bundle.zip"
 
 
 @pytest.mark.asyncio
@@ -483,6 +486,484 @@ async def test_get_job_status_failed_no_error_field(async_client, mock_acestep_c
     assert data["error"] == "Generation failed"
 
 
+@pytest.mark.asyncio
+async def test_get_job_status_terminal_result_is_cached(
+    async_client, mock_acestep_client
+):
+    mock_acestep_client.query_result.return_value = [
+        {"status": 2, "error": "Out of GPU memory"}
+    ]
+
+    first = await async_client.get("/api/jobs/cached-task")
+    second = await async_client.get("/api/jobs/cached-task")
+    assert first.json() == second.json()
+    mock_acestep_client.query_result.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_job_status_processing_is_not_cached(
+    async_client, mock_acestep_client
+):
+    mock_acestep_client.query_result.return_value = [{"status": 0}]
+
+    await async_client.get("/api/jobs/pending-task")
+    await async_client.get("/api/jobs/pending-task")
+    assert mock_acestep_client.query_result.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_download_audio_reuses_cached_status_lookup(
+    async_client, mock_acestep_client
+):
+    import json
+
+    result_str = json.dumps([{"file": "output/test.mp3"}])
+    mock_acestep_client.query_result.return_value = [
+        {"status": 1, "result": result_str}
+    ]
+    mock_response = MagicMock(spec=httpx.Response)
+    mock_response.status_code = 200
+    mock_response.headers = {"content-type": "audio/mpeg"}
+
+    async def mock_aiter_bytes(*args, **kwargs):
+        yield b"audio-data"
+
+    mock_response.aiter_raw = mock_aiter_bytes
+    mock_acestep_client.download_audio_stream.return_value = mock_response
+
+    status_resp = await async_client.get("/api/jobs/test-task")
+    assert status_resp.json()["status"] == "completed"
+    audio_resp = await async_client.get("/api/audio/test-task")
+    assert audio_resp.status_code == 200
+    mock_acestep_client.query_result.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_job_status_etag_not_modified(async_client, mock_acestep_client):
+    mock_acestep_client.query_result.return_value = [{"status": 0}]
+
+    first = await async_client.get("/api/jobs/etag-task")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    second = await async_client.get(
+        "/api/jobs/etag-task", headers={"If-None-Match": etag}
+    )
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_get_job_status_etag_changes_with_status(
+    async_client, mock_acestep_client
+):
+    mock_acestep_client.query_result.side_effect = [
+        [{"status": 0}],
+        [{"status": 2, "error": "boom"}],
+    ]
+
+    first = await async_client.get("/api/jobs/etag-task")
+    second = await async_client.get(
+        "/api/jobs/etag-task", headers={"If-None-Match": first.headers["etag"]}
+    )
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    assert second.json()["status"] == "failed"
+
+
+@pytest.mark.asyncio
+async def test_get_job_status_terminal_is_cacheable(
+    async_client, mock_acestep_client, monkeypatch
+):
+    from app.core.config import settings
+
+    mock_acestep_client.query_result.return_value = [{"status": 2}]
+    response = await async_client.get("/api/jobs/etag-task")
+    # Private: the first response also sets the session cookie
+    assert "set-cookie" in response.headers
+    assert response.headers["cache-control"] == (
+        f"private, max-age={settings.AUDIO_URL_TTL_SECONDS}"
+    )
+
+    # Without signed URLs in the body the configured max-age applies
+    monkeypatch.setattr(settings, "AUDIO_URL_TTL_SECONDS", 0)
+    response = await async_client.get("/api/jobs/etag-task")
+    assert response.headers["cache-control"] == (
+        f"private, max-age={settings.STATUS_CACHE_MAX_AGE_SECONDS}"
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_job_status_long_poll_returns_on_change(
+    async_client, mock_acestep_client
+):
+    mock_acestep_client.query_result.side_effect = [
+        [{"status": 0}],
+        [{"status": 0}],
+        [{"status": 2, "error": "boom"}],
+    ]
+
+    response = await async_client.get("/api/jobs/lp-task?wait=5")
+    assert response.status_code == 200
+    assert response.json() == {
+        "task_id": "lp-task",
+        "status": "failed",
+        "error": "boom",
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_job_status_long_poll_times_out(async_client, mock_acestep_client):
+    mock_acestep_client.query_result.return_value = [{"status": 0}]
+
+    response = await async_client.get("/api/jobs/lp-task?wait=0.05")
+    assert response.status_code == 200
+    assert response.json()["status"] == "processing"
+
+
+@pytest.mark.asyncio
+async def test_get_job_status_long_poll_wait_is_bounded(async_client):
+    response = await async_client.get("/api/jobs/lp-task?wait=3600")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_long_poll_stops_when_client_disconnects(
+    async_client, mock_acestep_client
+):
+    from app.api.routes.generation import _wait_for_change
+    from app.main import app
+    from app.services.task_cache import TaskResult
+
+    mock_acestep_client.query_result.return_value = [{"status": 0}]
+
+    class DisconnectedRequest:
+        def __init__(self):
+            self.app = app
+
+        async def receive(self):
+            return {"type": "http.disconnect"}
+
+    current = TaskResult(status=0)
+    result = await asyncio.wait_for(
+        _wait_for_change(DisconnectedRequest(), "lp-task", current, 30), timeout=1
+    )
+    assert result is current
+    assert app.state.status_poller.watched_tasks == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_job_status_pushes_transitions(async_client, mock_acestep_client):
+    import json
+
+    result_str = json.dumps([{"file": "output/track.mp3", "metas": {"bpm": 90}}])
+    mock_acestep_client.query_result.side_effect = [
+        [{"status": 0}],
+        [{"status": 0}],
+        [{"status": 1, "result": result_str}],
+    ]
+
+    response = await async_client.get("/api/jobs/sse-task/events")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [
+        json.loads(line[len("data: ") :])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert [e["status"] for e in events] == ["processing", "completed"]
+    assert events[-1]["audio_url"].startswith("/api/audio/sse-task?index=0&path=")
+    assert events[-1]["metadata"] == {"bpm": 90}
+
+
+@pytest.mark.asyncio
+async def test_stream_job_status_terminal_sends_single_event(
+    async_client, mock_acestep_client
+):
+    import json
+
+    mock_acestep_client.query_result.return_value = [{"status": 2, "error": "boom"}]
+
+    response = await async_client.get("/api/jobs/sse-failed/events")
+    assert response.status_code == 200
+    assert response.text.count("event: status") == 1
+    data_line = next(
+        line for line in response.text.splitlines() if line.startswith("data: ")
+    )
+    assert json.loads(data_line[len("data: ") :])["error"] == "boom"
+    mock_acestep_client.query_result.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_stream_job_status_unknown_task(async_client, mock_acestep_client):
+    mock_acestep_client.query_result.return_value = []
+    response = await async_client.get("/api/jobs/missing/events")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_jobs_status_bulk(async_client, mock_acestep_client):
+    import json
+
+    mock_acestep_client.query_result.return_value = [
+        {"task_id": "a", "status": 0},
+        {
+            "task_id": "b",
+            "status": 1,
+            "result": json.dumps([{"file": "output/b.mp3"}]),
+        },
+    ]
+
+    response = await async_client.get("/api/jobs?ids=a,b,missing")
+    assert response.status_code == 200
+    data = response.json()
+    assert [job["status"] for job in data["jobs"]] == ["processing", "completed"]
+    assert data["jobs"][1]["audio_url"].startswith("/api/audio/b?index=0&path=")
+    assert data["not_found"] == ["missing"]
+
+    # One upstream call for the whole list
+    mock_acestep_client.query_result.assert_called_once_with(["a", "b", "missing"])
+
+
+@pytest.mark.asyncio
+async def test_get_jobs_status_bulk_does_not_shift_unlabelled_entries(
+    async_client, mock_acestep_client
+):
+    async def answer(task_ids):
+        # Entries without task_id, and the unknown task is left out
+        return [{"status": 2 if tid == "b" else 0} for tid in task_ids if tid != "x"]
+
+    mock_acestep_client.query_result.side_effect = answer
+
+    response = await async_client.get("/api/jobs?ids=x,b")
+    data = response.json()
+    assert [(job["task_id"], job["status"]) for job in data["jobs"]] == [
+        ("b", "failed")
+    ]
+    assert data["not_found"] == ["x"]
+
+
+@pytest.mark.asyncio
+async def test_get_jobs_status_bulk_uses_terminal_cache(
+    async_client, mock_acestep_client
+):
+    mock_acestep_client.query_result.return_value = [{"status": 2}]
+    await async_client.get("/api/jobs/done")
+
+    mock_acestep_client.query_result.return_value = [{"task_id": "new", "status": 0}]
+    response = await async_client.get("/api/jobs?ids=done,new")
+    assert [job["status"] for job in response.json()["jobs"]] == [
+        "failed",
+        "processing",
+    ]
+    assert mock_acestep_client.query_result.call_args.args[0] == ["new"]
+
+
+@pytest.mark.asyncio
+async def test_post_jobs_status_bulk(async_client, mock_acestep_client):
+    mock_acestep_client.query_result.return_value = [
+        {"task_id": f"t{i}", "status": 0} for i in range(30)
+    ]
+    response = await async_client.post(
+        "/api/jobs", json={"task_ids": [f"t{i}" for i in range(30)]}
+    )
+    assert response.status_code == 200
+    assert len(response.json()["jobs"]) == 30
+    mock_acestep_client.query_result.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_jobs_status_bulk_validation(async_client, monkeypatch):
+    from app.core.config import settings
+
+    response = await async_client.get("/api/jobs?ids=,")
+    assert response.status_code == 422
+
+    response = await async_client.post("/api/jobs", json={"task_ids": []})
+    assert response.status_code == 422
+
+    monkeypatch.setattr(settings, "BULK_STATUS_MAX_IDS", 2)
+    response = await async_client.get("/api/jobs?ids=a,b,c")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_submit_generation_registers_task(async_client, mock_acestep_client):
+    from app.main import app
+
+    mock_acestep_client.submit_task.return_value = {"task_id": "registered-task"}
+    async_client.cookies.set("session_id", "registry-session")
+    response = await async_client.post(
+        "/api/generate", json={"prompt": "A folk song", "bpm": 90}
+    )
+    assert response.status_code == 202
+
+    record = app.state.task_registry.get("registered-task")
+    assert record.session_id == "registry-session"
+    assert record.params == {"prompt": "A folk song", "bpm": 90}
+
+
+@pytest.mark.asyncio
+async def test_download_audio_resolves_path_from_registry(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+
+    app.state.task_registry.observe("known-task", 1, ["output/known.mp3"])
+    mock_response = MagicMock(spec=httpx.Response)
+    mock_response.status_code = 200
+    mock_response.headers = {"content-type": "audio/mpeg"}
+
+    async def mock_aiter_bytes(*args, **kwargs):
+        yield b"audio-data"
+
+    mock_response.aiter_raw = mock_aiter_bytes
+    mock_acestep_client.download_audio_stream.return_value = mock_response
+
+    response = await async_client.get("/api/audio/known-task")
+    assert response.status_code == 200
+    mock_acestep_client.query_result.assert_not_called()
+    mock_acestep_client.download_audio_stream.assert_called_once_with(
+        "output/known.mp3", byte_range=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_download_audio_replays_from_disk_cache(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+
+    app.state.task_registry.observe("cached-task", 1, ["output/cached.wav"])
+    mock_response = MagicMock(spec=httpx.Response)
+    mock_response.status_code = 200
+    mock_response.headers = {"content-type": "audio/wav", "content-length": "10"}
+
+    async def mock_aiter_bytes(*args, **kwargs):
+        yield b"audio-"
+        yield b"data"
+
+    mock_response.aiter_raw = mock_aiter_bytes
+    mock_acestep_client.download_audio_stream.return_value = mock_response
+
+    first = await async_client.get("/api/audio/cached-task")
+    assert first.content == b"audio-data"
+    assert app.state.audio_cache.contains("cached-task", 0)
+
+    second = await async_client.get("/api/audio/cached-task")
+    assert second.status_code == 200
+    assert second.content == b"audio-data"
+    assert second.headers["content-type"] == "audio/wav"
+    assert "music_cached-task.wav" in second.headers["content-disposition"]
+    mock_acestep_client.download_audio_stream.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_audio_downloads_share_upstream(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+
+    app.state.task_registry.observe("shared-task", 1, ["output/shared.mp3"])
+    release = asyncio.Event()
+    mock_response = MagicMock(spec=httpx.Response)
+    mock_response.status_code = 200
+    mock_response.headers = {"content-type": "audio/mpeg"}
+
+    async def mock_aiter_bytes(*args, **kwargs):
+        yield b"shared-"
+        await release.wait()
+        yield b"audio"
+
+    mock_response.aiter_raw = mock_aiter_bytes
+    mock_acestep_client.download_audio_stream.return_value = mock_response
+
+    requests = [
+        asyncio.create_task(async_client.get("/api/audio/shared-task"))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0.05)
+    release.set()
+    responses = await asyncio.gather(*requests)
+
+    assert [r.content for r in responses] == [b"shared-audio"] * 3
+    mock_acestep_client.download_audio_stream.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_download_audio_failed_stream_is_not_cached(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+
+    app.state.task_registry.observe("broken-task", 1, ["output/broken.mp3"])
+    mock_response = MagicMock(spec=httpx.Response)
+    mock_response.status_code = 200
+    mock_response.headers = {"content-type": "audio/mpeg"}
+
+    async def mock_aiter_bytes(*args, **kwargs):
+        yield b"partial"
+        raise httpx.ReadError("connection reset")
+
+    mock_response.aiter_raw = mock_aiter_bytes
+    mock_acestep_client.download_audio_stream.return_value = mock_response
+
+    with pytest.raises(httpx.ReadError):
+        await async_client.get("/api/audio/broken-task")
+    assert not app.state.audio_cache.contains("broken-task", 0)
+    assert list(app.state.audio_cache.tmp_dir.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_completed_status_prefetches_audio(async_client, mock_acestep_client):
+    import json
+
+    from app.core.metrics import metrics
+    from app.main import app
+    from app.services.task_registry import TaskRegistry
+
+    prefetcher = app.state.audio_prefetcher
+    app.state.task_registry = TaskRegistry(on_complete=prefetcher.schedule)
+    result_str = json.dumps([{"file": "/v1/audio?path=output%2Fwarm.mp3"}])
+    mock_acestep_client.query_result.return_value = [
+        {"status": 1, "result": result_str}
+    ]
+    mock_response = MagicMock(spec=httpx.Response)
+    mock_response.status_code = 200
+    mock_response.headers = {"content-type": "audio/mpeg"}
+
+    async def mock_aiter_bytes(*args, **kwargs):
+        yield b"warm-audio"
+
+    mock_response.aiter_raw = mock_aiter_bytes
+    mock_acestep_client.download_audio_stream.return_value = mock_response
+
+    hits = metrics.counter("audio_prefetch_hits_total")
+    await async_client.get("/api/jobs/warm-task")
+    await prefetcher._queue.join()
+
+    response = await async_client.get("/api/audio/warm-task")
+    assert response.content == b"warm-audio"
+    mock_acestep_client.download_audio_stream.assert_called_once()
+    assert metrics.counter("audio_prefetch_hits_total") == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_status_lookup_records_resolved_paths(async_client, mock_acestep_client):
+    import json
+
+    from app.main import app
+
+    result_str = json.dumps([{"file": "/v1/audio?path=output%2Fa.mp3"}])
+    mock_acestep_client.query_result.return_value = [
+        {"status": 1, "result": result_str}
+    ]
+    await async_client.get("/api/jobs/observed-task")
+    assert app.state.task_registry.audio_paths("observed-task") == ["output/a.mp3"]
+
+
 # ── Audio download ────────────────────────────────────────────────
 
 
@@ -497,12 +978,13 @@ async def test_download_audio_path_with_query_string(async_client, mock_acestep_
     ]
 
     mock_response = MagicMock(spec=httpx.Response)
+    mock_response.status_code = 200
     mock_response.headers = {"content-type": "audio/mpeg"}
 
     async def mock_aiter_bytes(*args, **kwargs):
         yield b"audio-data"
 
-    mock_response.aiter_bytes = mock_aiter_bytes
+    mock_response.aiter_raw = mock_aiter_bytes
     mock_acestep_client.download_audio_stream.return_value = mock_response
 
     response = await async_client.get("/api/audio/test-task")
@@ -511,6 +993,647 @@ async def test_download_audio_path_with_query_string(async_client, mock_acestep_
     assert call_arg == "output/test.mp3"
 
 
+def _mock_audio_stream(mock_acestep_client, body, status_code=200, headers=None):
+    mock_response = MagicMock(spec=httpx.Response)
+    mock_response.status_code = status_code
+    mock_response.headers = {"content-type": "audio/wav", **(headers or {})}
+
+    async def mock_aiter_bytes(*args, **kwargs):
+        yield body
+
+    mock_response.aiter_raw = mock_aiter_bytes
+    mock_acestep_client.download_audio_stream.return_value = mock_response
+    return mock_response
+
+
+@pytest.mark.asyncio
+async def test_download_audio_advertises_range_support(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+
+    app.state.task_registry.observe("range-task", 1, ["output/range.wav"])
+    _mock_audio_stream(
+        mock_acestep_client, b"0123456789", headers={"content-length": "10"}
+    )
+
+    response = await async_client.get("/api/audio/range-task")
+    assert response.status_code == 200
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-length"] == "10"
+
+
+@pytest.mark.asyncio
+async def test_download_audio_does_not_pass_through_upstream_etag(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+
+    app.state.task_registry.observe("etag-task", 1, ["output/etag.wav"])
+    _mock_audio_stream(
+        mock_acestep_client,
+        b"0123456789",
+        headers={"content-length": "10", "etag": '"abc123"'},
+    )
+
+    response = await async_client.get("/api/audio/etag-task")
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert response.headers["content-length"] == "10"
+
+    app.state.task_registry.observe("head-task", 1, ["output/head.wav"])
+    head = await async_client.head("/api/audio/head-task")
+    assert head.status_code == 200
+    assert "etag" not in head.headers
+
+
+@pytest.mark.asyncio
+async def test_download_audio_encoded_partial_content_is_passed_through_raw(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+
+    app.state.task_registry.observe("range-task", 1, ["output/range.wav"])
+    _mock_audio_stream(
+        mock_acestep_client,
+        b"gzipped-bytes",
+        status_code=206,
+        headers={
+            "content-length": "13",
+            "content-range": "bytes 0-99/100",
+            "content-encoding": "gzip",
+            "etag": '"abc123"',
+        },
+    )
+
+    async with async_client.stream(
+        "GET", "/api/audio/range-task", headers={"Range": "bytes=0-99"}
+    ) as response:
+        body = b"".join([chunk async for chunk in response.aiter_raw()])
+    assert response.status_code == 206
+    assert body == b"gzipped-bytes"
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-length"] == "13"
+    assert "etag" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_download_audio_releases_slot_after_streaming(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+
+    app.state.task_registry.observe("slot-task", 1, ["output/slot.wav"])
+    _mock_audio_stream(mock_acestep_client, b"0123456789")
+
+    response = await async_client.get("/api/audio/slot-task")
+    assert response.status_code == 200
+    assert app.state.download_limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_download_audio_rejects_with_retry_after_when_busy(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+    from app.services.download_limiter import DownloadLimiter
+
+    app.state.download_limiter = DownloadLimiter(
+        max_streams=1, per_session=1, queue_size=0, wait_timeout=0, retry_after=3
+    )
+    held = await app.state.download_limiter.acquire("someone-else")
+    app.state.task_registry.observe("busy-task", 1, ["output/busy.wav"])
+
+    response = await async_client.get("/api/audio/busy-task")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    mock_acestep_client.download_audio_stream.assert_not_called()
+
+    # Cached files are served without a slot
+    held.release()
+    _mock_audio_stream(mock_acestep_client, b"0123456789")
+    await async_client.get("/api/audio/busy-task")
+    # The cache entry is committed once the shared download finishes
+    while not app.state.audio_cache.contains("busy-task", 0):
+        await asyncio.sleep(0.01)
+    held = await app.state.download_limiter.acquire("someone-else")
+    response = await async_client.get("/api/audio/busy-task")
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+
+
+@pytest.mark.asyncio
+async def test_download_slots_of_cookieless_clients_are_counted_per_ip(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+    from app.services.download_limiter import DownloadLimiter
+
+    app.state.download_limiter = DownloadLimiter(
+        max_streams=8, per_session=1, queue_size=0, wait_timeout=0, retry_after=3
+    )
+    # A download already running for this address, without a session cookie
+    held = await app.state.download_limiter.acquire("ip:127.0.0.1")
+    app.state.task_registry.observe("busy-task", 1, ["output/busy.wav"])
+
+    response = await async_client.get("/api/audio/busy-task")
+    assert response.status_code == 503
+    held.release()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "method,url",
+    [
+        ("HEAD", "/api/audio/busy-task"),
+        ("GET", "/api/audio/busy-task/peaks"),
+        ("GET", "/api/audio/busy-task/preview"),
+    ],
+)
+async def test_uncached_audio_needs_a_download_slot(
+    async_client, mock_acestep_client, method, url
+):
+    from app.main import app
+    from app.services.download_limiter import DownloadLimiter
+
+    app.state.download_limiter = DownloadLimiter(
+        max_streams=1, per_session=1, queue_size=0, wait_timeout=0, retry_after=3
+    )
+    held = await app.state.download_limiter.acquire("someone-else")
+    app.state.task_registry.observe("busy-task", 1, ["output/busy.wav"])
+
+    response = await async_client.request(method, url)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    mock_acestep_client.download_audio_stream.assert_not_called()
+    held.release()
+    assert app.state.download_limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_download_audio_signed_url_skips_lookup(
+    async_client, mock_acestep_client
+):
+    from app.core.signing import signed_audio_url
+
+    _mock_audio_stream(mock_acestep_client, b"0123456789")
+    url = signed_audio_url("signed-task", 1, "output/second.wav")
+
+    response = await async_client.get(url)
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+    mock_acestep_client.query_result.assert_not_called()
+    mock_acestep_client.download_audio_stream.assert_called_once_with(
+        "output/second.wav", byte_range=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_download_audio_signed_url_works_after_the_limit_is_reached(
+    async_client, mock_acestep_client
+):
+    from app.core.signing import signed_audio_url
+    from app.main import app
+
+    app.state.task_registry.observe("limited-task", 1, ["output/limited.wav"])
+    _mock_audio_stream(mock_acestep_client, b"0123456789")
+    async_client.cookies.set("session_id", "exhausted-audio-session")
+
+    statuses = [
+        (await async_client.get("/api/audio/limited-task")).status_code
+        for _ in range(21)
+    ]
+    assert statuses[-1] == 429
+
+    url = signed_audio_url("limited-task", 0, "output/limited.wav")
+    response = await async_client.get(url)
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+
+
+@pytest.mark.asyncio
+async def test_download_audio_signed_url_is_not_rate_limited(
+    async_client, mock_acestep_client
+):
+    from app.core.signing import signed_audio_url
+
+    _mock_audio_stream(mock_acestep_client, b"0123456789")
+    url = signed_audio_url("signed-task", 0, "output/first.wav")
+
+    for _ in range(25):
+        response = await async_client.get(url)
+        assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_download_audio_rejects_tampered_signature(
+    async_client, mock_acestep_client
+):
+    from app.core.signing import signed_audio_url
+
+    url = signed_audio_url("signed-task", 0, "output/first.wav")
+    tampered = url.replace("output%2Ffirst.wav", "etc%2Fpasswd")
+
+    response = await async_client.get(tampered)
+    assert response.status_code == 403
+    mock_acestep_client.download_audio_stream.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_download_audio_rejects_signed_path_of_another_file(
+    async_client, mock_acestep_client
+):
+    from app.core.signing import signed_audio_url
+    from app.main import app
+
+    app.state.task_registry.observe("signed-task", 1, ["output/first.wav"])
+    url = signed_audio_url("signed-task", 0, "output/other.wav")
+
+    response = await async_client.get(url)
+    assert response.status_code == 403
+    mock_acestep_client.download_audio_stream.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_download_audio_ignores_signatures_without_a_real_secret(
+    async_client, mock_acestep_client, monkeypatch
+):
+    from app.core.config import settings
+    from app.core.signing import audio_signature
+    from app.main import app
+
+    monkeypatch.setattr(settings, "SESSION_SECRET", "super-secret-key")
+    app.state.task_registry.observe("signed-task", 1, ["output/first.wav"])
+    _mock_audio_stream(mock_acestep_client, b"0123456789")
+    # Anyone can compute a signature with the public default key
+    sig = audio_signature("signed-task", 0, "etc/passwd", 2**40)
+    url = f"/api/audio/signed-task?index=0&path=etc%2Fpasswd&expires={2**40}&sig={sig}"
+
+    response = await async_client.get(url)
+    assert response.status_code == 200
+    mock_acestep_client.download_audio_stream.assert_called_once_with(
+        "output/first.wav", byte_range=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_download_audio_expired_signature_falls_back_to_lookup(
+    async_client, mock_acestep_client
+):
+    from app.core.signing import signed_audio_url
+    from app.main import app
+
+    app.state.task_registry.observe("signed-task", 1, ["output/current.wav"])
+    _mock_audio_stream(mock_acestep_client, b"0123456789")
+    url = signed_audio_url("signed-task", 0, "output/old.wav", ttl=60, now=0)
+
+    response = await async_client.get(url)
+    assert response.status_code == 200
+    # The signed path is not trusted once expired
+    mock_acestep_client.download_audio_stream.assert_called_once_with(
+        "output/current.wav", byte_range=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_download_audio_cached_file_has_content_etag(
+    async_client, mock_acestep_client
+):
+    import hashlib
+
+    from app.main import app
+
+    app.state.task_registry.observe("etag-task", 1, ["output/etag.wav"])
+    _mock_audio_stream(mock_acestep_client, b"0123456789")
+    first = await async_client.get("/api/audio/etag-task")
+    assert first.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+    response = await async_client.get("/api/audio/etag-task")
+    etag = f'"{hashlib.sha256(b"0123456789").hexdigest()}"'
+    assert response.status_code == 200
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+    response = await async_client.get(
+        "/api/audio/etag-task", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = await async_client.get(
+        "/api/audio/etag-task", headers={"If-None-Match": '"something-else"'}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_head_audio_returns_size_and_type_without_body(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+
+    app.state.task_registry.observe("head-task", 1, ["output/head.wav"])
+    upstream = _mock_audio_stream(
+        mock_acestep_client, b"0123456789", headers={"content-length": "10"}
+    )
+
+    response = await async_client.head("/api/audio/head-task")
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["content-length"] == "10"
+    assert response.headers["content-type"] == "audio/wav"
+    upstream.aclose.assert_awaited_once()
+    # A HEAD does not download (or cache) the file
+    assert not app.state.audio_cache.contains("head-task", 0)
+
+    await async_client.get("/api/audio/head-task")
+    response = await async_client.head("/api/audio/head-task")
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["content-length"] == "10"
+    assert response.headers["etag"].startswith('"')
+    assert mock_acestep_client.download_audio_stream.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_download_audio_range_served_from_cache(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+
+    app.state.task_registry.observe("range-task", 1, ["output/range.wav"])
+    _mock_audio_stream(
+        mock_acestep_client, b"0123456789", headers={"content-length": "10"}
+    )
+    await async_client.get("/api/audio/range-task")
+
+    response = await async_client.get(
+        "/api/audio/range-task", headers={"Range": "bytes=6-"}
+    )
+    assert response.status_code == 206
+    assert response.content == b"6789"
+    assert response.headers["content-range"] == "bytes 6-9/10"
+    assert response.headers["content-length"] == "4"
+    mock_acestep_client.download_audio_stream.assert_called_once()
+
+    response = await async_client.get(
+        "/api/audio/range-task", headers={"Range": "bytes=20-"}
+    )
+    assert response.status_code == 416
+
+
+@pytest.mark.asyncio
+async def test_download_audio_range_uses_upstream_partial_content(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+
+    app.state.task_registry.observe("range-task", 1, ["output/range.wav"])
+    _mock_audio_stream(
+        mock_acestep_client,
+        b"6789",
+        status_code=206,
+        headers={"content-length": "4", "content-range": "bytes 6-9/10"},
+    )
+
+    response = await async_client.get(
+        "/api/audio/range-task", headers={"Range": "bytes=6-"}
+    )
+    assert response.status_code == 206
+    assert response.content == b"6789"
+    assert response.headers["content-range"] == "bytes 6-9/10"
+    assert response.headers["accept-ranges"] == "bytes"
+    mock_acestep_client.download_audio_stream.assert_called_once_with(
+        "output/range.wav", byte_range="bytes=6-"
+    )
+    # A partial body must not be cached as the whole file
+    assert not app.state.audio_cache.contains("range-task", 0)
+
+
+@pytest.mark.asyncio
+async def test_download_audio_range_fills_cache_when_upstream_ignores_it(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+
+    app.state.task_registry.observe("range-task", 1, ["output/range.wav"])
+    _mock_audio_stream(
+        mock_acestep_client, b"0123456789", headers={"content-length": "10"}
+    )
+
+    response = await async_client.get(
+        "/api/audio/range-task", headers={"Range": "bytes=2-4"}
+    )
+    assert response.status_code == 206
+    assert response.content == b"234"
+    assert response.headers["content-range"] == "bytes 2-4/10"
+    assert app.state.audio_cache.contains("range-task", 0)
+
+
+@pytest.mark.asyncio
+async def test_download_audio_range_not_satisfiable_upstream(
+    async_client, mock_acestep_client
+):
+    from app.main import app
+    from app.services.acestep_client import ACEStepError
+
+    app.state.task_registry.observe("range-task", 1, ["output/range.wav"])
+    mock_acestep_client.download_audio_stream.side_effect = ACEStepError(
+        "Requested range not satisfiable.", 416
+    )
+
+    response = await async_client.get(
+        "/api/audio/range-task", headers={"Range": "bytes=99-"}
+    )
+    assert response.status_code == 416
+
+
+@pytest.mark.asyncio
+async def test_audio_peaks_json(async_client, mock_acestep_client, make_wav):
+    import numpy as np
+
+    from app.main import app
+
+    app.state.task_registry.observe("peaks-task", 1, ["output/peaks.wav"])
+    _mock_audio_stream(mock_acestep_client, make_wav(np.arange(-800, 800) * 20))
+
+    response = await async_client.get("/api/audio/peaks-task/peaks?buckets=16")
+    assert response.status_code == 200
+    peaks = response.json()
+    assert peaks["buckets"] == 16
+    assert len(peaks["min"]) == len(peaks["max"]) == 16
+    assert peaks["min"][0] < 0 < peaks["max"][-1]
+    assert "immutable" in response.headers["cache-control"]
+    # The audio was cached on the way and is not fetched again
+    await async_client.get("/api/audio/peaks-task/peaks?buckets=8")
+    mock_acestep_client.download_audio_stream.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_audio_peaks_binary(async_client, mock_acestep_client, make_wav):
+    import numpy as np
+
+    from app.main import app
+
+    app.state.task_registry.observe("peaks-task", 1, ["output/peaks.wav"])
+    _mock_audio_stream(mock_acestep_client, make_wav(np.arange(-800, 800) * 20))
+
+    response = await async_client.get(
+        "/api/audio/peaks-task/peaks?buckets=16&format=binary"
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["x-peaks-buckets"] == "16"
+    pairs = np.frombuffer(response.content, dtype=np.int8).reshape(-1, 2)
+    assert pairs.shape == (16, 2)
+    assert (pairs[:, 0] <= pairs[:, 1]).all()
+
+
+@pytest.mark.asyncio
+async def test_audio_peaks_unsupported_format(async_client, mock_acestep_client):
+    from app.main import app
+    from app.services import waveform
+
+    if waveform.soundfile is not None:
+        pytest.skip("soundfile can decode MP3")
+    app.state.task_registry.observe("mp3-task", 1, ["output/peaks.mp3"])
+    _mock_audio_stream(
+        mock_acestep_client, b"mp3-data", headers={"content-type": "audio/mpeg"}
+    )
+
+    response = await async_client.get("/api/audio/mp3-task/peaks")
+    assert response.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_audio_peaks_fail_fast_when_file_cannot_be_cached(
+    async_client, mock_acestep_client, tmp_path
+):
+    from app.main import app
+    from app.services.audio_cache import AudioCache
+
+    app.state.task_registry.observe("big-task", 1, ["output/big.wav"])
+    stalled = _mock_audio_stream(
+        mock_acestep_client, b"", headers={"content-length": str(1024**4)}
+    )
+
+    async def never_ending(*args, **kwargs):
+        await asyncio.Event().wait()
+        yield b""
+
+    stalled.aiter_raw = never_ending
+    # Larger than the cache: answered without waiting for the body
+    response = await asyncio.wait_for(
+        async_client.get("/api/audio/big-task/peaks"), timeout=2
+    )
+    assert response.status_code == 503
+
+    mock_acestep_client.download_audio_stream.reset_mock()
+    app.state.audio_cache = AudioCache(tmp_path / "off", max_bytes=0)
+    response = await async_client.get("/api/audio/big-task/preview")
+    assert response.status_code == 503
+    mock_acestep_client.download_audio_stream.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_audio_preview_wav(async_client, mock_acestep_client, make_wav):
+    import io
+    import wave
+
+    import numpy as np
+
+    from app.main import app
+
+    app.state.task_registry.observe("preview-task", 1, ["output/long.wav"])
+    _mock_audio_stream(mock_acestep_client, make_wav(np.zeros(8000 * 20), rate=8000))
+
+    response = await async_client.get("/api/audio/preview-task/preview?seconds=5")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/wav"
+    assert "music_preview-task_preview.wav" in response.headers["content-disposition"]
+    with wave.open(io.BytesIO(response.content), "rb") as clip:
+        assert clip.getnframes() == 8000 * 5
+
+
+@pytest.mark.asyncio
+async def test_audio_preview_rejects_long_clips(async_client):
+    response = await async_client.get("/api/audio/preview-task/preview?seconds=600")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_audio_preview_unsupported_format(async_client, mock_acestep_client):
+    from app.main import app
+    from app.services import audio_preview
+
+    if audio_preview.soundfile is not None:
+        pytest.skip("soundfile can cut FLAC")
+    app.state.task_registry.observe("flac-task", 1, ["output/track.flac"])
+    _mock_audio_stream(
+        mock_acestep_client, b"fLaC-data", headers={"content-type": "audio/flac"}
+    )
+
+    response = await async_client.get("/api/audio/flac-task/preview")
+    assert response.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_audio_bundle_zip(async_client, mock_acestep_client):
+    import io
+    import json
+    import zipfile
+
+    from app.main import app
+
+    result_str = json.dumps(
+        [
+            {"file": "/v1/audio?path=output%2Fa.mp3", "metas": {"bpm": 120}},
+            {"file": "/v1/audio?path=output%2Fb.mp3", "metas": {"bpm": 120}},
+        ]
+    )
+    mock_acestep_client.query_result.return_value = [
+        {"status": 1, "result": result_str}
+    ]
+    writer = app.state.audio_cache.writer("bundle-task", 0, "audio/mpeg")
+    await writer.write(b"cached-a")
+    await writer.commit()
+    _mock_audio_stream(
+        mock_acestep_client, b"upstream-b", headers={"content-type": "audio/mpeg"}
+    )
+
+    response = await async_client.get("/api/audio/bundle-task/bundle.zip")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.namelist() == [
+            "metadata.json",
+            "music_bundle-task_1.mp3",
+            "music_bundle-task_2.mp3",
+        ]
+        assert archive.read("music_bundle-task_1.mp3") == b"cached-a"
+        assert archive.read("music_bundle-task_2.mp3") == b"upstream-b"
+        metadata = json.loads(archive.read("metadata.json"))
+    assert metadata["task_id"] == "bundle-task"
+    assert metadata["results"][1]["metas"] == {"bpm": 120}
+    assert metadata["files"][1] == {"index": 1, "name": "music_bundle-task_2.mp3"}
+
+    # One status lookup, one upstream download for the uncached file
+    mock_acestep_client.query_result.assert_called_once()
+    mock_acestep_client.download_audio_stream.assert_called_once_with(
+        "output/b.mp3", byte_range=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_audio_bundle_requires_completed_task(async_client, mock_acestep_client):
+    mock_acestep_client.query_result.return_value = [{"status": 0, "result": "[]"}]
+
+    response = await async_client.get("/api/audio/pending-task/bundle.zip")
+    assert response.status_code == 409
+
+
 @pytest.mark.asyncio
 async def test_download_audio_wav_content_type(async_client, mock_acestep_client):
     """WAV content type should produce a .wav filename."""
@@ -522,12 +1645,13 @@ async def test_download_audio_wav_content_type(async_client, mock_acestep_client
     ]
 
     mock_response = MagicMock(spec=httpx.Response)
+    mock_response.status_code = 200
     mock_response.headers = {"content-type": "audio/wav"}
 
     async def mock_aiter_bytes(*args, **kwargs):
         yield b"wav-data"
 
-    mock_response.aiter_bytes = mock_aiter_bytes
+    mock_response.aiter_raw = mock_aiter_bytes
     mock_acestep_client.download_audio_stream.return_value = mock_response
 
     response = await async_client.get("/api/audio/test-task")
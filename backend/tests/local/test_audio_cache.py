@@ -0,0 +1,172 @@
+import hashlib
+
+import pytest
+
+from app.services.audio_cache import AudioCache
+
+
+async def _store(cache, task_id, data, index=0, content_type="audio/mpeg"):
+    writer = cache.writer(task_id, index, content_type)
+    await writer.write(data)
+    return await writer.commit()
+
+
+@pytest.mark.asyncio
+async def test_commit_makes_file_available(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=1024)
+    entry = await _store(cache, "task-1", b"abc")
+
+    hit = cache.get("task-1", 0)
+    assert hit == entry
+    assert hit.path.read_bytes() == b"abc"
+    assert hit.content_type == "audio/mpeg"
+    assert cache.get("task-1", 1) is None
+
+
+@pytest.mark.asyncio
+async def test_nothing_visible_before_commit(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=1024)
+    writer = cache.writer("task-1", 0, "audio/mpeg")
+    await writer.write(b"partial")
+
+    assert cache.get("task-1", 0) is None
+    assert list(tmp_path.glob("*.audio")) == []
+
+    await writer.abort()
+    assert not writer.tmp_path.exists()
+    assert cache.get("task-1", 0) is None
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=10)
+    await _store(cache, "a", b"1111")
+    await _store(cache, "b", b"2222")
+    cache.get("a", 0)  # "b" is now least recently used
+    await _store(cache, "c", b"3333")
+
+    assert cache.contains("a", 0)
+    assert not cache.contains("b", 0)
+    assert cache.contains("c", 0)
+    assert cache.total_bytes == 8
+    assert len(list(cache.blob_dir.glob("*.audio"))) == 2
+
+
+@pytest.mark.asyncio
+async def test_oversized_files_are_not_cached(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=4)
+    assert cache.writer("a", 0, "audio/mpeg", expected_size=5) is None
+
+    # Without a Content-Length the size is only known at commit time
+    assert await _store(cache, "a", b"12345") is None
+    assert not cache.contains("a", 0)
+    assert list(cache.tmp_dir.iterdir()) == []
+
+
+def test_disabled_with_zero_budget(tmp_path):
+    cache = AudioCache(tmp_path / "off", max_bytes=0)
+    assert not cache.enabled
+    assert cache.writer("a", 0, "audio/mpeg") is None
+    assert not (tmp_path / "off").exists()
+
+
+@pytest.mark.asyncio
+async def test_reloads_index_from_disk(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=1024)
+    await _store(cache, "a", b"wav-data", content_type="audio/wav")
+    leftover = cache.writer("b", 0, "audio/mpeg")
+    await leftover.write(b"interrupted")
+
+    reloaded = AudioCache(tmp_path, max_bytes=1024)
+    entry = reloaded.get("a", 0)
+    assert entry.content_type == "audio/wav"
+    assert entry.size == 8
+    assert reloaded.total_bytes == 8
+    # Partial writes from a previous run are cleaned up
+    assert list(reloaded.tmp_dir.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_missing_file_is_treated_as_miss(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=1024)
+    entry = await _store(cache, "a", b"data")
+    entry.path.unlink()
+
+    assert cache.get("a", 0) is None
+    assert cache.total_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_records_content_hash(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=1024)
+    writer = cache.writer("a", 0, "audio/wav")
+    await writer.write(b"wav-")
+    await writer.write(b"data")
+    entry = await writer.commit()
+
+    digest = hashlib.sha256(b"wav-data").hexdigest()
+    assert entry.sha256 == digest
+    assert entry.etag == f'"{digest}"'
+    assert AudioCache(tmp_path, max_bytes=1024).get("a", 0).sha256 == digest
+
+
+@pytest.mark.asyncio
+async def test_identical_files_share_one_blob(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=1024)
+    first = await _store(cache, "a", b"same-audio")
+    second = await _store(cache, "retry-of-a", b"same-audio", content_type="audio/wav")
+
+    assert second.path == first.path
+    assert cache.get("retry-of-a", 0).content_type == "audio/wav"
+    assert len(cache) == 2
+    assert cache.blob_count == 1
+    assert cache.total_bytes == 10
+    assert list(cache.tmp_dir.iterdir()) == []
+
+    reloaded = AudioCache(tmp_path, max_bytes=1024)
+    assert reloaded.blob_count == 1
+    assert reloaded.total_bytes == 10
+
+
+@pytest.mark.asyncio
+async def test_shared_blob_is_deleted_with_its_last_reference(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=10)
+    shared = await _store(cache, "a", b"1234")
+    await _store(cache, "b", b"1234")
+    sidecar = cache.sidecar_path(shared, "peaks-20.json")
+    sidecar.write_text("{}")
+
+    await _store(cache, "c", b"abcde")
+    cache.get("b", 0)  # "a", then "c" are least recently used
+
+    # Dropping "a" frees nothing, since "b" refers to the same bytes
+    await _store(cache, "d", b"xy")
+    assert not cache.contains("a", 0)
+    assert not cache.contains("c", 0)
+    assert cache.contains("b", 0)
+    assert shared.path.read_bytes() == b"1234"
+    assert sidecar.exists()
+    assert cache.total_bytes == 6
+
+    await _store(cache, "e", b"vwxyz")
+    assert not cache.contains("b", 0)
+    assert not shared.path.exists()
+    assert not sidecar.exists()
+    assert cache.total_bytes == 7
+
+
+@pytest.mark.asyncio
+async def test_compact_removes_unreferenced_files(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=1024)
+    kept = await _store(cache, "a", b"kept")
+    lost = await _store(cache, "b", b"lost")
+    orphan = cache.blob_dir / f"{'0' * 64}.audio"
+    orphan.write_bytes(b"crashed before its record")
+    lost.path.unlink()
+
+    assert cache.compact() == len(b"crashed before its record")
+    assert not orphan.exists()
+    assert not cache.contains("b", 0)
+    assert not (tmp_path / f"{lost.key}.json").exists()
+    assert cache.get("a", 0) == kept
+    assert cache.total_bytes == 4
@@ -0,0 +1,322 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.metrics import metrics
+from app.services.audio_cache import AudioCache
+from app.services.audio_fanout import AudioFanout
+
+
+class FakeUpstream:
+    """Streaming response whose chunks are fed by the test."""
+
+    def __init__(self, content_type="audio/wav", content_length=None):
+        self.headers = {"content-type": content_type}
+        if content_length is not None:
+            self.headers["content-length"] = str(content_length)
+        self.chunks: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    def feed(self, *chunks):
+        for chunk in chunks:
+            self.chunks.put_nowait(chunk)
+
+    def finish(self):
+        self.chunks.put_nowait(None)
+
+    def fail(self):
+        self.chunks.put_nowait(httpx.ReadError("connection reset"))
+
+    async def aiter_raw(self):
+        while True:
+            item = await self.chunks.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def aclose(self):
+        self.closed = True
+
+
+def _opener(upstream, calls):
+    async def open_upstream():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return upstream
+
+    return open_upstream
+
+
+async def _collect(reader, delay=0.0):
+    data = b""
+    async for chunk in reader:
+        data += chunk
+        if delay:
+            await asyncio.sleep(delay)
+    return data
+
+
+async def _wait_until(predicate):
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("condition not reached")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AudioCache(tmp_path, max_bytes=1024**2)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_readers_share_one_upstream_fetch(cache):
+    fanout = AudioFanout(cache)
+    upstream, calls = FakeUpstream(content_length=6), []
+
+    downloads = await asyncio.gather(
+        *(fanout.open("t", 0, _opener(upstream, calls)) for _ in range(5))
+    )
+    assert len(calls) == 1
+    assert all(d is downloads[0] for d in downloads)
+
+    readers = [asyncio.create_task(_collect(d.reader())) for d in downloads]
+    upstream.feed(b"abc", b"def")
+    upstream.finish()
+
+    assert await asyncio.gather(*readers) == [b"abcdef"] * 5
+    await _wait_until(lambda: fanout.active_downloads == 0)
+    assert upstream.closed
+    assert cache.get("t", 0).path.read_bytes() == b"abcdef"
+
+
+@pytest.mark.asyncio
+async def test_late_joiner_replays_then_follows_live(cache):
+    fanout = AudioFanout(cache)
+    upstream, calls = FakeUpstream(), []
+
+    first = await fanout.open("t", 0, _opener(upstream, calls))
+    early = asyncio.create_task(_collect(first.reader()))
+    upstream.feed(b"one-", b"two-")
+    await _wait_until(lambda: first.size == 8)
+
+    late = await fanout.open("t", 0, _opener(upstream, calls))
+    assert late is first
+    late_reader = asyncio.create_task(_collect(late.reader()))
+    upstream.feed(b"three")
+    upstream.finish()
+
+    assert await early == b"one-two-three"
+    assert await late_reader == b"one-two-three"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_reader_catches_up_from_spool(cache):
+    # A ring smaller than one chunk forces readers that fall behind to disk
+    fanout = AudioFanout(cache, buffer_bytes=1)
+    upstream, calls = FakeUpstream(), []
+    download = await fanout.open("t", 0, _opener(upstream, calls))
+
+    slow = asyncio.create_task(_collect(download.reader(), delay=0.01))
+    spool_reads = metrics.counter("audio_fanout_spool_reads_total")
+    body = [bytes([i]) * 100 for i in range(20)]
+    upstream.feed(*body)
+    upstream.finish()
+
+    # The producer is not held back by the slow reader
+    await _wait_until(lambda: download.done)
+    assert not slow.done()
+    assert await slow == b"".join(body)
+    assert metrics.counter("audio_fanout_spool_reads_total") > spool_reads
+
+
+@pytest.mark.asyncio
+async def test_disconnecting_reader_does_not_affect_others(cache):
+    fanout = AudioFanout(cache)
+    upstream, calls = FakeUpstream(), []
+    download = await fanout.open("t", 0, _opener(upstream, calls))
+
+    leaving = download.reader()
+    staying = asyncio.create_task(_collect(download.reader()))
+    upstream.feed(b"abc")
+    assert await leaving.__anext__() == b"abc"
+    await leaving.aclose()
+    assert download.readers == 1
+
+    upstream.feed(b"def")
+    upstream.finish()
+    assert await staying == b"abcdef"
+    await _wait_until(lambda: cache.contains("t", 0))
+    assert download.readers == 0
+
+
+@pytest.mark.asyncio
+async def test_download_continues_after_every_reader_leaves(cache):
+    fanout = AudioFanout(cache)
+    upstream, calls = FakeUpstream(), []
+    download = await fanout.open("t", 0, _opener(upstream, calls))
+
+    reader = download.reader()
+    upstream.feed(b"abc")
+    await reader.__anext__()
+    await reader.aclose()
+
+    upstream.feed(b"def")
+    upstream.finish()
+    await _wait_until(lambda: cache.contains("t", 0))
+    assert cache.get("t", 0).path.read_bytes() == b"abcdef"
+
+
+@pytest.mark.asyncio
+async def test_upstream_failure_reaches_readers_and_is_not_cached(cache):
+    fanout = AudioFanout(cache)
+    upstream, calls = FakeUpstream(), []
+    download = await fanout.open("t", 0, _opener(upstream, calls))
+
+    reader = asyncio.create_task(_collect(download.reader()))
+    upstream.feed(b"partial")
+    upstream.fail()
+
+    with pytest.raises(httpx.ReadError):
+        await reader
+    await _wait_until(lambda: fanout.active_downloads == 0)
+    assert not cache.contains("t", 0)
+    assert list(cache.tmp_dir.iterdir()) == []
+
+    # The next request starts a fresh download
+    retry = FakeUpstream()
+    assert await fanout.open("t", 0, _opener(retry, calls)) is not download
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_open_failure_is_shared_and_released(cache):
+    fanout = AudioFanout(cache)
+    calls = []
+
+    async def broken():
+        calls.append(1)
+        await asyncio.sleep(0)
+        raise RuntimeError("no such file")
+
+    results = await asyncio.gather(
+        fanout.open("t", 0, broken),
+        fanout.open("t", 0, broken),
+        return_exceptions=True,
+    )
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert fanout.active_downloads == 0
+
+
+@pytest.mark.asyncio
+async def test_spools_to_temp_file_when_cache_is_disabled(tmp_path):
+    fanout = AudioFanout(AudioCache(tmp_path / "off", max_bytes=0), buffer_bytes=1)
+    upstream, calls = FakeUpstream(), []
+    download = await fanout.open("t", 0, _opener(upstream, calls))
+
+    upstream.feed(b"abc", b"def")
+    upstream.finish()
+    await _wait_until(lambda: download.done)
+
+    # Joined after the ring was dropped: everything comes from the spool
+    assert await _collect(download.reader()) == b"abcdef"
+
+
+@pytest.mark.asyncio
+async def test_spool_releases_upstream_before_slow_client_reads(tmp_path):
+    fanout = AudioFanout(AudioCache(tmp_path / "off", max_bytes=0), spool_dir=tmp_path)
+    upstream = FakeUpstream()
+    upstream.feed(b"abc", b"def")
+    upstream.finish()
+
+    download = fanout.spool(upstream)
+    reader = download.reader()
+    # The client has not read anything, yet upstream is fully drained
+    assert await download.wait()
+    assert upstream.closed
+    assert await _collect(reader) == b"abcdef"
+    assert metrics.gauge("audio_spool_bytes") == 0
+
+
+@pytest.mark.asyncio
+async def test_spool_past_its_limit_follows_the_reader(tmp_path):
+    metrics.reset()
+    fanout = AudioFanout(
+        AudioCache(tmp_path / "off", max_bytes=0),
+        buffer_bytes=2,
+        spool_dir=tmp_path,
+        spool_limit=4,
+    )
+    upstream = FakeUpstream()
+    download = fanout.spool(upstream)
+    reader = download.reader()
+    first = asyncio.create_task(reader.__anext__())
+    await asyncio.sleep(0)
+
+    upstream.feed(b"ab", b"cd", b"ef", b"gh")
+    assert await first == b"ab"
+    await _wait_until(lambda: download.size == 4)
+    await asyncio.sleep(0.02)
+    # Past the limit with a reader 4 bytes behind: upstream is not read on
+    assert download.size == 4
+    assert metrics.counter("audio_spool_paced_total") == 1
+
+    upstream.finish()
+    assert b"ab" + await _collect(reader) == b"abcdefgh"
+    assert await download.wait()
+
+
+@pytest.mark.asyncio
+async def test_spool_stops_when_its_last_reader_leaves(tmp_path):
+    metrics.reset()
+    fanout = AudioFanout(AudioCache(tmp_path / "off", max_bytes=0), spool_dir=tmp_path)
+    upstream = FakeUpstream()
+    download = fanout.spool(upstream)
+    reader = download.reader()
+    first = asyncio.create_task(reader.__anext__())
+    await asyncio.sleep(0)
+
+    upstream.feed(b"ab")
+    assert await first == b"ab"
+    await reader.aclose()  # the client disconnected
+
+    assert not await download.wait()
+    assert upstream.closed
+    assert metrics.counter("audio_spool_abandoned_total") == 1
+    assert metrics.gauge("audio_spool_bytes") == 0
+
+
+@pytest.mark.asyncio
+async def test_full_spool_without_readers_gives_up(tmp_path, monkeypatch):
+    from app.services import audio_fanout
+
+    monkeypatch.setattr(audio_fanout, "ORPHAN_GRACE_SECONDS", 0.01)
+    fanout = AudioFanout(
+        AudioCache(tmp_path / "off", max_bytes=0), spool_dir=tmp_path, spool_limit=2
+    )
+    upstream = FakeUpstream()
+    upstream.feed(b"ab", b"cd", b"ef")
+    download = fanout.spool(upstream)  # a reader never starts
+
+    assert not await download.wait()
+    assert download.size == 2
+    assert upstream.closed
+
+
+@pytest.mark.asyncio
+async def test_cache_downloads_ignore_the_spool_limit(cache, tmp_path):
+    fanout = AudioFanout(cache, buffer_bytes=1, spool_dir=tmp_path, spool_limit=0)
+    upstream, calls = FakeUpstream(), []
+    download = await fanout.open("t", 0, _opener(upstream, calls))
+    reader = download.reader()
+
+    upstream.feed(b"abc", b"def")
+    upstream.finish()
+    assert await download.wait()
+    assert cache.get("t", 0).path.read_bytes() == b"abcdef"
+    assert await _collect(reader) == b"abcdef"
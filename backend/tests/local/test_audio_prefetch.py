@@ -0,0 +1,210 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.acestep_client import ACEStepClient, ACEStepError
+from app.services.audio_cache import AudioCache
+from app.services.audio_fanout import AudioFanout
+from app.services.audio_prefetch import AudioPrefetcher
+
+
+class FakeAudio:
+    def __init__(self, body):
+        self.headers = {"content-type": "audio/mpeg"}
+        self._body = body
+
+    async def aiter_raw(self):
+        await asyncio.sleep(0.01)
+        yield self._body
+
+    async def aclose(self):
+        pass
+
+
+class FakeClient:
+    """download_audio_stream that records concurrency."""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._fail = set(fail)
+
+    async def download_audio_stream(self, path, byte_range=None):
+        self.calls.append(path)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if path in self._fail:
+                raise ACEStepError("Failed to download audio.", 404)
+            return FakeAudio(path.encode())
+        finally:
+            self.active -= 1
+
+
+def _prefetcher(tmp_path, client, **kwargs):
+    cache = AudioCache(tmp_path, max_bytes=1024**2)
+    return AudioPrefetcher(client, cache, AudioFanout(cache), **kwargs), cache
+
+
+async def _drain(prefetcher):
+    await prefetcher._queue.join()
+
+
+@pytest.mark.asyncio
+async def test_prefetches_every_file_into_cache(tmp_path):
+    client = FakeClient()
+    prefetcher, cache = _prefetcher(tmp_path, client)
+
+    prefetcher.schedule("t", ["a.mp3", "b.mp3"])
+    await _drain(prefetcher)
+    await prefetcher.close()
+
+    assert cache.get("t", 0).path.read_bytes() == b"a.mp3"
+    assert cache.get("t", 1).path.read_bytes() == b"b.mp3"
+
+
+@pytest.mark.asyncio
+async def test_skips_files_already_cached(tmp_path):
+    client = FakeClient()
+    prefetcher, cache = _prefetcher(tmp_path, client)
+    writer = cache.writer("t", 0, "audio/mpeg")
+    await writer.write(b"cached")
+    await writer.commit()
+
+    skipped = metrics.counter("audio_prefetch_skipped_total")
+    prefetcher.schedule("t", ["a.mp3", "b.mp3"])
+    await _drain(prefetcher)
+    await prefetcher.close()
+
+    assert client.calls == ["b.mp3"]
+    assert metrics.counter("audio_prefetch_skipped_total") == skipped + 1
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_bounds_concurrency(tmp_path):
+    client = FakeClient()
+    prefetcher, _ = _prefetcher(tmp_path, client, concurrency=2)
+
+    prefetcher.schedule("t", [f"{i}.mp3" for i in range(6)])
+    await _drain(prefetcher)
+    await prefetcher.close()
+
+    assert len(client.calls) == 6
+    assert client.peak <= 2
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_instead_of_blocking(tmp_path):
+    client = FakeClient()
+    prefetcher, _ = _prefetcher(tmp_path, client, concurrency=1, queue_size=2)
+
+    dropped = metrics.counter("audio_prefetch_dropped_total")
+    prefetcher.schedule("t", [f"{i}.mp3" for i in range(5)])
+    assert metrics.counter("audio_prefetch_dropped_total") == dropped + 3
+    await _drain(prefetcher)
+    await prefetcher.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_download_is_counted(tmp_path):
+    client = FakeClient(fail={"gone.mp3"})
+    prefetcher, cache = _prefetcher(tmp_path, client)
+
+    failed = metrics.counter("audio_prefetch_failed_total")
+    prefetcher.schedule("t", ["gone.mp3"])
+    await _drain(prefetcher)
+    await prefetcher.close()
+
+    assert metrics.counter("audio_prefetch_failed_total") == failed + 1
+    assert not cache.contains("t", 0)
+
+
+@pytest.mark.asyncio
+async def test_workers_survive_unexpected_errors(tmp_path):
+    import httpx
+
+    client = FakeClient()
+    prefetcher, cache = _prefetcher(tmp_path, client, concurrency=1)
+    original = client.download_audio_stream
+
+    async def flaky(path, byte_range=None):
+        if path == "reset.mp3":
+            raise httpx.ReadError("connection reset")
+        return await original(path, byte_range)
+
+    client.download_audio_stream = flaky
+
+    prefetcher.schedule("t", ["reset.mp3", "b.mp3"])
+    await asyncio.wait_for(_drain(prefetcher), timeout=1)
+    prefetcher.schedule("u", ["c.mp3"])
+    await asyncio.wait_for(_drain(prefetcher), timeout=1)
+    await prefetcher.close()
+
+    assert cache.get("t", 1).path.read_bytes() == b"b.mp3"
+    assert cache.get("u", 0).path.read_bytes() == b"c.mp3"
+
+
+@pytest.mark.asyncio
+async def test_files_too_big_for_the_cache_are_not_downloaded(tmp_path):
+    closed = asyncio.Event()
+
+    class HugeAudio(FakeAudio):
+        def __init__(self):
+            super().__init__(b"")
+            self.headers = {"content-type": "audio/wav", "content-length": str(1024**4)}
+
+        async def aiter_raw(self):
+            while True:
+                await asyncio.sleep(0)
+                yield bytes(65536)
+
+        async def aclose(self):
+            closed.set()
+
+    client = FakeClient()
+
+    async def huge(path, byte_range=None):
+        return HugeAudio()
+
+    client.download_audio_stream = huge
+    prefetcher, cache = _prefetcher(tmp_path, client)
+
+    skipped = metrics.counter("audio_prefetch_skipped_total")
+    prefetcher.schedule("t", ["huge.wav"])
+    await asyncio.wait_for(_drain(prefetcher), timeout=1)
+    # Upstream is closed instead of filling an unread spool
+    await asyncio.wait_for(closed.wait(), timeout=1)
+    await prefetcher.close()
+
+    assert metrics.counter("audio_prefetch_skipped_total") == skipped + 1
+    assert not cache.contains("t", 0)
+
+
+@pytest.mark.asyncio
+async def test_disabled_without_workers(tmp_path):
+    client = FakeClient()
+    prefetcher, _ = _prefetcher(tmp_path, client, concurrency=0)
+
+    prefetcher.schedule("t", ["a.mp3"])
+    assert prefetcher._queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_records_hit_rate_once_per_prefetched_file(tmp_path):
+    prefetcher, _ = _prefetcher(tmp_path, MagicMock(spec=ACEStepClient))
+    prefetcher._track(prefetcher._cache.key("t", 0))
+    prefetcher._track(prefetcher._cache.key("t", 1))
+
+    hits = metrics.counter("audio_prefetch_hits_total")
+    misses = metrics.counter("audio_prefetch_misses_total")
+    prefetcher.record_request("t", 0, cached=True)
+    prefetcher.record_request("t", 0, cached=True)
+    prefetcher.record_request("t", 1, cached=False)
+    prefetcher.record_request("other", 0, cached=True)
+
+    assert metrics.counter("audio_prefetch_hits_total") == hits + 1
+    assert metrics.counter("audio_prefetch_misses_total") == misses + 1
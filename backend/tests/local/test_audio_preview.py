@@ -0,0 +1,88 @@
+import asyncio
+import wave
+
+import numpy as np
+import pytest
+
+from app.core.metrics import metrics
+from app.services.audio_cache import AudioCache
+from app.services.audio_preview import AudioPreviewer, cut_mp3, cut_wav
+from app.services.waveform import UnsupportedAudioError
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, no padding: 417-byte frames of 1152 samples
+MP3_HEADER = bytes([0xFF, 0xFB, 0x90, 0x00])
+MP3_FRAME = MP3_HEADER + bytes(413)
+MP3_FRAME_SECONDS = 1152 / 44100
+
+
+def make_mp3(frames, id3=b"", xing=False):
+    data = b""
+    if id3:
+        size = len(id3)
+        syncsafe = bytes((size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+        data += b"ID3\x04\x00\x00" + syncsafe + id3
+    if xing:
+        data += MP3_HEADER + bytes(32) + b"Xing" + bytes(377)
+    return data + MP3_FRAME * frames
+
+
+def test_cut_wav_at_frame_boundary(tmp_path, make_wav):
+    src, dst = tmp_path / "in.wav", tmp_path / "out.wav"
+    src.write_bytes(make_wav(np.zeros((8000 * 5, 2)), rate=8000))
+
+    cut_wav(str(src), str(dst), 2)
+    with wave.open(str(dst), "rb") as clip:
+        assert clip.getnframes() == 16000
+        assert clip.getnchannels() == 2
+        assert clip.getframerate() == 8000
+
+
+def test_cut_wav_shorter_than_clip_keeps_everything(tmp_path, make_wav):
+    src, dst = tmp_path / "in.wav", tmp_path / "out.wav"
+    src.write_bytes(make_wav(np.zeros(800), rate=8000))
+
+    cut_wav(str(src), str(dst), 10)
+    with wave.open(str(dst), "rb") as clip:
+        assert clip.getnframes() == 800
+
+
+def test_cut_mp3_at_frame_headers(tmp_path):
+    src, dst = tmp_path / "in.mp3", tmp_path / "out.mp3"
+    src.write_bytes(make_mp3(500, id3=b"TIT2-tag-data", xing=True))
+
+    cut_mp3(str(src), str(dst), 1)
+    clip = dst.read_bytes()
+    frames = int(np.ceil(1 / MP3_FRAME_SECONDS))
+    tag = clip[: len(clip) - frames * len(MP3_FRAME)]
+
+    # ID3 tag kept, full-track Xing frame dropped, whole frames only
+    assert tag.startswith(b"ID3") and tag.endswith(b"TIT2-tag-data")
+    assert b"Xing" not in clip
+    assert clip[len(tag) :] == MP3_FRAME * frames
+
+
+def test_cut_mp3_rejects_non_mp3(tmp_path):
+    src, dst = tmp_path / "in.mp3", tmp_path / "out.mp3"
+    src.write_bytes(b"definitely not audio")
+
+    with pytest.raises(UnsupportedAudioError):
+        cut_mp3(str(src), str(dst), 5)
+    assert not dst.exists()
+
+
+@pytest.mark.asyncio
+async def test_preview_generated_once_and_cached(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=1024**2)
+    writer = cache.writer("t", 0, "audio/mpeg")
+    await writer.write(make_mp3(500))
+    entry = await writer.commit()
+    previewer = AudioPreviewer(cache)
+
+    generated = metrics.counter("audio_preview_generated_total")
+    paths = await asyncio.gather(*(previewer.preview(entry, 2) for _ in range(3)))
+    again = await previewer.preview(entry, 2)
+
+    assert metrics.counter("audio_preview_generated_total") == generated + 1
+    assert all(path == again for path in paths)
+    assert again == cache.sidecar_path(entry, "preview-2")
+    assert len(again.read_bytes()) < entry.size
@@ -0,0 +1,88 @@
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from app.services.chunking import (
+    MAX_CHUNK_SIZE,
+    MIN_CHUNK_SIZE,
+    ChunkSizer,
+    is_identity,
+    upstream_chunks,
+)
+
+
+def _response(headers):
+    response = MagicMock(spec=httpx.Response)
+    response.headers = headers
+
+    async def raw():
+        yield b"raw"
+
+    async def decoded(chunk_size=None):
+        yield b"decoded"
+
+    response.aiter_raw = raw
+    response.aiter_bytes = decoded
+    return response
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({}, True),
+        ({"content-encoding": "identity"}, True),
+        ({"content-encoding": " Identity "}, True),
+        ({"content-encoding": "gzip"}, False),
+    ],
+)
+def test_is_identity(headers, expected):
+    assert is_identity(_response(headers)) is expected
+
+
+@pytest.mark.asyncio
+async def test_identity_body_is_read_raw():
+    chunks = [c async for c in upstream_chunks(_response({}))]
+    assert chunks == [b"raw"]
+
+
+@pytest.mark.asyncio
+async def test_encoded_body_is_decoded():
+    chunks = [c async for c in upstream_chunks(_response({"content-encoding": "br"}))]
+    assert chunks == [b"decoded"]
+
+
+def test_fast_client_grows_chunks_gradually():
+    sizer = ChunkSizer()
+    start = sizer.size
+    sizer.record(sizer.size, 1e-6)
+    assert sizer.size == start * 2
+
+    for _ in range(20):
+        sizer.record(sizer.size, 1e-6)
+    assert sizer.size == MAX_CHUNK_SIZE
+
+
+def test_slow_client_shrinks_chunks_gradually():
+    sizer = ChunkSizer()
+    start = sizer.size
+    sizer.record(sizer.size, 10.0)
+    assert sizer.size == start // 2
+
+    for _ in range(20):
+        sizer.record(sizer.size, 10.0)
+    assert sizer.size == MIN_CHUNK_SIZE
+
+
+def test_steady_client_settles_on_target_size():
+    sizer = ChunkSizer()
+    # 2 MB/s and a 50 ms target: about 100 kB per chunk
+    for _ in range(30):
+        sizer.record(sizer.size, sizer.size / 2_000_000)
+    assert 90_000 <= sizer.size <= 110_000
+
+
+def test_empty_chunks_are_ignored():
+    sizer = ChunkSizer()
+    sizer.record(0, 1.0)
+    assert sizer.size == ChunkSizer().size
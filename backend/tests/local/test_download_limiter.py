@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.download_limiter import DownloadLimiter, DownloadRejected
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _limiter(**kwargs):
+    options = {
+        "max_streams": 2,
+        "per_session": 2,
+        "queue_size": 2,
+        "wait_timeout": 1.0,
+        "retry_after": 7,
+    }
+    return DownloadLimiter(**{**options, **kwargs})
+
+
+@pytest.mark.asyncio
+async def test_free_slots_are_taken_immediately():
+    limiter = _limiter()
+    first = await limiter.acquire("a")
+    await limiter.acquire("b")
+    assert limiter.active == 2
+    assert metrics.gauge("audio_download_active_streams") == 2
+
+    first.release()
+    first.release()
+    assert limiter.active == 1
+
+
+@pytest.mark.asyncio
+async def test_waiter_gets_the_next_released_slot():
+    limiter = _limiter(max_streams=1)
+    slot = await limiter.acquire("a")
+    waiting = asyncio.create_task(limiter.acquire("b"))
+    await asyncio.sleep(0)
+    assert limiter.queued == 1
+    assert metrics.gauge("audio_download_queue_depth") == 1
+
+    slot.release()
+    second = await waiting
+    assert second.session_id == "b"
+    assert limiter.active == 1
+    assert limiter.queued == 0
+    assert metrics.summary("audio_download_queue_wait_seconds")["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out_with_retry_after():
+    limiter = _limiter(max_streams=1, wait_timeout=0.01)
+    await limiter.acquire("a")
+
+    with pytest.raises(DownloadRejected) as exc:
+        await limiter.acquire("b")
+    assert exc.value.reason == "timeout"
+    assert exc.value.retry_after == 7
+    assert limiter.queued == 0
+    assert metrics.counter('audio_download_rejected_total{reason="timeout"}') == 1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_fails_fast():
+    limiter = _limiter(max_streams=1, queue_size=1)
+    await limiter.acquire("a")
+    waiting = asyncio.create_task(limiter.acquire("b"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(DownloadRejected) as exc:
+        await limiter.acquire("c")
+    assert exc.value.reason == "queue_full"
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    assert limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_session_limit_does_not_block_other_sessions():
+    limiter = _limiter(max_streams=3, per_session=1)
+    a_slot = await limiter.acquire("a")
+    blocked = asyncio.create_task(limiter.acquire("a"))
+    await asyncio.sleep(0)
+
+    # Another session starts right away while "a" waits for its own slot
+    await limiter.acquire("b")
+    assert not blocked.done()
+
+    a_slot.release()
+    await blocked
+    assert limiter.active == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    limiter = _limiter(max_streams=1)
+    slot = await limiter.acquire("a")
+    waiting = asyncio.create_task(limiter.acquire("b"))
+    await asyncio.sleep(0)
+
+    # The slot is handed to the waiter just as its request goes away
+    slot.release()
+    waiting.cancel()
+    (result,) = await asyncio.gather(waiting, return_exceptions=True)
+    # Either the caller still received the slot, or it was given back
+    if not isinstance(result, asyncio.CancelledError):
+        result.release()
+    assert limiter.active == 0
@@ -0,0 +1,174 @@
+import asyncio
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.file_response import MappedFileResponse
+
+
+def _scope(method="GET", headers=(), extensions=None, spec_version="2.4"):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": spec_version},
+        "method": method,
+        "path": "/audio",
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+        "extensions": extensions or {},
+    }
+
+
+async def _serve(path, **scope):
+    messages = []
+
+    async def receive():
+        # The client stays connected
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    response = MappedFileResponse(path, media_type="audio/wav")
+    await response(_scope(**scope), receive, send)
+    start, *rest = messages
+    return start, rest
+
+
+def _body(messages):
+    assert not messages[-1].get("more_body", False)
+    return b"".join(bytes(m["body"]) for m in messages)
+
+
+@pytest.fixture
+def audio(tmp_path):
+    path = tmp_path / "track.wav"
+    path.write_bytes(bytes(range(256)) * 1024)
+    return path
+
+
+@pytest.mark.asyncio
+async def test_sends_slices_of_a_mapping(audio):
+    metrics.reset()
+    start, body = await _serve(audio)
+
+    assert start["status"] == 200
+    assert _body(body) == audio.read_bytes()
+    # The body is never copied into bytes objects
+    assert all(isinstance(m["body"], memoryview) for m in body)
+    assert metrics.counter('audio_file_responses_total{method="mmap"}') == 1
+
+
+@pytest.mark.asyncio
+async def test_single_range_is_sent_from_the_mapping(audio):
+    start, body = await _serve(audio, headers=[("range", "bytes=10-19")])
+
+    assert start["status"] == 206
+    assert dict(start["headers"])[b"content-range"] == b"bytes 10-19/262144"
+    assert _body(body) == audio.read_bytes()[10:20]
+
+
+@pytest.mark.asyncio
+async def test_server_with_zerocopysend_gets_the_file(audio):
+    metrics.reset()
+    start, body = await _serve(
+        audio,
+        headers=[("range", "bytes=100-")],
+        extensions={"http.response.zerocopysend": {}},
+    )
+
+    assert start["status"] == 206
+    [message] = body
+    assert message["type"] == "http.response.zerocopysend"
+    assert message["file"].name == str(audio)
+    assert (message["offset"], message["count"]) == (100, 262144 - 100)
+    assert metrics.counter('audio_file_responses_total{method="sendfile"}') == 1
+
+
+@pytest.mark.asyncio
+async def test_empty_file_falls_back_to_reads(tmp_path):
+    metrics.reset()
+    path = tmp_path / "empty.wav"
+    path.write_bytes(b"")
+    start, body = await _serve(path)
+
+    assert start["status"] == 200
+    assert _body(body) == b""
+    assert metrics.counter('audio_file_responses_total{method="read"}') == 1
+
+
+@pytest.mark.asyncio
+async def test_head_sends_no_body(audio):
+    start, body = await _serve(audio, method="HEAD")
+
+    assert dict(start["headers"])[b"content-length"] == b"262144"
+    assert _body(body) == b""
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "header,expected",
+    [("bytes=-16", slice(-16, None)), ("bytes=262000-999999", slice(262000, None))],
+)
+async def test_suffix_and_overlong_ranges(audio, header, expected):
+    start, body = await _serve(audio, headers=[("range", header)])
+
+    assert start["status"] == 206
+    assert _body(body) == audio.read_bytes()[expected]
+
+
+@pytest.mark.asyncio
+async def test_stale_if_range_gets_the_whole_file(audio):
+    start, body = await _serve(
+        audio, headers=[("range", "bytes=10-19"), ("if-range", '"old"')]
+    )
+
+    assert start["status"] == 200
+    assert _body(body) == audio.read_bytes()
+
+
+@pytest.mark.asyncio
+async def test_other_ranges_are_left_to_file_response(audio):
+    start, _ = await _serve(audio, headers=[("range", "bytes=0-9,20-29")])
+    assert start["status"] == 206
+    assert b"multipart/byteranges" in dict(start["headers"])[b"content-type"]
+
+    start, _ = await _serve(audio, headers=[("range", "bytes=999999-")])
+    assert start["status"] == 416
+
+
+@pytest.mark.asyncio
+async def test_servers_before_asgi_2_4_get_the_mapping(audio):
+    # uvicorn's HTTP protocols report 2.3
+    metrics.reset()
+    start, body = await _serve(audio, spec_version="2.3")
+
+    assert start["status"] == 200
+    assert _body(body) == audio.read_bytes()
+    assert all(isinstance(m["body"], memoryview) for m in body)
+    assert metrics.counter('audio_file_responses_total{method="mmap"}') == 1
+
+
+@pytest.mark.asyncio
+async def test_disconnect_stops_the_body_before_asgi_2_4(tmp_path):
+    path = tmp_path / "long.wav"
+    path.write_bytes(bytes(16 * 1024**2))
+    messages = []
+    gone = asyncio.Event()
+
+    async def receive():
+        await gone.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        # A server before 2.4 accepts sends after the client has gone
+        messages.append(message)
+        if len(messages) == 3:
+            gone.set()
+        await asyncio.sleep(0)
+
+    response = MappedFileResponse(path, media_type="audio/wav")
+    await asyncio.wait_for(
+        response(_scope(spec_version="2.3"), receive, send), timeout=5
+    )
+
+    sent = sum(len(m["body"]) for m in messages[1:])
+    assert 0 < sent < path.stat().st_size
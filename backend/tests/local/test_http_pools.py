@@ -0,0 +1,117 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.metrics import metrics
+from app.services.http_pools import MeteredTransport, create_pool
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _metered(name, max_connections=2, http2=False):
+    inner = httpx.MockTransport(lambda request: httpx.Response(200, content=b"x" * 10))
+    limits = httpx.Limits(max_connections=max_connections)
+    return MeteredTransport(name, limits, http2=http2, transport=inner)
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_holds_a_slot_until_closed():
+    transport = _metered("bulk")
+    async with httpx.AsyncClient(transport=transport) as client:
+        async with client.stream("GET", "http://upstream/v1/audio") as resp:
+            assert transport.active == 1
+            assert metrics.gauge('http_pool_active_requests{pool="bulk"}') == 1
+            assert metrics.gauge('http_pool_utilization{pool="bulk"}') == 0.5
+            assert await resp.aread() == b"x" * 10
+        assert transport.active == 0
+
+        await client.get("http://upstream/health")
+        assert transport.active == 0
+    assert metrics.summary('http_pool_headers_seconds{pool="bulk"}')["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_requests_beyond_capacity_count_as_saturated():
+    transport = _metered("bulk", max_connections=1)
+    async with httpx.AsyncClient(transport=transport) as client:
+        async with (
+            client.stream("GET", "http://upstream/a"),
+            client.stream("GET", "http://upstream/b"),
+        ):
+            assert metrics.gauge('http_pool_utilization{pool="bulk"}') == 2
+        assert metrics.counter('http_pool_saturated_total{pool="bulk"}') == 1
+
+
+@pytest.mark.asyncio
+async def test_http2_pool_has_no_connection_capacity():
+    transport = _metered("control", http2=True)
+    async with (
+        httpx.AsyncClient(transport=transport) as client,
+        client.stream("GET", "http://upstream/a"),
+        client.stream("GET", "http://upstream/b"),
+    ):
+        assert transport.active == 2
+    assert metrics.counter('http_pool_saturated_total{pool="control"}') == 0
+    assert 'http_pool_utilization{pool="control"}' not in metrics.snapshot()["gauges"]
+
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_its_slot():
+    def refuse(request):
+        raise httpx.ConnectError("refused")
+
+    limits = httpx.Limits(max_connections=1)
+    transport = MeteredTransport(
+        "control", limits, transport=httpx.MockTransport(refuse)
+    )
+    async with httpx.AsyncClient(transport=transport) as client:
+        with pytest.raises(httpx.ConnectError):
+            await client.get("http://upstream/health")
+    assert transport.active == 0
+
+
+@pytest.mark.asyncio
+async def test_busy_bulk_pool_does_not_delay_control_calls():
+    """A download holding every bulk connection leaves status calls unaffected."""
+    release = asyncio.Event()
+
+    async def handle(reader, writer):
+        request = await reader.readuntil(b"\r\n\r\n")
+        if request.startswith(b"GET /v1/audio"):
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 8\r\n\r\nRIFF")
+            await writer.drain()
+            await release.wait()
+            writer.write(b"data")
+        else:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+    pool_options = {
+        "max_connections": 1,
+        "max_keepalive_connections": 0,
+        "keepalive_expiry": 1,
+        "http2": False,
+    }
+    async with (
+        server,
+        create_pool("control", **pool_options) as control,
+        create_pool("bulk", **pool_options) as bulk,
+        bulk.stream("GET", f"{base}/v1/audio") as download,
+    ):
+        # The only bulk connection is busy, yet a status call is immediate
+        status = await asyncio.wait_for(control.post(f"{base}/query_result"), timeout=2)
+        assert status.status_code == 200
+        with pytest.raises(httpx.PoolTimeout):
+            await bulk.get(f"{base}/v1/audio", timeout=httpx.Timeout(1, pool=0.05))
+        release.set()
+        assert await download.aread() == b"RIFFdata"
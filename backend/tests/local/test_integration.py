@@ -76,12 +76,13 @@ async def test_integration_workflow(async_client, mock_acestep_client):
     # 3. Download audio
     # Setup mock for audio download
     mock_audio_response = MagicMock(spec=Response)
+    mock_audio_response.status_code = 200
     mock_audio_response.headers = {"content-type": "audio/mpeg"}
 
     async def mock_aiter_bytes(*args, **kwargs):
         yield b"fake-audio-content"
 
-    mock_audio_response.aiter_bytes = mock_aiter_bytes
+    mock_audio_response.aiter_raw = mock_aiter_bytes
     mock_acestep_client.download_audio_stream.return_value = mock_audio_response
 
     download_response = await async_client.get(audio_url)
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from app.core import json_codec
+
+
+@pytest.fixture(params=["fast", "stdlib"])
+def codec(request, monkeypatch):
+    """Run each test against both the orjson and the stdlib backend."""
+    if request.param == "fast":
+        if json_codec.orjson is None:
+            pytest.skip("orjson not installed")
+    else:
+        monkeypatch.setattr(json_codec, "orjson", None)
+    return json_codec
+
+
+def test_round_trip(codec):
+    payload = {"task_id": "abc", "lyrics": "[Verse]\nÜber alles ♪", "bpm": 120}
+    encoded = codec.dumps(payload)
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == payload
+    assert codec.loads(encoded.decode()) == payload
+
+
+def test_dumps_is_compact_and_matches_stdlib(codec):
+    payload = {"b": [1, 2], "a": None}
+    assert codec.dumps(payload) == b'{"b":[1,2],"a":null}'
+    assert codec.dumps(payload, sort_keys=True) == b'{"a":null,"b":[1,2]}'
+
+
+def test_decode_error_is_stdlib_type(codec):
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads("not{valid}json")
+
+
+def test_response_class_renders_with_codec(codec):
+    response = codec.JSONResponse({"status": "completed"})
+    assert response.body == b'{"status":"completed"}'
+    assert response.headers["content-type"] == "application/json"
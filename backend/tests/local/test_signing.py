@@ -0,0 +1,57 @@
+import urllib.parse
+
+from app.core.signing import (
+    audio_signature,
+    signed_audio_url,
+    verify_audio_signature,
+)
+
+
+def _query(url):
+    return dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(url).query))
+
+
+def test_signed_url_round_trips():
+    url = signed_audio_url("task-1", 2, "/outputs/a b.mp3", ttl=3600, now=1000)
+    assert url.startswith("/api/audio/task-1?")
+    query = _query(url)
+    assert query["index"] == "2"
+    assert query["path"] == "/outputs/a b.mp3"
+    assert verify_audio_signature(
+        "task-1", 2, query["path"], int(query["expires"]), query["sig"]
+    )
+
+
+def test_signature_covers_every_field():
+    sig = audio_signature("task-1", 0, "/outputs/a.mp3", 7200)
+    assert verify_audio_signature("task-1", 0, "/outputs/a.mp3", 7200, sig)
+    assert not verify_audio_signature("task-2", 0, "/outputs/a.mp3", 7200, sig)
+    assert not verify_audio_signature("task-1", 1, "/outputs/a.mp3", 7200, sig)
+    assert not verify_audio_signature("task-1", 0, "/outputs/b.mp3", 7200, sig)
+    assert not verify_audio_signature("task-1", 0, "/outputs/a.mp3", 7201, sig)
+    assert not verify_audio_signature("task-1", 0, "/outputs/a.mp3", 7200, "0" * 64)
+
+
+def test_expiry_is_stable_within_a_ttl_window():
+    first = signed_audio_url("task-1", 0, "a.mp3", ttl=3600, now=3600)
+    later = signed_audio_url("task-1", 0, "a.mp3", ttl=3600, now=7199)
+    assert first == later
+    expires = int(_query(first)["expires"])
+    assert 3600 + 3600 <= expires <= 7199 + 2 * 3600
+
+
+def test_zero_ttl_disables_signing():
+    assert signed_audio_url("task-1", 1, "a.mp3", ttl=0) == "/api/audio/task-1?index=1"
+
+
+def test_placeholder_secret_disables_signing(monkeypatch):
+    from app.core.config import settings
+
+    sig = audio_signature("task-1", 0, "a.mp3", 7200)
+    monkeypatch.setattr(settings, "SESSION_SECRET", "super-secret-key")
+    assert signed_audio_url("task-1", 0, "a.mp3", ttl=3600) == (
+        "/api/audio/task-1?index=0"
+    )
+    assert not verify_audio_signature("task-1", 0, "a.mp3", 7200, sig)
+    forged = audio_signature("task-1", 0, "/etc/passwd", 7200)
+    assert not verify_audio_signature("task-1", 0, "/etc/passwd", 7200, forged)
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from app.services.status_poller import StatusPoller
+from app.services.task_cache import TaskResult
+
+
+class FakeFetcher:
+    """Returns queued status snapshots, one per poll."""
+
+    def __init__(self, *snapshots: dict[str, int]):
+        self.snapshots = list(snapshots)
+        self.calls: list[list[str]] = []
+
+    async def __call__(self, task_ids):
+        self.calls.append(list(task_ids))
+        snapshot = (
+            self.snapshots.pop(0) if len(self.snapshots) > 1 else self.snapshots[0]
+        )
+        return {
+            tid: TaskResult(status=snapshot[tid]) for tid in task_ids if tid in snapshot
+        }
+
+
+@pytest.mark.asyncio
+async def test_watchers_share_one_poll_per_interval():
+    fetch = FakeFetcher({"a": 0, "b": 0}, {"a": 1, "b": 0}, {"a": 1, "b": 2})
+    poller = StatusPoller(fetch, interval=0.01)
+    q1, q2, q3 = asyncio.Queue(), asyncio.Queue(), asyncio.Queue()
+
+    poller.subscribe("a", q1, current=TaskResult(status=0))
+    poller.subscribe("a", q2, current=TaskResult(status=0))
+    poller.subscribe("b", q3, current=TaskResult(status=0))
+
+    assert (await asyncio.wait_for(q1.get(), 1))[1].status == 1
+    assert (await asyncio.wait_for(q2.get(), 1))[1].status == 1
+    assert (await asyncio.wait_for(q3.get(), 1))[1].status == 2
+
+    # Every poll covered all watched tasks in a single fetch
+    assert fetch.calls[0] == ["a", "b"]
+    await poller.close()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_status_is_not_republished():
+    fetch = FakeFetcher({"a": 0})
+    poller = StatusPoller(fetch, interval=0.01)
+    queue = asyncio.Queue()
+    poller.subscribe("a", queue, current=TaskResult(status=0))
+
+    await asyncio.sleep(0.05)
+    assert len(fetch.calls) > 1
+    assert queue.empty()
+    await poller.close()
+
+
+@pytest.mark.asyncio
+async def test_terminal_status_stops_polling():
+    fetch = FakeFetcher({"a": 1})
+    poller = StatusPoller(fetch, interval=0.01)
+    queue = asyncio.Queue()
+    poller.subscribe("a", queue)
+
+    task_id, result = await asyncio.wait_for(queue.get(), 1)
+    assert (task_id, result.status) == ("a", 1)
+    await asyncio.sleep(0.03)
+    assert poller.watched_tasks == 0
+    assert len(fetch.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_last_watcher_stops_loop():
+    fetch = FakeFetcher({"a": 0})
+    poller = StatusPoller(fetch, interval=0.01)
+    queue = asyncio.Queue()
+    poller.subscribe("a", queue, current=TaskResult(status=0))
+    await asyncio.sleep(0.02)
+
+    poller.unsubscribe("a", queue)
+    await asyncio.sleep(0.03)
+    calls = len(fetch.calls)
+    await asyncio.sleep(0.03)
+    assert len(fetch.calls) == calls
+    assert poller.watched_tasks == 0
+
+
+@pytest.mark.asyncio
+async def test_fetch_errors_keep_polling():
+    class FlakyFetcher(FakeFetcher):
+        async def __call__(self, task_ids):
+            if not self.calls:
+                self.calls.append(list(task_ids))
+                raise RuntimeError("upstream down")
+            return await super().__call__(task_ids)
+
+    poller = StatusPoller(FlakyFetcher({"a": 2}), interval=0.01)
+    queue = asyncio.Queue()
+    poller.subscribe("a", queue, current=TaskResult(status=0))
+    _, result = await asyncio.wait_for(queue.get(), 1)
+    assert result.status == 2
+
+
+@pytest.mark.asyncio
+async def test_new_subscriptions_wait_for_the_next_interval():
+    fetch = FakeFetcher({f"t{i}": 0 for i in range(20)})
+    poller = StatusPoller(fetch, interval=0.05)
+    queue = asyncio.Queue()
+
+    for i in range(20):
+        poller.subscribe(f"t{i}", queue, current=TaskResult(status=0))
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(0.06)
+
+    # One poll for all of them, not one per subscription
+    assert len(fetch.calls) == 1
+    assert len(fetch.calls[0]) == 20
+    await poller.close()
@@ -0,0 +1,34 @@
+from app.core.metrics import metrics
+from app.services import subscription_limiter
+from app.services.subscription_limiter import SubscriptionLimiter
+
+
+def test_subscribe_rate_resets_each_minute(monkeypatch):
+    metrics.reset()
+    now = 600.0
+    monkeypatch.setattr(subscription_limiter.time, "monotonic", lambda: now)
+    limits = SubscriptionLimiter(subscribes_per_minute=2)
+
+    assert limits.allow_subscribe("a")
+    assert limits.allow_subscribe("a")
+    assert not limits.allow_subscribe("a")
+    # Other clients have their own budget
+    assert limits.allow_subscribe("b")
+    assert metrics.counter("ws_subscribe_rate_limited_total") == 1
+
+    now += 60
+    assert limits.allow_subscribe("a")
+
+
+def test_held_subscriptions_are_counted_per_key():
+    limits = SubscriptionLimiter(max_subscriptions=2)
+    limits.hold("a")
+    limits.hold("a")
+    limits.hold("b")
+    assert limits.room("a") == 0
+    assert limits.room("b") == 1
+
+    limits.release("a")
+    assert limits.room("a") == 1
+    limits.release("a")
+    assert limits.room("a") == 2
@@ -0,0 +1,74 @@
+from app.services.task_cache import TaskResult, TaskResultCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _completed(size: int = 0) -> TaskResult:
+    return TaskResult(status=1, results=[{"file": "out.mp3"}], size=size)
+
+
+def test_get_miss_then_hit():
+    cache = TaskResultCache(max_entries=10, max_bytes=10_000, ttl=60)
+    assert cache.get("a") is None
+
+    entry = _completed()
+    cache.put("a", entry)
+    assert cache.get("a") is entry
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_non_terminal_results_are_not_cached():
+    cache = TaskResultCache(max_entries=10, max_bytes=10_000, ttl=60)
+    cache.put("a", TaskResult(status=0))
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_failed_results_are_cached():
+    cache = TaskResultCache(max_entries=10, max_bytes=10_000, ttl=60)
+    cache.put("a", TaskResult(status=2, error="boom"))
+    assert cache.get("a").error == "boom"
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TaskResultCache(max_entries=10, max_bytes=10_000, ttl=5, clock=clock)
+    cache.put("a", _completed())
+    clock.now = 4.9
+    assert cache.get("a") is not None
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.total_bytes == 0
+
+
+def test_lru_eviction_by_entry_count():
+    cache = TaskResultCache(max_entries=2, max_bytes=10_000, ttl=60)
+    cache.put("a", _completed())
+    cache.put("b", _completed())
+    cache.get("a")  # "b" is now least recently used
+    cache.put("c", _completed())
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_eviction_by_byte_budget():
+    cache = TaskResultCache(max_entries=100, max_bytes=2_000, ttl=60)
+    cache.put("a", _completed(size=800))
+    cache.put("b", _completed(size=800))
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.total_bytes <= 2_000
+
+
+def test_oversized_entry_is_not_cached():
+    cache = TaskResultCache(max_entries=100, max_bytes=1_000, ttl=60)
+    cache.put("a", _completed(size=5_000))
+    assert len(cache) == 0
@@ -0,0 +1,90 @@
+from app.services.task_registry import TaskRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_register_and_get():
+    registry = TaskRegistry(ttl=60, max_entries=10)
+    registry.register("a", "session-1", {"prompt": "jazz"})
+
+    record = registry.get("a")
+    assert record.session_id == "session-1"
+    assert record.params == {"prompt": "jazz"}
+    assert record.submitted_at is not None
+    assert record.status == 0
+
+
+def test_records_use_slots():
+    registry = TaskRegistry(ttl=60, max_entries=10)
+    record = registry.register("a", None)
+    assert not hasattr(record, "__dict__")
+
+
+def test_observe_completed_exposes_audio_paths():
+    registry = TaskRegistry(ttl=60, max_entries=10)
+    registry.register("a", "session-1")
+    assert registry.audio_paths("a") is None
+
+    registry.observe("a", 1, ["output/a.mp3"])
+    assert registry.audio_paths("a") == ["output/a.mp3"]
+    assert registry.get("a").session_id == "session-1"
+
+
+def test_observe_creates_record_for_unknown_task():
+    registry = TaskRegistry(ttl=60, max_entries=10)
+    registry.observe("b", 1, ["output/b.mp3"])
+    assert registry.get("b").session_id is None
+    assert registry.audio_paths("b") == ["output/b.mp3"]
+
+
+def test_records_expire_after_ttl():
+    clock = FakeClock()
+    registry = TaskRegistry(ttl=10, max_entries=10, clock=clock)
+    registry.register("a", None)
+    registry.register("b", None)
+
+    clock.now = 5
+    registry.observe("b", 0, [])  # refreshes b's TTL
+    clock.now = 11
+    assert registry.get("a") is None
+    assert registry.get("b") is not None
+    assert registry.collect_garbage() == 0
+    assert len(registry) == 1
+
+
+def test_collect_garbage_sweeps_expired_records():
+    clock = FakeClock()
+    registry = TaskRegistry(ttl=10, max_entries=10, clock=clock)
+    for i in range(3):
+        registry.register(f"t{i}", None)
+    clock.now = 20
+    assert registry.collect_garbage() == 3
+    assert len(registry) == 0
+
+
+def test_max_entries_drops_oldest():
+    registry = TaskRegistry(ttl=60, max_entries=2)
+    registry.register("a", None)
+    registry.register("b", None)
+    registry.register("c", None)
+    assert registry.get("a") is None
+    assert len(registry) == 2
+
+
+def test_on_complete_fires_once_on_first_completion():
+    completed = []
+    registry = TaskRegistry(
+        ttl=60, max_entries=10, on_complete=lambda *args: completed.append(args)
+    )
+    registry.observe("a", 0, [])
+    registry.observe("a", 1, ["output/a.mp3"])
+    registry.observe("a", 1, ["output/a.mp3"])
+    registry.observe("b", 2, [])
+
+    assert completed == [("a", ["output/a.mp3"])]
@@ -0,0 +1,111 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.services import waveform
+from app.services.audio_cache import AudioCache
+from app.services.waveform import (
+    UnsupportedAudioError,
+    WaveformService,
+    compute_peaks,
+    reduce_peaks,
+)
+
+
+async def _cache_file(cache, data, content_type="audio/wav"):
+    writer = cache.writer("t", 0, content_type)
+    await writer.write(data)
+    return await writer.commit()
+
+
+def test_reduce_peaks_min_max_per_bucket():
+    samples = np.array([[0.1], [-0.5], [0.9], [0.2], [-0.3], [0.0]], dtype=np.float32)
+    low, high = reduce_peaks(samples, 3)
+    np.testing.assert_allclose(low, [-0.5, 0.2, -0.3])
+    np.testing.assert_allclose(high, [0.1, 0.9, 0.0])
+
+
+def test_reduce_peaks_spans_all_channels_and_caps_buckets():
+    samples = np.array([[0.5, -1.0], [0.25, 0.75]], dtype=np.float32)
+    low, high = reduce_peaks(samples, 10)
+    np.testing.assert_allclose(low, [-1.0, 0.25])
+    np.testing.assert_allclose(high, [0.5, 0.75])
+
+
+@pytest.mark.parametrize("width", [1, 2, 3, 4])
+def test_compute_peaks_from_wav(tmp_path, make_wav, width):
+    full = (1 << (8 * width - 1)) - 1
+    samples = np.array([0, full, -full, 0, full // 2, -(full // 2)])
+    path = tmp_path / "track.wav"
+    path.write_bytes(make_wav(samples, rate=6, width=width))
+
+    peaks = compute_peaks(str(path), "audio/wav", 3)
+    assert peaks["buckets"] == 3
+    assert peaks["duration"] == 1.0
+    assert peaks["channels"] == 1
+    np.testing.assert_allclose(peaks["max"], [127, 0, 63.5], atol=1)
+    np.testing.assert_allclose(peaks["min"], [0, -127, -63.5], atol=1)
+
+
+def test_compute_peaks_rejects_undecodable_audio(tmp_path):
+    path = tmp_path / "track.wav"
+    path.write_bytes(b"not a wav file")
+    with pytest.raises(UnsupportedAudioError):
+        compute_peaks(str(path), "audio/wav", 10)
+
+
+@pytest.mark.asyncio
+async def test_peaks_are_cached_next_to_the_audio(tmp_path, make_wav):
+    cache = AudioCache(tmp_path, max_bytes=1024**2)
+    entry = await _cache_file(cache, make_wav(np.arange(-100, 100) * 100))
+    service = WaveformService(cache, executor_factory=lambda: ThreadPoolExecutor(1))
+
+    first = await service.peaks(entry, 20)
+    sidecar = cache.sidecar_path(entry, "peaks-20.json")
+    assert sidecar.exists()
+
+    # Served from the sidecar without recomputing
+    service._executor_factory = None
+    service.close()
+    assert await service.peaks(entry, 20) == first
+
+    # Evicting the track removes its sidecars
+    cache._drop(entry.key)
+    assert not sidecar.exists()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_computation(
+    tmp_path, make_wav, monkeypatch
+):
+    cache = AudioCache(tmp_path, max_bytes=1024**2)
+    entry = await _cache_file(cache, make_wav(np.zeros(100)))
+    calls = []
+
+    def counting_compute(*args):
+        calls.append(args)
+        return compute_peaks(*args)
+
+    monkeypatch.setattr(waveform, "compute_peaks", counting_compute)
+    service = WaveformService(cache, executor_factory=lambda: ThreadPoolExecutor(2))
+    results = await asyncio.gather(*(service.peaks(entry, 10) for _ in range(4)))
+    service.close()
+
+    assert len(calls) == 1
+    assert all(r == results[0] for r in results)
+
+
+@pytest.mark.asyncio
+async def test_computes_in_worker_process(tmp_path, make_wav):
+    cache = AudioCache(tmp_path, max_bytes=1024**2)
+    entry = await _cache_file(cache, make_wav(np.arange(1000) - 500))
+    service = WaveformService(
+        cache, executor_factory=lambda: ProcessPoolExecutor(max_workers=1)
+    )
+    try:
+        peaks = await service.peaks(entry, 4)
+    finally:
+        service.close()
+    assert peaks["buckets"] == 4
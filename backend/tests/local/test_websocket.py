@@ -0,0 +1,180 @@
+import asyncio
+import json
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.services.subscription_limiter import SubscriptionLimiter
+
+
+def _completed(file: str = "output/track.mp3") -> dict:
+    return {"status": 1, "result": json.dumps([{"file": file}])}
+
+
+def test_subscribe_sends_current_status_then_transitions(
+    ws_client, mock_acestep_client
+):
+    mock_acestep_client.query_result.side_effect = [
+        [{"task_id": "a", "status": 0}, {"task_id": "b", "status": 2, "error": "x"}],
+        [{"task_id": "a", **_completed()}],
+    ]
+
+    with ws_client.websocket_connect("/api/jobs/ws") as ws:
+        ws.send_json({"action": "subscribe", "task_ids": ["a", "b"]})
+        first, second, third = ws.receive_json(), ws.receive_json(), ws.receive_json()
+
+    assert first == {"type": "status", "task_id": "a", "status": "processing"}
+    assert second == {
+        "type": "status",
+        "task_id": "b",
+        "status": "failed",
+        "error": "x",
+    }
+    assert third["task_id"] == "a"
+    assert third["status"] == "completed"
+    assert third["audio_url"].startswith("/api/audio/a?index=0&path=")
+
+
+def test_subscribe_unknown_task_reports_error(ws_client, mock_acestep_client):
+    mock_acestep_client.query_result.return_value = []
+
+    with ws_client.websocket_connect("/api/jobs/ws") as ws:
+        ws.send_json({"action": "subscribe", "task_ids": ["missing"]})
+        message = ws.receive_json()
+
+    assert message == {
+        "type": "error",
+        "detail": "Task not found",
+        "task_ids": ["missing"],
+    }
+
+
+def test_subscription_limit(ws_client, mock_acestep_client):
+    ws_client.app.state.subscription_limiter = SubscriptionLimiter(max_subscriptions=1)
+    mock_acestep_client.query_result.return_value = [{"task_id": "a", "status": 0}]
+
+    with ws_client.websocket_connect("/api/jobs/ws") as ws:
+        ws.send_json({"action": "subscribe", "task_ids": ["a", "b"]})
+        error, status = ws.receive_json(), ws.receive_json()
+
+    assert error["detail"] == "Subscription limit reached"
+    assert error["task_ids"] == ["b"]
+    assert status["task_id"] == "a"
+    assert mock_acestep_client.query_result.call_args_list[0].args[0] == ["a"]
+
+
+def test_unsubscribe_stops_watching(ws_client, mock_acestep_client):
+    mock_acestep_client.query_result.return_value = [{"status": 0}]
+    poller = ws_client.app.state.status_poller
+
+    with ws_client.websocket_connect("/api/jobs/ws") as ws:
+        ws.send_json({"action": "subscribe", "task_ids": ["a"]})
+        assert ws.receive_json()["status"] == "processing"
+        assert poller.watched_tasks == 1
+
+        ws.send_json({"action": "unsubscribe", "task_ids": ["a"]})
+        ws.send_json({"action": "subscribe", "task_ids": ["c"]})
+        assert ws.receive_json()["task_id"] == "c"
+        assert poller.watched_tasks == 1
+
+    # Disconnecting drops the remaining subscriptions
+    assert poller.watched_tasks == 0
+
+
+def test_invalid_messages(ws_client):
+    with ws_client.websocket_connect("/api/jobs/ws") as ws:
+        ws.send_text("not json")
+        assert ws.receive_json() == {"type": "error", "detail": "Invalid message"}
+        ws.send_json({"action": "dance"})
+        assert ws.receive_json() == {"type": "error", "detail": "Unknown action"}
+
+
+def test_subscribe_rate_limit(ws_client, mock_acestep_client):
+    ws_client.app.state.subscription_limiter = SubscriptionLimiter(
+        subscribes_per_minute=1
+    )
+    mock_acestep_client.query_result.return_value = [{"task_id": "a", "status": 0}]
+
+    with ws_client.websocket_connect("/api/jobs/ws") as ws:
+        ws.send_json({"action": "subscribe", "task_ids": ["a"]})
+        assert ws.receive_json()["task_id"] == "a"
+        ws.send_json({"action": "subscribe", "task_ids": ["b"]})
+        error = ws.receive_json()
+
+    assert error == {
+        "type": "error",
+        "detail": "Rate limit exceeded",
+        "task_ids": ["b"],
+    }
+    assert mock_acestep_client.query_result.call_count == 1
+
+
+def test_limits_are_shared_by_a_sessions_connections(ws_client, mock_acestep_client):
+    ws_client.app.state.subscription_limiter = SubscriptionLimiter(
+        max_subscriptions=1, subscribes_per_minute=2
+    )
+    mock_acestep_client.query_result.return_value = [{"status": 0}]
+    ws_client.cookies.set("session_id", "one-session")
+
+    with ws_client.websocket_connect("/api/jobs/ws") as first:
+        first.send_json({"action": "subscribe", "task_ids": ["a"]})
+        assert first.receive_json()["task_id"] == "a"
+
+        # A second socket does not start with a fresh budget
+        with ws_client.websocket_connect("/api/jobs/ws") as second:
+            second.send_json({"action": "subscribe", "task_ids": ["b"]})
+            assert second.receive_json()["detail"] == "Subscription limit reached"
+            second.send_json({"action": "subscribe", "task_ids": ["c"]})
+            assert second.receive_json()["detail"] == "Rate limit exceeded"
+
+    # Closing the sockets gives the subscriptions back
+    assert ws_client.app.state.subscription_limiter.room("session:one-session") == 1
+
+
+@pytest.mark.asyncio
+async def test_send_failure_ends_the_writer_cleanly(async_client, mock_acestep_client):
+    from app.api.routes.generation import job_status_socket
+    from app.main import app
+
+    mock_acestep_client.query_result.return_value = [{"task_id": "a", "status": 0}]
+    incoming = [json.dumps({"action": "subscribe", "task_ids": ["a"]})]
+    writers = []
+
+    class GoneSocket:
+        """A client that disconnected before the first reply."""
+
+        client = None
+
+        def __init__(self):
+            self.app = app
+            self.cookies = {}
+
+        async def accept(self):
+            pass
+
+        async def receive_text(self):
+            if incoming:
+                return incoming.pop()
+            await asyncio.sleep(0.01)
+            raise WebSocketDisconnect(code=1006)
+
+        async def send_text(self, text):
+            raise WebSocketDisconnect(code=1006)
+
+    def record_writer(loop, coro, **kwargs):
+        task = asyncio.Task(coro, loop=loop, **kwargs)
+        if coro.__name__ == "forward_messages":
+            writers.append(task)
+        return task
+
+    loop = asyncio.get_running_loop()
+    loop.set_task_factory(record_writer)
+    try:
+        await job_status_socket(GoneSocket())
+    finally:
+        loop.set_task_factory(None)
+
+    [writer] = writers
+    assert writer.done()
+    assert writer.exception() is None
+    assert app.state.status_poller.watched_tasks == 0
@@ -0,0 +1,47 @@
+import io
+import zipfile
+
+import pytest
+
+from app.services.zip_stream import stream_zip
+
+
+def _source(*chunks):
+    async def generate():
+        for chunk in chunks:
+            yield chunk
+
+    return generate
+
+
+@pytest.mark.asyncio
+async def test_stream_zip_round_trips():
+    parts = [
+        piece
+        async for piece in stream_zip(
+            [
+                ("metadata.json", _source(b'{"a": 1}')),
+                ("one.mp3", _source(b"abc", b"def")),
+                ("two.wav", _source()),
+            ]
+        )
+    ]
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(parts))) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ["metadata.json", "one.mp3", "two.wav"]
+        assert archive.read("one.mp3") == b"abcdef"
+        assert archive.read("two.wav") == b""
+        assert archive.getinfo("one.mp3").compress_type == zipfile.ZIP_STORED
+
+
+@pytest.mark.asyncio
+async def test_stream_zip_yields_while_members_are_read():
+    chunk = b"x" * 65536
+    sizes = []
+    async for piece in stream_zip([("big.wav", _source(*[chunk] * 16))]):
+        sizes.append(len(piece))
+
+    # Output follows the input chunk by chunk instead of arriving at the end
+    assert len(sizes) >= 16
+    assert max(sizes) < 2 * len(chunk)
@@ -94,6 +94,7 @@ export interface JobResponse {
     status: "queued" | "processing" | "completed" | "failed";
     audio_url?: string;
     audio_urls?: string[];
+    bundle_url?: string;
     metadata?: JobMetadata;
     error?: string;
 }